@@ -68,6 +68,9 @@ print(memoized_function(5))  # Fetching from cache, result: 10
 # **Why use `__call__` here?**
 # - The `Memoizer` class wraps the `slow_function` and caches its results to avoid re-computation for the same inputs.
 # - By making `Memoizer` callable, you can use the same syntax as calling a regular function, keeping the code concise and clean.
+# - This cache never evicts anything and is not thread safe. For a bounded,
+#   thread safe version with TTL and hit/miss statistics see `LRUMemoizer`
+#   in utils/memoize.py.
 
 ### 3. **Customizable Behaviors for Function Calls**
 
@@ -126,6 +129,9 @@ print(chain(5))  # (5 + 2) * 3 = 21
 # **Why use `__call__` here?**
 # - The `FunctionChain` class allows you to chain multiple functions together.
 # - Instead of manually calling each function, you can simply call the object with an argument, and it will process the argument through all the functions in the chain, keeping the code concise.
+# - Each value goes through the chain on its own. For running whole batches,
+#   fusing steps and fanning steps out to a pool see `Pipeline` in
+#   utils/pipeline.py.
 
 
 
@@ -153,6 +159,9 @@ keypress_event("a", "b", modifier="shift")
 # **Why use `__call__` here?**
 # - The `EventHandler` object acts as a generic event handler.
 # - Instead of defining methods for each type of event, the object can be called directly with parameters, making the event handling process more flexible.
+# - The handler runs inside the caller, so a slow handler slows whatever
+#   triggered the event. For queued, batched delivery (including from pool
+#   workers) see `EventBus` in utils/events.py.
 
 ### Summary of when to use `__call__`:
 
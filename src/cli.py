@@ -0,0 +1,314 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+# Console entry point:
+#     seq-analysis <analyze|report|index|similarity|bench|daemon>
+# Only the standard library modules above are imported at startup; each
+# subcommand imports the analysis code it needs inside its handler, so
+# e.g. `seq-analysis index` never pays for multiprocessing or the stages
+# (it reads its input through utils/inputs.py only).
+#
+# For many small jobs, start a resident daemon once:
+#     seq-analysis daemon &
+#     seq-analysis analyze data/ --daemon
+# The daemon keeps one warm worker pool and takes jobs as JSON lines over
+# a local Unix socket, so a job pays neither interpreter nor pool startup.
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), f"seq-analysis-{os.getuid()}.sock")
+# utils.executors.BACKENDS, repeated so building the parser imports nothing.
+EXECUTOR_CHOICES = ("process", "thread", "inline")
+EXECUTOR_HELP = "worker backend (default: thread if free-threaded, else process)"
+# utils.canonical.K_MER_MODES, likewise.
+K_MER_MODE_CHOICES = ("forward", "canonical")
+
+
+def jsonable(value: Any) -> Any:
+    """Converts results (NamedTuples, nested dicts) into JSON friendly values."""
+    if hasattr(value, "_asdict"):
+        value = value._asdict()
+    if isinstance(value, dict):
+        return {str(key): jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(item) for item in value]
+    return value
+
+
+def run_analysis(
+    source: str,
+    stage_names: Optional[List[str]] = None,
+    pool=None,
+    processes=None,
+    near_duplicate_threshold: Optional[float] = None,
+    executor: Optional[str] = None,
+    k_mer_mode: str = "forward",
+) -> Dict[str, Any]:
+    from seq_analysis_multiprocess import num_cores, process_files_parallel
+    from utils.inputs import resolve_input_files
+
+    file_paths = resolve_input_files(source)
+    if not file_paths:
+        raise FileNotFoundError(f"No input files found for {source!r}")
+    per_file, combined = process_files_parallel(
+        file_paths,
+        processes=processes or num_cores,
+        pool=pool,
+        stage_names=stage_names,
+        near_duplicate_threshold=near_duplicate_threshold,
+        executor=executor,
+        k_mer_mode=k_mer_mode,
+    )
+    return {"files": per_file, "combined": combined}
+
+
+def send_job(socket_path: str, request: Dict[str, Any]) -> Any:
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall((json.dumps(request) + "\n").encode())
+        with client.makefile("rb") as reply:
+            response = json.loads(reply.readline())
+    if not response["ok"]:
+        raise RuntimeError(response["error"])
+    return response["result"]
+
+
+def analyze(args) -> Dict[str, Any]:
+    stage_names = args.stages.split(",") if args.stages else None
+    if args.daemon:
+        # The daemon's pool was started with its own --workers and --executor.
+        if args.workers is not None or args.executor is not None:
+            raise SystemExit(
+                "--workers and --executor cannot be used with --daemon, "
+                "pass them to `seq-analysis daemon` instead"
+            )
+        request = {
+            "command": "analyze",
+            "source": os.path.abspath(args.source),
+            "stages": stage_names,
+            "dedup": args.dedup,
+            "k_mer_mode": args.k_mer_mode,
+        }
+        return send_job(args.socket, request)
+    return jsonable(
+        run_analysis(
+            args.source,
+            stage_names,
+            processes=args.workers,
+            near_duplicate_threshold=args.dedup,
+            executor=args.executor,
+            k_mer_mode=args.k_mer_mode,
+        )
+    )
+
+
+def command_analyze(args) -> None:
+    result = analyze(args)
+    json.dump(result if args.full else result["combined"], sys.stdout, indent=2)
+    print()
+
+
+def command_report(args) -> None:
+    from utils.test_sequence_utils import generate_report
+    from utils.top_k import merge_top_k
+
+    result = analyze(args)
+    combined = result["combined"]
+    # The report tables want the top k-mers summed over every record.
+    for k in (2, 3):
+        combined[f"total_k_mer_count_{k}"] = merge_top_k(
+            (
+                record["k_mers"].get(f"k_mer_n{k}_count", {})
+                for statistics in result["files"].values()
+                for record in statistics["dna_sequences"]
+            ),
+            args.top,
+        )
+    generate_report(combined, args.output)
+    print(f"Report written to {args.output}")
+
+
+def command_index(args) -> None:
+    from utils.inputs import is_valid_sequence, load_sequences_file, resolve_input_files
+
+    sequences = []
+    for file_path in resolve_input_files(args.source):
+        for sequence in load_sequences_file(file_path)["sequences"]:
+            if is_valid_sequence(sequence):
+                sequences.append(sequence)
+
+    if args.format == "packed":
+        from utils.packed_store import write_packed_store
+
+        write_packed_store(sequences, args.output)
+    else:
+        from utils.fm_index import FMIndex
+
+        FMIndex.build(sequences).save(args.output)
+    print(f"Indexed {len(sequences)} sequences into {args.output}")
+
+
+def command_similarity(args) -> None:
+    from utils.sketch import file_jaccard, sequence_jaccard
+
+    if os.path.exists(args.first) and os.path.exists(args.second):
+        similarity = file_jaccard(args.first, args.second, k=args.k)
+    else:
+        similarity = sequence_jaccard(args.first, args.second, k=args.k)
+    print(f"{similarity:.4f}")
+
+
+def command_bench(args) -> None:
+    timings = []
+    start = time.perf_counter()
+    import seq_analysis_multiprocess  # noqa: F401
+
+    timings.append(("import analysis modules", time.perf_counter() - start))
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        run_analysis(args.source, processes=args.workers, executor=args.executor)
+        timings.append(("analyze (new pool)", time.perf_counter() - start))
+    if os.path.exists(args.socket):
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            request = {"command": "analyze", "source": os.path.abspath(args.source)}
+            send_job(args.socket, request)
+            timings.append(("analyze (daemon)", time.perf_counter() - start))
+    for name, seconds in timings:
+        print(f"{name:<26}{seconds:>10.3f} s")
+
+
+def command_daemon(args) -> None:
+    import socketserver
+    import threading
+
+    from seq_analysis_multiprocess import num_cores
+    from utils.executors import create_pool
+
+    pool = create_pool(args.executor, args.workers or num_cores)
+
+    class JobHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            request = json.loads(self.rfile.readline())
+            try:
+                if request["command"] == "shutdown":
+                    threading.Thread(target=self.server.shutdown).start()
+                    result = None
+                elif request["command"] == "analyze":
+                    result = jsonable(
+                        run_analysis(
+                            request["source"],
+                            request.get("stages"),
+                            pool,
+                            near_duplicate_threshold=request.get("dedup"),
+                            k_mer_mode=request.get("k_mer_mode", "forward"),
+                        )
+                    )
+                else:
+                    raise ValueError(f"Unknown command {request['command']!r}")
+                response = {"ok": True, "result": result}
+            except Exception as exc:
+                response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+
+    class JobServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    # A socket file left behind by a daemon that was killed would block bind().
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)
+    try:
+        with JobServer(args.socket, JobHandler) as server:
+            print(f"Listening on {args.socket}")
+            server.serve_forever()
+    finally:
+        pool.terminate()
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="seq-analysis")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="daemon socket path")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_analysis_arguments(subparser):
+        subparser.add_argument("source", help="file, directory, glob or manifest.txt")
+        subparser.add_argument("--stages", help="comma separated analysis stages")
+        subparser.add_argument("--workers", type=int, help="worker processes")
+        subparser.add_argument(
+            "--executor", choices=EXECUTOR_CHOICES, help=EXECUTOR_HELP
+        )
+        subparser.add_argument(
+            "--daemon", action="store_true", help="send the job to the daemon"
+        )
+        subparser.add_argument(
+            "--dedup",
+            type=float,
+            metavar="THRESHOLD",
+            help="analyse one read per near-duplicate cluster (Jaccard >= THRESHOLD)",
+        )
+        subparser.add_argument(
+            "--k-mer-mode",
+            choices=K_MER_MODE_CHOICES,
+            default="forward",
+            help="canonical counts a k-mer and its reverse complement together",
+        )
+
+    analyze_parser = subparsers.add_parser("analyze", help="analyse sequence files")
+    add_analysis_arguments(analyze_parser)
+    analyze_parser.add_argument(
+        "--full", action="store_true", help="print per file statistics too"
+    )
+    analyze_parser.set_defaults(handler=command_analyze)
+
+    report_parser = subparsers.add_parser("report", help="write a markdown report")
+    add_analysis_arguments(report_parser)
+    report_parser.add_argument("output", help="markdown file to write")
+    report_parser.add_argument("--top", type=int, default=10, help="k-mers per table")
+    report_parser.set_defaults(handler=command_report)
+
+    index_parser = subparsers.add_parser("index", help="build a sequence index")
+    index_parser.add_argument("source", help="file, directory, glob or manifest.txt")
+    index_parser.add_argument("output", help="index file to write")
+    index_parser.add_argument("--format", choices=("fm", "packed"), default="fm")
+    index_parser.set_defaults(handler=command_index)
+
+    similarity_parser = subparsers.add_parser(
+        "similarity", help="k-mer Jaccard similarity of two sequences or files"
+    )
+    similarity_parser.add_argument("first", help="sequence or sequences file")
+    similarity_parser.add_argument("second", help="sequence or sequences file")
+    similarity_parser.add_argument("-k", type=int, default=16, help="k-mer size")
+    similarity_parser.set_defaults(handler=command_similarity)
+
+    bench_parser = subparsers.add_parser("bench", help="time the analysis")
+    bench_parser.add_argument("source", help="file, directory, glob or manifest.txt")
+    bench_parser.add_argument("--repeat", type=int, default=3)
+    bench_parser.add_argument("--workers", type=int, help="worker processes")
+    bench_parser.add_argument(
+        "--executor", choices=EXECUTOR_CHOICES, help=EXECUTOR_HELP
+    )
+    bench_parser.set_defaults(handler=command_bench)
+
+    daemon_parser = subparsers.add_parser("daemon", help="run a warm worker pool")
+    daemon_parser.add_argument("--workers", type=int, help="worker processes")
+    daemon_parser.add_argument(
+        "--executor", choices=EXECUTOR_CHOICES, help=EXECUTOR_HELP
+    )
+    daemon_parser.set_defaults(handler=command_daemon)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
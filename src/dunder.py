@@ -4,6 +4,8 @@ class Example:
     # Avoid using __slots__ if you need dynamic assignment of new attributes
     # or if the class is meant to be subclassed by unknown users' classes.
     # # __slots__ = ['name', 'score']
+    # See utils/records.py for a slotted per-read result record and
+    # records_benchmark.py for how much memory that saves per million reads.
 
     def __new__(cls):
         print("Creating Instance called before __init__")
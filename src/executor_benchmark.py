@@ -0,0 +1,75 @@
+import argparse
+import random
+import sys
+import time
+
+from seq_analysis_multiprocess import num_cores, process_data_parallel
+from utils.counting import count_k_mers
+from utils.executors import BACKENDS, default_backend, gil_disabled
+from utils.sequence_utils import find_longest_dna_palindrome
+
+# Wall time of process_data_parallel (counts, k-mers, motifs, palindrome
+# per read) on each executor backend, see utils/executors.py. The records
+# of every backend are checked against the inline run.
+#     python executor_benchmark.py --reads 2000 --length 150
+# Run it with a free-threaded interpreter (python3.13t) as well to compare
+# the thread backend without the GIL.
+
+NUM_READS = 2_000
+READ_LENGTH = 150
+REPEAT = 3
+
+
+def random_reads(count: int, length: int, seed: int = 0):
+    rng = random.Random(seed)
+    return ["".join(rng.choices("ACGT", k=length)) for _ in range(count)]
+
+
+def best_time(reads, backend: str, repeat: int):
+    best, results = float("inf"), None
+    for _ in range(repeat):
+        # Otherwise every run after the first (and forked workers) would
+        # read the memoized results of the one before.
+        count_k_mers.cache_clear()
+        find_longest_dna_palindrome.cache_clear()
+        start = time.perf_counter()
+        results = process_data_parallel(reads, executor=backend)
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reads", type=int, default=NUM_READS)
+    parser.add_argument("--length", type=int, default=READ_LENGTH)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    arguments = parser.parse_args()
+
+    reads = random_reads(arguments.reads, arguments.length)
+    print(
+        f"Python {sys.version.split()[0]}, GIL "
+        f"{'disabled' if gil_disabled() else 'enabled'}, {num_cores} workers, "
+        f"default backend {default_backend()}"
+    )
+    print(f"{'backend':<10}{'seconds':>10}{'reads / s':>12}")
+    expected = None
+    for backend in reversed(BACKENDS):
+        seconds, results = best_time(reads, backend, arguments.repeat)
+        if expected is None:
+            expected = results
+        elif results != expected:
+            raise RuntimeError(f"{backend} results differ from inline")
+        print(f"{backend:<10}{seconds:>10.3f}{len(reads) / seconds:>12.0f}")
+
+# Python 3.13.5 (GIL), 1 CPU so 1 worker, 2000 reads of 150 bases,
+# --repeat 5:
+# backend      seconds   reads / s
+# inline         3.639         550
+# thread         2.882         694
+# process        2.917         686
+#
+# With one worker this only measures overhead, and on this machine it is
+# lost in noise: repeated runs moved each backend by up to 20% and changed
+# their order. No multi-core or free-threaded (3.13t) run has been
+# recorded yet, so how far the thread backend scales without the GIL is
+# not measured here; run the command above on such a build to find out.
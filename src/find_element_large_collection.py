@@ -22,3 +22,7 @@ print(timeit("99_999 in st", number=1000, globals=globals()))
 # 3. List preserve order and can have duplicates so slower. Sets are unordered and unique
 
 # So if no dups and order are unimportant - use a set.
+
+# When the set itself no longer fits in memory (e.g. hundreds of millions of
+# reference k-mers), see utils/kmer_screen.py: a sorted array of packed
+# integers searched with bisect, or a Bloom filter, both memory-mapped.
@@ -17,6 +17,10 @@ class Temperature:
         print("Deleting celsius")
         del self._celsius
 
+# The setter checks one value at a time. For a whole buffer of readings
+# utils/temperature.py finds every value below absolute zero in one pass
+# and reports their indices (BelowAbsoluteZeroError.indices).
+
 # Usage
 temp = Temperature(100)
 print(temp.celsius)  # 100
@@ -0,0 +1,116 @@
+import random
+import tracemalloc
+from dataclasses import dataclass
+from timeit import timeit
+from typing import Dict
+
+from utils.chunk import Document
+from utils.data_types import DNASequence
+from utils.records import ReadRecord
+
+# Memory per million records and attribute access speed of the per-read
+# result types. k_mers is left as None everywhere so only the record
+# layout itself is compared.
+
+NUM_RECORDS = 100_000
+SCALE = 1_000_000 // NUM_RECORDS
+
+
+@dataclass
+class DictReadRecord:
+    # The same fields as ReadRecord but in a per instance __dict__ with
+    # nested dicts, i.e. what a plain class or dataclass would give.
+    id: int
+    adenine_count: int
+    thymine_count: int
+    guanine_count: int
+    cytosine_count: int
+    palindrome: Dict
+    motifs: Dict
+    k_mers: Dict = None
+
+
+@dataclass
+class DictDocument:
+    # Document before it used slots=True.
+    id: int
+    source: str
+    start: int
+    end: int
+    metadata: Dict
+
+
+def random_read(length: int = 200) -> str:
+    return "".join(random.choice("ACGT") for _ in range(length))
+
+
+def nested_fields(i: int, read: str) -> Dict:
+    return {
+        "id": i,
+        "adenine_count": read.count("A"),
+        "thymine_count": read.count("T"),
+        "guanine_count": read.count("G"),
+        "cytosine_count": read.count("C"),
+        "palindrome": {"palindrome_seq": read[10:22], "palindrome_length": 12},
+        "motifs": {"cpg_islands": [3, 57, 120], "tata_boxes": [88]},
+        "k_mers": None,
+    }
+
+
+def build_named_tuple(i, read):
+    return DNASequence(**nested_fields(i, read))
+
+
+def build_dict_record(i, read):
+    return DictReadRecord(**nested_fields(i, read))
+
+
+def build_read_record(i, read):
+    return ReadRecord.from_dna_sequence(DNASequence(**nested_fields(i, read)), read)
+
+
+def build_dict_document(i, read):
+    return DictDocument(i, read, 0, 100, {})
+
+
+def build_document(i, read):
+    return Document(i, read, 0, 100, {})
+
+
+def megabytes_per_million(build, reads) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [build(i, read) for i, read in enumerate(reads)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return (after - before) * SCALE / 1_000_000
+
+
+if __name__ == "__main__":
+    reads = [random_read() for _ in range(NUM_RECORDS)]
+    builders = [
+        ("DNASequence (NamedTuple, nested dicts)", build_named_tuple, "adenine_count"),
+        ("DictReadRecord (__dict__, nested dicts)", build_dict_record, "adenine_count"),
+        ("ReadRecord (__slots__, fixed width)", build_read_record, "adenine_count"),
+        ("DictDocument (__dict__)", build_dict_document, "start"),
+        ("Document (slots=True)", build_document, "start"),
+    ]
+    print(f"{'record type':<42}{'MB / million':>14}{'ns / access':>14}")
+    for name, build, field in builders:
+        megabytes = megabytes_per_million(build, reads)
+        record = build(0, reads[0])
+        seconds = timeit(f"record.{field}", number=1_000_000, globals=globals())
+        print(f"{name:<42}{megabytes:>14.1f}{seconds * 1000:>14.1f}")
+
+# Python 3.13.5, 200 base reads (the reads themselves are not counted):
+# record type                                 MB / million   ns / access
+# DNASequence (NamedTuple, nested dicts)             720.9          43.5
+# DictReadRecord (__dict__, nested dicts)            752.8          19.7
+# ReadRecord (__slots__, fixed width)                323.9          23.2
+# DictDocument (__dict__)                            212.0          21.5
+# Document (slots=True)                              171.9          20.0
+#
+# Slots mostly save memory; access through a slot descriptor is about as
+# fast as a __dict__ lookup (within run to run noise of a few ns) and
+# about twice as fast as a NamedTuple's property.
@@ -0,0 +1,130 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import Callable, List, Tuple
+
+from seq_analysis_multiprocess import (
+    FILE_PATH,
+    NUCLEOTIDE_LIST,
+    num_cores,
+    process_data,
+    process_sequence_statistics,
+)
+from utils.compressed import open_text
+from utils.data_types import DNASequence, SequenceStatistics
+from utils.sequence_stream import CHUNK_SIZE, JSONSequenceParser
+from utils.sequence_utils import validate_sequence
+
+# The __main__ flow in seq_analysis_multiprocess runs load -> validate ->
+# compute one after the other, so time spent waiting on a slow disk or
+# network mount is added to the compute time.
+# Here the three stages run at the same time, joined by bounded queues:
+#
+#   read_sequences    reads chunks in a thread, parses out sequences
+#         | queue (at most QUEUE_SIZE batches)
+#   validate_batches  filters each batch in a thread
+#         | queue (at most QUEUE_SIZE batches)
+#   analyse_batches   sends each batch to a ProcessPoolExecutor
+#
+# The bounded queues give backpressure: if the pool falls behind, the
+# reader stops reading instead of filling memory with unprocessed batches.
+
+BATCH_SIZE = 256
+QUEUE_SIZE = 8
+
+
+def process_batch(batch: List[str]) -> List[DNASequence]:
+    # Sending a batch per task rather than one sequence keeps the pickling
+    # and inter-process overhead small relative to the work.
+    return [process_data(sequence) for sequence in batch]
+
+
+async def read_sequences(
+    file_path: str, queue: asyncio.Queue, batch_size: int, chunk_size: int
+) -> None:
+    parser = JSONSequenceParser()
+    batch = []
+    # Compressed input is decompressed as it is read (BGZF on a thread pool).
+    with open_text(file_path) as f:
+        while True:
+            # The blocking read runs in a thread so the event loop keeps
+            # validating and dispatching while we wait on storage.
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                break
+            batch.extend(parser.feed(chunk))
+            while len(batch) >= batch_size:
+                await queue.put(batch[:batch_size])
+                batch = batch[batch_size:]
+    parser.close()
+    if batch:
+        await queue.put(batch)
+    await queue.put(None)
+
+
+async def validate_batches(
+    in_queue: asyncio.Queue, out_queue: asyncio.Queue, validate: Callable
+) -> Tuple[int, int]:
+    total_count = 0
+    valid_count = 0
+    while (batch := await in_queue.get()) is not None:
+        cleaned = await asyncio.to_thread(
+            lambda: [seq for seq in batch if validate(sequence=seq)]
+        )
+        total_count += len(batch)
+        valid_count += len(cleaned)
+        if cleaned:
+            await out_queue.put(cleaned)
+    await out_queue.put(None)
+    return total_count, valid_count
+
+
+async def analyse_batches(
+    queue: asyncio.Queue, executor: Executor, max_in_flight: int
+) -> List[DNASequence]:
+    loop = asyncio.get_running_loop()
+    # Limit the batches handed to the pool; without it every batch would be
+    # pulled off the queue at once and the queue would never push back.
+    in_flight = asyncio.Semaphore(max_in_flight)
+    futures = []
+    while (batch := await queue.get()) is not None:
+        await in_flight.acquire()
+        future = loop.run_in_executor(executor, process_batch, batch)
+        future.add_done_callback(lambda _: in_flight.release())
+        futures.append(future)
+    results = []
+    # Gather keeps the results in input order.
+    for batch_results in await asyncio.gather(*futures):
+        results.extend(batch_results)
+    return results
+
+
+async def run_pipeline(
+    file_path: str,
+    batch_size: int = BATCH_SIZE,
+    queue_size: int = QUEUE_SIZE,
+    chunk_size: int = CHUNK_SIZE,
+    workers: int = num_cores,
+) -> SequenceStatistics:
+    validate = partial(validate_sequence, letter_list=NUCLEOTIDE_LIST, min_length=2)
+    raw_queue = asyncio.Queue(maxsize=queue_size)
+    valid_queue = asyncio.Queue(maxsize=queue_size)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        _, (total_count, valid_count), results = await asyncio.gather(
+            read_sequences(file_path, raw_queue, batch_size, chunk_size),
+            validate_batches(raw_queue, valid_queue, validate),
+            analyse_batches(valid_queue, executor, max_in_flight=workers * 2),
+        )
+
+    return process_sequence_statistics(
+        data=results, total_count=total_count, invalid_count=total_count - valid_count
+    )
+
+
+if __name__ == "__main__":
+    start_time = time.time()
+    seq_statistics = asyncio.run(run_pipeline(FILE_PATH))
+    print(seq_statistics)
+    print("Time taken using asyncio pipeline:", time.time() - start_time)
@@ -1,7 +1,9 @@
-import json
+import argparse
+import logging
 import os
-from typing import List, TypedDict
-from multiprocessing import Pool
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from multiprocessing import Pool, SimpleQueue
 
 # from typing import Dict, List, NamedTuple, Set, TypedDict
 # from collections import defaultdict, Counter
@@ -9,6 +11,8 @@ from multiprocessing import Pool
 from functools import partial
 import time
 from utils.sequence_utils import (
+    GC_ISLAND_MOTIF,
+    TATA_BOX_MOTIF,
     count_k_mers,
     count_nucleotides,
     create_dna_sequence_record,
@@ -17,10 +21,30 @@ from utils.sequence_utils import (
     validate_sequence,
 )
 
+from utils.canonical import K_MER_MODES
 from utils.data_types import DNASequence, SequenceStatistics
+from utils.executors import BACKENDS, create_pool, imap_bounded
+from utils.governor import GovernedPool, default_worker_count, parse_size
+from utils.inputs import (
+    NUCLEOTIDE_LIST,
+    load_sequences_file,
+    resolve_input_files,
+)
+from utils.records import ReadRecord
+
+# Stage modules are imported by run_stages, and utils.checkpoint,
+# packed_store, read_matrix and sketch by the functions that use them, so a
+# run only loads the code of the options it was given.
+from utils.stages import DEFAULT_STAGES, run_stages
+from utils.windows import (
+    DEFAULT_WINDOW_SIZE,
+    PALINDROME_SPAN,
+    analyse_window,
+    merge_window_results,
+    split_windows,
+)
 
 
-NUCLEOTIDE_LIST = {"A", "T", "G", "C"}
 PALINDROME_MIN_LENGTH = 20
 INDEX = 0
 FILE_PATH = "./data/dna_sequences.json"
@@ -30,13 +54,41 @@ FILE_PATH = "./data/dna_sequences.json"
 #  using num_cores // 2 or even num_cores - 1 to reduce the load on the system.
 # // 2: This takes the result from os.cpu_count() and divides it by 2, while discarding any
 # remainder (it floors the division to the nearest integer).
-num_cores = os.cpu_count() // 2
-
-
-class DNASequenceData(TypedDict):
-    num_sequences: int
-    sequence_length: int
-    sequences: List[str]
+# default_worker_count() is that, but never 0 on a single CPU machine. With
+# a memory budget the worker count is not fixed: GovernedPool (see
+# utils/governor.py) adjusts it up to num_cores, and the chunk size, to the
+# measured memory.
+num_cores = default_worker_count()
+logger = logging.getLogger(__name__)
+# Sequences sent to a worker at a time in batch mode, and the most read
+# ahead of the results (see imap_bounded).
+BATCH_CHUNKSIZE = 64
+BATCH_MAX_IN_FLIGHT = 16 * BATCH_CHUNKSIZE
+TOTAL_COUNT_KEYS = (
+    "total_adenine_count",
+    "total_thymine_count",
+    "total_guanine_count",
+    "total_cytosine_count",
+    "total_sequences_count",
+    "invalid_sequences_count",
+)
+K_MER_COUNT_KEYS = ("k_mer_count_2", "k_mer_count_3", "k_mer_count_4", "k_mer_count_5")
+# Statistics key -> the key of the same k in each record's k_mers.
+RECORD_K_MER_KEYS = {key: f"k_mer_n{key[-1]}_count" for key in K_MER_COUNT_KEYS}
+# Sequences longer than this are split into windows analysed in parallel,
+# see utils/windows.py.
+LONG_SEQUENCE_LENGTH = 2 * DEFAULT_WINDOW_SIZE
+# Checkpointed runs: sequences per journal chunk, how often a chunk may
+# kill its worker before giving up, and the journal directory for --resume.
+CHECKPOINT_CHUNK_SIZE = 256
+MAX_CHUNK_RETRIES = 3
+CHECKPOINT_POLL_INTERVAL = 0.5
+# How long a chunk may go unreported while a worker has nothing reported,
+# before it is taken to be lost with a worker that died before reporting.
+LOST_CHUNK_TIMEOUT = 10.0
+DEFAULT_CHECKPOINT_DIR = "./checkpoint"
+# Reads per task with --batch-size, see utils/read_matrix.py.
+DEFAULT_BATCH_SIZE = 1024
 
 
 def initialise_sequence_statistics() -> SequenceStatistics:
@@ -51,17 +103,13 @@ def initialise_sequence_statistics() -> SequenceStatistics:
         "k_mer_count_3": {},
         "k_mer_count_4": {},
         "k_mer_count_5": {},
+        # "canonical" when k-mers were counted strand independently.
+        "k_mer_mode": "forward",
         "dna_sequences": [],
     }
     return seq_stats
 
 
-def load_sequences_file(file_path: str) -> DNASequenceData:
-    with open(file_path) as f:
-        data = json.load(f)
-        return data
-
-
 def calculate_dna_sequence_statistics(sequences: List[str]) -> SequenceStatistics:
     sequences_stats = SequenceStatistics()
     append_seq = sequences_stats.dna_sequences.append
@@ -111,17 +159,25 @@ def calculate_dna_sequence_statistics(sequences: List[str]) -> SequenceStatistic
     # Example task function
 
 
-def process_data(sequence: str):
+def process_data(sequence: str, canonical: bool = False):
     nucleotide_counts = count_nucleotides(sequence=sequence)
     k_mers = {}
 
-    k_mers["k_mer_n2_count"] = count_k_mers(sequence=sequence, number_nucleotides=2)
+    k_mers["k_mer_n2_count"] = count_k_mers(
+        sequence=sequence, number_nucleotides=2, canonical=canonical
+    )
 
-    k_mers["k_mer_n3_count"] = count_k_mers(sequence=sequence, number_nucleotides=3)
+    k_mers["k_mer_n3_count"] = count_k_mers(
+        sequence=sequence, number_nucleotides=3, canonical=canonical
+    )
 
-    k_mers["k_mer_n4_count"] = count_k_mers(sequence=sequence, number_nucleotides=4)
+    k_mers["k_mer_n4_count"] = count_k_mers(
+        sequence=sequence, number_nucleotides=4, canonical=canonical
+    )
 
-    k_mers["k_mer_n5_count"] = count_k_mers(sequence=sequence, number_nucleotides=5)
+    k_mers["k_mer_n5_count"] = count_k_mers(
+        sequence=sequence, number_nucleotides=5, canonical=canonical
+    )
 
     return create_dna_sequence_record(
         id=INDEX + 1,
@@ -134,9 +190,427 @@ def process_data(sequence: str):
     # Function to run multiprocessing
 
 
-def process_data_parallel(data):
-    with Pool(processes=num_cores) as pool:
-        results = pool.map(process_data, data)
+def process_data_batch(
+    sequences: List[str], canonical: bool = False
+) -> List[DNASequence]:
+    # process_data for many reads at once, same-length reads as a NumPy matrix.
+    from utils.read_matrix import batch_dna_sequence_records
+
+    return batch_dna_sequence_records(
+        sequences,
+        ids=[INDEX + 1] * len(sequences),
+        min_length=PALINDROME_MIN_LENGTH,
+        canonical=canonical,
+    )
+
+
+def split_batches(data: List[str], batch_size: int) -> List[List[str]]:
+    return [data[i : i + batch_size] for i in range(0, len(data), batch_size)]
+
+
+def process_long_sequence(
+    sequence: str, window_results, canonical: bool = False
+) -> DNASequence:
+    nucleotide_counts, top_k_mers, motifs, palindrome = merge_window_results(
+        sequence=sequence,
+        results=window_results,
+        min_length=PALINDROME_MIN_LENGTH,
+        canonical=canonical,
+    )
+    return DNASequence(
+        id=INDEX + 1,
+        adenine_count=nucleotide_counts["a"],
+        thymine_count=nucleotide_counts["t"],
+        guanine_count=nucleotide_counts["g"],
+        cytosine_count=nucleotide_counts["c"],
+        palindrome=palindrome,
+        motifs={
+            "cpg_islands": motifs[GC_ISLAND_MOTIF],
+            "tata_boxes": motifs[TATA_BOX_MOTIF],
+        },
+        k_mers={f"k_mer_n{k}_count": counts for k, counts in top_k_mers.items()},
+    )
+
+
+def process_data_parallel(
+    data,
+    long_sequence_length: int = LONG_SEQUENCE_LENGTH,
+    window_size: int = DEFAULT_WINDOW_SIZE,
+    palindrome_span: int = PALINDROME_SPAN,
+    checkpoint_dir: Optional[str] = None,
+    resume: bool = False,
+    memory_budget: Optional[int] = None,
+    executor: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    canonical: bool = False,
+):
+    # executor picks the backend (see utils/executors.py). The checkpointed
+    # and memory governed runs always use processes: they exist to survive
+    # a worker being killed, which a thread cannot be on its own, so any
+    # other executor is rejected there.
+    # canonical counts k-mers strand independently, see utils/canonical.py.
+    analyse = partial(process_data, canonical=canonical)
+    if checkpoint_dir is not None:
+        # The journal has its own process pool and fixed chunks, so the
+        # options that choose a pool or chunking do not apply to it.
+        unsupported = [
+            name
+            for name, value in (
+                ("executor", executor not in (None, "process")),
+                ("memory_budget", memory_budget is not None),
+                ("batch_size", batch_size),
+            )
+            if value
+        ]
+        if unsupported:
+            raise ValueError(
+                f"{', '.join(unsupported)} cannot be used with checkpoint_dir"
+            )
+        return process_data_checkpointed(
+            data, checkpoint_dir, resume=resume, canonical=canonical
+        )
+    if memory_budget is not None:
+        if executor not in (None, "process"):
+            raise ValueError(
+                f"memory_budget needs the process executor, not {executor!r}"
+            )
+        return process_data_governed(
+            data,
+            memory_budget,
+            long_sequence_length=long_sequence_length,
+            window_size=window_size,
+            palindrome_span=palindrome_span,
+            batch_size=batch_size,
+            canonical=canonical,
+        )
+    long_indexes = [i for i, seq in enumerate(data) if len(seq) > long_sequence_length]
+    if not long_indexes:
+        with create_pool(executor, num_cores) as pool:
+            if batch_size:
+                batches = pool.map(
+                    partial(process_data_batch, canonical=canonical),
+                    split_batches(data, batch_size),
+                )
+                return [record for batch in batches for record in batch]
+            results = pool.map(analyse, data)
+        return results
+
+    # A single huge read would otherwise keep one core busy long after the
+    # rest have finished. Its windows are queued first so they spread over
+    # every worker, and the short reads fill in around them.
+    long_set = set(long_indexes)
+    short_indexes = [i for i in range(len(data)) if i not in long_set]
+    results = [None] * len(data)
+    with create_pool(executor, num_cores) as pool:
+        window_jobs = [
+            (
+                i,
+                pool.map_async(
+                    analyse_window,
+                    split_windows(
+                        data[i],
+                        window_size=window_size,
+                        motifs=(GC_ISLAND_MOTIF, TATA_BOX_MOTIF),
+                        palindrome_span=palindrome_span,
+                    ),
+                    chunksize=1,
+                ),
+            )
+            for i in long_indexes
+        ]
+        short_reads = [data[i] for i in short_indexes]
+        if batch_size:
+            short_job = pool.map_async(
+                partial(process_data_batch, canonical=canonical),
+                split_batches(short_reads, batch_size),
+            )
+            short_records = [record for batch in short_job.get() for record in batch]
+        else:
+            short_records = pool.map_async(analyse, short_reads).get()
+        for i, record in zip(short_indexes, short_records):
+            results[i] = record
+        for i, job in window_jobs:
+            results[i] = process_long_sequence(data[i], job.get(), canonical)
+    return results
+
+
+def process_data_governed(
+    data: List[str],
+    memory_budget: int,
+    long_sequence_length: int = LONG_SEQUENCE_LENGTH,
+    window_size: int = DEFAULT_WINDOW_SIZE,
+    palindrome_span: int = PALINDROME_SPAN,
+    batch_size: Optional[int] = None,
+    canonical: bool = False,
+) -> List[DNASequence]:
+    """process_data_parallel on a GovernedPool (see utils/governor.py).
+
+    Up to num_cores workers. Long reads are split into windows and short
+    reads analysed in batches of batch_size, as in process_data_parallel;
+    GovernedPool.map has no map_async, so the windows of every long read
+    go through one map after the short reads.
+    """
+    long_set = {i for i, seq in enumerate(data) if len(seq) > long_sequence_length}
+    short_indexes = [i for i in range(len(data)) if i not in long_set]
+    short_reads = [data[i] for i in short_indexes]
+    results = [None] * len(data)
+    with GovernedPool(memory_budget, max_workers=num_cores) as pool:
+        if batch_size:
+            batches = pool.map(
+                partial(process_data_batch, canonical=canonical),
+                split_batches(short_reads, batch_size),
+            )
+            records = [record for batch in batches for record in batch]
+        else:
+            records = pool.map(partial(process_data, canonical=canonical), short_reads)
+        for i, record in zip(short_indexes, records):
+            results[i] = record
+
+        long_windows = [
+            (
+                i,
+                split_windows(
+                    data[i],
+                    window_size=window_size,
+                    motifs=(GC_ISLAND_MOTIF, TATA_BOX_MOTIF),
+                    palindrome_span=palindrome_span,
+                ),
+            )
+            for i in sorted(long_set)
+        ]
+        window_results = iter(
+            pool.map(
+                analyse_window,
+                [window for _, windows in long_windows for window in windows],
+            )
+        )
+        for i, windows in long_windows:
+            results[i] = process_long_sequence(
+                data[i], [next(window_results) for _ in windows], canonical
+            )
+    return results
+
+
+# Checkpointed variant, see utils/checkpoint.py. Chunks are submitted one
+# task each; workers report which chunk they started on a queue, so when a
+# worker dies (e.g. OOM killed) its chunk is submitted again. The pool
+# replaces the dead worker itself, the other workers keep going.
+# A worker can also die after taking a chunk but before reporting it (e.g.
+# while unpickling a large chunk). Workers take chunks in the order they
+# were submitted, so while some worker has no reported chunk nothing should
+# be left waiting; chunks that stay unreported that way for
+# LOST_CHUNK_TIMEOUT are submitted again.
+_started_queue = None
+
+
+def init_checkpoint_worker(started_queue: SimpleQueue) -> None:
+    global _started_queue
+    _started_queue = started_queue
+
+
+def process_checkpoint_chunk(
+    chunk_id: int, sequences: List[str], canonical: bool = False
+) -> List[DNASequence]:
+    _started_queue.put((chunk_id, os.getpid()))
+    # ReadRecord (see utils/records.py) is the compact form of a record, so
+    # less is pickled back to the parent and written to the journal.
+    return [
+        ReadRecord.from_dna_sequence(process_data(sequence, canonical), sequence)
+        for sequence in sequences
+    ]
+
+
+def is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def process_data_checkpointed(
+    data: List[str],
+    checkpoint_dir: str,
+    resume: bool = False,
+    chunk_size: int = CHECKPOINT_CHUNK_SIZE,
+    canonical: bool = False,
+) -> List[DNASequence]:
+    """process_data_parallel with a journal; resume skips the completed chunks."""
+    from utils.checkpoint import CheckpointJournal, fingerprint_sequences
+
+    k_mer_mode = "canonical" if canonical else "forward"
+    journal = CheckpointJournal(
+        checkpoint_dir,
+        fingerprint_sequences(data, chunk_size, k_mer_mode),
+        resume=resume,
+    )
+    num_chunks = -(-len(data) // chunk_size)
+    # SimpleQueue writes in put() itself rather than in a feeder thread, so
+    # the message is out even if the worker is killed straight after.
+    started = SimpleQueue()
+    with Pool(
+        processes=num_cores,
+        initializer=init_checkpoint_worker,
+        initargs=(started,),
+    ) as pool:
+
+        def submit(chunk_id: int):
+            start = chunk_id * chunk_size
+            return pool.apply_async(
+                process_checkpoint_chunk,
+                (chunk_id, data[start : start + chunk_size], canonical),
+            )
+
+        pending = {
+            chunk_id: submit(chunk_id)
+            for chunk_id in range(num_chunks)
+            if chunk_id not in journal.completed
+        }
+        running: Dict[int, int] = {}
+        retries: Dict[int, int] = defaultdict(int)
+        idle_since: Optional[float] = None
+
+        def resubmit(chunk_id: int, reason: str, *args) -> None:
+            retries[chunk_id] += 1
+            if retries[chunk_id] > MAX_CHUNK_RETRIES:
+                raise RuntimeError(
+                    f"Chunk {chunk_id} killed its worker {retries[chunk_id]} times"
+                )
+            logger.warning(reason + ", resubmitting", *args)
+            pending[chunk_id] = submit(chunk_id)
+
+        while pending:
+            next(iter(pending.values())).wait(CHECKPOINT_POLL_INTERVAL)
+            while not started.empty():
+                chunk_id, pid = started.get()
+                running[chunk_id] = pid
+            for chunk_id, result in list(pending.items()):
+                if result.ready():
+                    journal.record(chunk_id, result.get())
+                    del pending[chunk_id]
+                    running.pop(chunk_id, None)
+                elif chunk_id in running and not is_process_alive(running[chunk_id]):
+                    resubmit(
+                        chunk_id,
+                        "Worker %d died running chunk %d",
+                        running.pop(chunk_id),
+                        chunk_id,
+                    )
+
+            unreported = [chunk_id for chunk_id in pending if chunk_id not in running]
+            if not unreported or len(running) >= num_cores:
+                idle_since = None
+            elif idle_since is None:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since > LOST_CHUNK_TIMEOUT:
+                for chunk_id in unreported:
+                    resubmit(
+                        chunk_id,
+                        "Chunk %d was lost before a worker reported it",
+                        chunk_id,
+                    )
+                idle_since = None
+    journal.flush()
+
+    results = []
+    for chunk_id in range(num_chunks):
+        start = chunk_id * chunk_size
+        sequences = data[start : start + chunk_size]
+        for record, sequence in zip(journal.load_chunk(chunk_id), sequences):
+            # Journals written before ReadRecord hold DNASequence records.
+            if isinstance(record, ReadRecord):
+                record = record.to_dna_sequence(sequence)
+            results.append(record)
+    return results
+
+
+# Stage selection: only the named analysis stages are run (and their
+# modules imported), e.g. ("nucleotides",) for a quick count only run. The
+# "cpg" stage's counts are added to the record's motifs.
+def process_data_stages(
+    sequence: str, stage_names: Tuple[str, ...] = DEFAULT_STAGES
+) -> DNASequence:
+    results = run_stages(sequence, stage_names)
+    nucleotide_counts = results.get("nucleotides", {})
+    return DNASequence(
+        id=INDEX + 1,
+        adenine_count=nucleotide_counts.get("a", 0),
+        thymine_count=nucleotide_counts.get("t", 0),
+        guanine_count=nucleotide_counts.get("g", 0),
+        cytosine_count=nucleotide_counts.get("c", 0),
+        palindrome=results.get("palindrome", {}),
+        motifs={**results.get("motifs", {}), **results.get("cpg", {})},
+        k_mers=results.get("k_mers", results.get("canonical_k_mers", {})),
+    )
+
+
+def process_data_parallel_stages(
+    data, stage_names: Iterable[str] = DEFAULT_STAGES, executor: Optional[str] = None
+):
+    process = partial(process_data_stages, stage_names=tuple(stage_names))
+    with create_pool(executor, num_cores) as pool:
+        results = pool.map(process, data)
+    return results
+
+
+# Packed store variant: each worker maps the store file once and reads
+# sequences by index, so only ints are sent to the pool and all workers
+# share the same pages of the file.
+_packed_store = None
+
+
+def open_packed_store(store_path: str):
+    global _packed_store
+    from utils.packed_store import PackedSequenceStore
+
+    _packed_store = PackedSequenceStore(store_path)
+
+
+def process_packed_data(index: int, canonical: bool = False):
+    # Counts, motifs and the palindrome all work on the packed bytes or
+    # codes, so the read is never decoded to a str.
+    store = _packed_store
+    nucleotide_counts = store.count_nucleotides(index)
+    k_mers = {}
+
+    k_mers["k_mer_n2_count"] = store.count_k_mers(index, 2, canonical)
+
+    k_mers["k_mer_n3_count"] = store.count_k_mers(index, 3, canonical)
+
+    k_mers["k_mer_n4_count"] = store.count_k_mers(index, 4, canonical)
+
+    k_mers["k_mer_n5_count"] = store.count_k_mers(index, 5, canonical)
+
+    return DNASequence(
+        id=index,
+        adenine_count=nucleotide_counts["a"],
+        thymine_count=nucleotide_counts["t"],
+        guanine_count=nucleotide_counts["g"],
+        cytosine_count=nucleotide_counts["c"],
+        palindrome=store.longest_palindrome(index, PALINDROME_MIN_LENGTH),
+        motifs={
+            "cpg_islands": store.find_motif(index, GC_ISLAND_MOTIF),
+            "tata_boxes": store.find_motif(index, TATA_BOX_MOTIF),
+        },
+        k_mers=k_mers,
+    )
+
+
+def process_packed_data_parallel(
+    store_path: str, executor: Optional[str] = None, canonical: bool = False
+):
+    from utils.packed_store import PackedSequenceStore
+
+    with PackedSequenceStore(store_path) as store:
+        num_sequences = len(store)
+    # With threads the initializer runs once per thread on the same global,
+    # so every thread reads the last store opened, which maps the same file.
+    with create_pool(
+        executor, num_cores, initializer=open_packed_store, initargs=(store_path,)
+    ) as pool:
+        results = pool.map(
+            partial(process_packed_data, canonical=canonical), range(num_sequences)
+        )
     return results
 
 
@@ -144,7 +618,7 @@ def process_sequence_statistics(
     data: List[DNASequence], total_count: int, invalid_count: int
 ) -> SequenceStatistics:
     seq_doc = initialise_sequence_statistics()
-    print(f"SEQ DOC = {seq_doc}")
+    logger.debug("SEQ DOC = %s", seq_doc)
     seq_doc["total_sequences_count"] = total_count
     seq_doc["invalid_sequences_count"] = invalid_count
     # "total_adenine_count": 0,
@@ -165,16 +639,213 @@ def process_sequence_statistics(
     # palindrome: Palindrome
     # motifs: Dict[str, int]
     # k_mers: K_MERS
+    # The top k-mers of every record, summed (records from a stage run
+    # without k-mers add nothing).
+    k_mer_totals = {key: Counter() for key in K_MER_COUNT_KEYS}
     for item in data:
         seq_doc["total_adenine_count"] += item.adenine_count
         seq_doc["total_thymine_count"] += item.thymine_count
         seq_doc["total_guanine_count"] += item.guanine_count
         seq_doc["total_cytosine_count"] += item.cytosine_count
+        k_mers = item.k_mers or {}
+        for key, record_key in RECORD_K_MER_KEYS.items():
+            k_mer_totals[key].update(k_mers.get(record_key, {}))
         seq_doc["dna_sequences"].append(item)
+    for key, counts in k_mer_totals.items():
+        seq_doc[key] = dict(counts)
     return seq_doc
 
 
-if __name__ == "__main__":
+def combine_sequence_statistics(
+    statistics: Iterable[SequenceStatistics],
+) -> SequenceStatistics:
+    # The roll-up only sums the totals, the per sequence records stay in
+    # each file's own statistics.
+    combined = initialise_sequence_statistics()
+    for seq_doc in statistics:
+        for key in TOTAL_COUNT_KEYS:
+            combined[key] += seq_doc[key]
+        for key in K_MER_COUNT_KEYS:
+            combined[key] = update_k_mer_counts(combined[key], seq_doc[key])
+    return combined
+
+
+def process_tagged_data(
+    task: Tuple[int, int, str, Optional[Tuple[str, ...]]],
+    canonical: bool = False,
+) -> Tuple[int, int, DNASequence]:
+    file_index, position, sequence, stage_names = task
+    if stage_names is None:
+        return file_index, position, process_data(sequence, canonical)
+    if canonical:
+        stage_names = tuple(
+            "canonical_k_mers" if name == "k_mers" else name for name in stage_names
+        )
+    return file_index, position, process_data_stages(sequence, stage_names)
+
+
+def process_files_parallel(
+    file_paths: List[str],
+    processes: int = num_cores,
+    pool: Optional[Pool] = None,
+    stage_names: Optional[Iterable[str]] = None,
+    near_duplicate_threshold: Optional[float] = None,
+    executor: Optional[str] = None,
+    k_mer_mode: str = "forward",
+) -> Tuple[Dict[str, SequenceStatistics], SequenceStatistics]:
+    """Analyses many files on one pool, returning per file and combined statistics.
+
+    Pass an existing pool to reuse warm workers (see the cli daemon), and
+    stage_names to run only some analysis stages. With
+    near_duplicate_threshold only one read per cluster of near-identical
+    reads (estimated k-mer Jaccard >= threshold, see utils/sketch.py) is
+    analysed in each file. executor picks the pool backend, see
+    utils/executors.py. k_mer_mode "canonical" counts each k-mer together
+    with its reverse complement (see utils/canonical.py) and is recorded
+    in the statistics.
+    """
+    if k_mer_mode not in K_MER_MODES:
+        raise ValueError(f"Unknown k-mer mode {k_mer_mode!r}, expected {K_MER_MODES}")
+    if pool is None:
+        # One pool for every file: workers are started and imports paid once.
+        with create_pool(executor, processes) as pool:
+            return process_files_parallel(
+                file_paths,
+                pool=pool,
+                stage_names=stage_names,
+                near_duplicate_threshold=near_duplicate_threshold,
+                k_mer_mode=k_mer_mode,
+            )
+    if stage_names is not None:
+        stage_names = tuple(stage_names)
+    # Largest files go first so that the small ones fill the idle workers
+    # while the last large file drains, rather than a big file starting last.
+    file_paths = sorted(file_paths, key=os.path.getsize, reverse=True)
+    validate = partial(validate_sequence, letter_list=NUCLEOTIDE_LIST, min_length=2)
+    if near_duplicate_threshold is not None:
+        from utils.sketch import select_representatives
+    file_counts: Dict[int, Tuple[int, int, int]] = {}
+
+    def generate_tasks() -> Iterator[Tuple[int, int, str, Optional[Tuple[str, ...]]]]:
+        # The pool pulls from this generator in a background thread, at most
+        # BATCH_MAX_IN_FLIGHT sequences ahead of the results, so the next
+        # file is loaded and validated while workers finish this one, and
+        # memory holds one file plus the sequences in flight.
+        for file_index, file_path in enumerate(file_paths):
+            sequence_data = load_sequences_file(file_path)
+            cleaned = [
+                seq for seq in sequence_data["sequences"] if validate(sequence=seq)
+            ]
+            valid_count = len(cleaned)
+            if near_duplicate_threshold is not None:
+                cleaned, _ = select_representatives(cleaned, near_duplicate_threshold)
+            file_counts[file_index] = (
+                sequence_data["num_sequences"],
+                valid_count,
+                len(cleaned),
+            )
+            for position, sequence in enumerate(cleaned):
+                yield file_index, position, sequence, stage_names
+
+    records: Dict[int, Dict[int, DNASequence]] = defaultdict(dict)
+    analyse = partial(process_tagged_data, canonical=k_mer_mode == "canonical")
+    for file_index, position, record in imap_bounded(
+        pool, analyse, generate_tasks(), BATCH_MAX_IN_FLIGHT, BATCH_CHUNKSIZE
+    ):
+        records[file_index][position] = record
+
+    per_file = {}
+    for file_index, file_path in enumerate(file_paths):
+        total_count, valid_count, analysed_count = file_counts[file_index]
+        file_records = records[file_index]
+        per_file[file_path] = process_sequence_statistics(
+            data=[file_records[position] for position in range(analysed_count)],
+            total_count=total_count,
+            invalid_count=total_count - valid_count,
+        )
+        per_file[file_path]["k_mer_mode"] = k_mer_mode
+    combined = combine_sequence_statistics(per_file.values())
+    combined["k_mer_mode"] = k_mer_mode
+    return per_file, combined
+
+
+def main_batch(
+    source: str, executor: Optional[str] = None, k_mer_mode: str = "forward"
+):
+    start_time = time.time()
+    per_file, combined = process_files_parallel(
+        resolve_input_files(source), executor=executor, k_mer_mode=k_mer_mode
+    )
+    for file_path, seq_statistics in per_file.items():
+        print(file_path, seq_statistics)
+    print("Combined statistics:", combined)
+    print("Time taken using multiprocessing:", time.time() - start_time)
+
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "source", nargs="?", help="batch mode: directory, glob or manifest.txt"
+    )
+    parser.add_argument("--checkpoint", help="journal directory, see --resume")
+    parser.add_argument(
+        "--resume", action="store_true", help="skip chunks a killed run completed"
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=parse_size,
+        help="e.g. 8G: adapt workers and chunk size to stay within it",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=BACKENDS,
+        help="worker backend (default: thread if free-threaded, else process)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        nargs="?",
+        const=DEFAULT_BATCH_SIZE,
+        help="analyse same-length reads as NumPy matrices of this many reads",
+    )
+    parser.add_argument(
+        "--k-mer-mode",
+        choices=K_MER_MODES,
+        default="forward",
+        help="canonical counts a k-mer and its reverse complement together",
+    )
+    arguments = parser.parse_args(argv)
+    if arguments.source:
+        # Batch mode runs every file on one shared pool (process_files_parallel),
+        # which has no journal, governor or read matrices.
+        batch_unsupported = [
+            flag
+            for flag, value in (
+                ("--checkpoint/--resume", arguments.checkpoint or arguments.resume),
+                ("--memory-budget", arguments.memory_budget is not None),
+                ("--batch-size", arguments.batch_size),
+            )
+            if value
+        ]
+        if batch_unsupported:
+            parser.error(
+                f"{', '.join(batch_unsupported)} cannot be used with a batch source"
+            )
+    if arguments.resume and arguments.checkpoint is None:
+        arguments.checkpoint = DEFAULT_CHECKPOINT_DIR
+    if arguments.checkpoint and (
+        arguments.executor not in (None, "process")
+        or arguments.memory_budget is not None
+        or arguments.batch_size
+    ):
+        parser.error(
+            "--executor, --memory-budget and --batch-size cannot be used with "
+            "--checkpoint/--resume"
+        )
+    return arguments
+
+
+def main(arguments: argparse.Namespace) -> None:
     sequence_data = load_sequences_file(FILE_PATH)
     validate_partial = partial(
         validate_sequence, letter_list=NUCLEOTIDE_LIST, min_length=2
@@ -189,12 +860,36 @@ if __name__ == "__main__":
 
     # Using multiprocessing
     start_time = time.time()
-    results = process_data_parallel(cleaned_sequence_data)
+    results = process_data_parallel(
+        cleaned_sequence_data,
+        checkpoint_dir=arguments.checkpoint,
+        resume=arguments.resume,
+        memory_budget=arguments.memory_budget,
+        executor=arguments.executor,
+        batch_size=arguments.batch_size,
+        canonical=arguments.k_mer_mode == "canonical",
+    )
 
     seq_statistics = process_sequence_statistics(
         data=results, total_count=total_count, invalid_count=invalid_count
     )
+    seq_statistics["k_mer_mode"] = arguments.k_mer_mode
 
     print(seq_statistics)
     print("Results using multiprocessing:", results[0])
     print("Time taken using multiprocessing:", time.time() - start_time)
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    # Shows the memory governor's decisions.
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if arguments.source:
+        # Batch mode: python seq_analysis_multiprocess.py <directory|glob|manifest.txt>
+        main_batch(
+            arguments.source,
+            executor=arguments.executor,
+            k_mer_mode=arguments.k_mer_mode,
+        )
+    else:
+        main(arguments)
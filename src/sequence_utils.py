@@ -1,15 +1,21 @@
 from typing import Dict, List, Set
-from collections import defaultdict, Counter
+from collections import Counter
 from .data_types import (
     DNASequence,
     K_MERS,
-    NucleotideCount,
     NucleotideCounts,
     SequenceStatistics,
 )
+from .counting import (
+    GC_ISLAND_MOTIF,
+    MEMO_SIZE,
+    TATA_BOX_MOTIF,
+    count_k_mers,
+    count_nucleotides,
+    find_motif,
+)
+from .memoize import memoize
 
-GC_ISLAND_MOTIF = "CG"
-TATA_BOX_MOTIF = "TATA"
 MIN_PALINDROME_LENGTH = 20
 
 
@@ -26,19 +32,14 @@ def clean_sequence_data(
         if len(sequence) > min_length and all(
             letter in letter_list for letter in sequence
         ):
-            # Add to clean_list if not seen before
+            # Add to clean_list if not seen before (exact duplicates only,
+            # see utils/sketch.py for near-identical reads)
             if sequence not in clean_list:
                 clean_list.append(sequence)
 
     return clean_list
 
 
-def find_motif(sequence: str, motif: str) -> List[str]:
-    return [
-        i for i in range(len(sequence) - 1) if sequence[i : i + len(motif)] == motif
-    ]
-
-
 def reverse_complement(seq):
     """Returns the reverse complement of a DNA sequence."""
     complement = {"A": "T", "T": "A", "C": "G", "G": "C"}
@@ -50,6 +51,7 @@ def precompute_reverse_complement(sequence):
     return reverse_complement(sequence)
 
 
+@memoize(maxsize=MEMO_SIZE, copy_result=dict)
 def find_longest_dna_palindrome(sequence, min_length=20):
     """Finds all palindromes in a DNA sequence of at least min_length using precomputed reverse complement."""
     longest = {"palindrome_seq": "", "palindrome_length": 0}
@@ -72,10 +74,6 @@ def find_longest_dna_palindrome(sequence, min_length=20):
     return longest
 
 
-def count_nucleotides(sequence: str) -> NucleotideCount:
-    return defaultdict(int, Counter(sequence.lower().strip()))
-
-
 def update_nucleotide_counts(
     nucleotide_counts: NucleotideCounts, sequence_stats: SequenceStatistics
 ) -> SequenceStatistics:
@@ -86,6 +84,8 @@ def update_nucleotide_counts(
     return sequence_stats
 
 
+# utils/read_matrix.py builds the same records for many same-length reads
+# at once.
 def create_dna_sequence_record(
     id: int,
     nucleotide_counts: NucleotideCounts,
@@ -111,20 +111,6 @@ def create_dna_sequence_record(
     )
 
 
-def count_k_mers(sequence, number_nucleotides) -> Dict[str, int]:
-    oligo_counts = defaultdict(int)
-    sequence = sequence.lower().strip()
-    sequence_length = len(sequence)
-    if sequence_length < number_nucleotides:
-        return {}
-    for i, _ in enumerate(sequence[: -(number_nucleotides - 1)]):
-        key = sequence[i : i + number_nucleotides]
-        oligo_counts[key] += 1
-    return dict(
-        sorted(oligo_counts.items(), key=lambda item: item[1], reverse=True)[:5]
-    )
-
-
 def update_k_mer_counts(current_counts: dict, new_counts: dict) -> Dict:
     current_counts = Counter(current_counts)
     current_counts.update(new_counts)
@@ -11,7 +11,17 @@ class TemperatureConverter:
     def celsius_to_fahrenheit(celsius):
         return (celsius * 9/5) + 32
 
+    @staticmethod
+    def celsius_to_fahrenheit_batch(celsius, out=None):
+        # Whole buffers (array, memoryview, NumPy) in one vectorized pass,
+        # see utils/temperature.py
+        from utils.temperature import celsius_to_fahrenheit_batch
+
+        return celsius_to_fahrenheit_batch(celsius, out=out)
+
 
 # Usage
 fahrenheit = TemperatureConverter.celsius_to_fahrenheit(0)
 print(fahrenheit)  # Output: 32.0
+print(TemperatureConverter.celsius_to_fahrenheit_batch([0, 100]))
+# Output: array('d', [32.0, 212.0])
@@ -0,0 +1,170 @@
+from array import array
+from typing import Dict, Iterable, List, NamedTuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, Python int bitsets are used instead
+    np = None
+
+# Approximate motif search, e.g. TATA boxes with a base changed.
+# find_motif compares the motif at every offset in Python. Here:
+#   find_motifs_mismatches  up to k substitutions (Hamming distance). All
+#       offsets are tested at once: for each motif position j, a bitset
+#       (a Python int, bit i = offset i) or NumPy bool array marks the
+#       offsets where sequence[i + j] == motif[j]. Summing the m bitsets
+#       with a bit-sliced counter gives every offset's match count, so
+#       the Python loop runs m * log(m) times, not len(sequence) times.
+#   find_motifs_edit_distance  up to k substitutions, insertions or
+#       deletions, using Myers' bit-vector algorithm: the whole column of
+#       the edit distance table is one Python int, updated with a dozen
+#       integer operations per base of the sequence.
+# Both take several motifs and return, per motif, the positions found and
+# their distances as compact arrays. Mismatch positions are match starts;
+# edit distance positions are match ends (exclusive), because with
+# insertions and deletions a match can start at several offsets.
+
+BASES = "ACGT"
+
+
+class MotifHits(NamedTuple):
+    positions: array
+    distances: array
+
+
+def base_bitsets(sequence: str) -> Dict[str, int]:
+    """Maps each base to an int with bit i set where sequence[i] is that base."""
+    data = sequence.upper().encode("ascii")
+    bitsets = {}
+    for base in BASES:
+        table = bytearray(b"0" * 256)
+        table[ord(base)] = ord("1")
+        # int() reads the most significant bit first, so reverse.
+        bits = data.translate(table)[::-1]
+        bitsets[base] = int(bits, 2) if bits else 0
+    return bitsets
+
+
+def set_bit_positions(bits: int) -> List[int]:
+    positions = []
+    text = bin(bits)[:1:-1]
+    i = text.find("1")
+    while i != -1:
+        positions.append(i)
+        i = text.find("1", i + 1)
+    return positions
+
+
+def _count_planes(bitsets: Iterable[int]) -> List[int]:
+    # Bit-sliced counter: planes[b] holds bit b of every offset's count.
+    planes: List[int] = []
+    for carry in bitsets:
+        for b, plane in enumerate(planes):
+            planes[b], carry = plane ^ carry, plane & carry
+            if not carry:
+                break
+        if carry:
+            planes.append(carry)
+    return planes
+
+
+def _equals(planes: List[int], value: int, valid: int) -> int:
+    """Offsets (within valid) whose count is exactly value."""
+    if value >> len(planes):
+        return 0
+    result = valid
+    for b, plane in enumerate(planes):
+        result &= plane if value >> b & 1 else ~plane
+    return result
+
+
+def _mismatches_bitsets(
+    bitsets: Dict[str, int], length: int, motif: str, max_mismatches: int
+) -> MotifHits:
+    size = len(motif)
+    valid = (1 << (length - size + 1)) - 1
+    planes = _count_planes(
+        bitsets.get(base, 0) >> j for j, base in enumerate(motif.upper())
+    )
+    positions, distances = array("I"), array("B")
+    hits = []
+    for distance in range(min(max_mismatches, size) + 1):
+        for position in set_bit_positions(_equals(planes, size - distance, valid)):
+            hits.append((position, distance))
+    hits.sort()
+    positions.extend(position for position, _ in hits)
+    distances.extend(distance for _, distance in hits)
+    return MotifHits(positions, distances)
+
+
+def _mismatches_numpy(codes, motif: str, max_mismatches: int) -> MotifHits:
+    size = len(motif)
+    offsets = len(codes) - size + 1
+    matches = np.zeros(offsets, dtype=np.uint16)
+    for j, base in enumerate(motif.upper().encode("ascii")):
+        matches += codes[j : j + offsets] == base
+    mismatches = size - matches.astype(np.int32)
+    found = np.flatnonzero(mismatches <= max_mismatches)
+    return MotifHits(
+        array("I", found.astype(np.uint32).tobytes()),
+        array("B", mismatches[found].astype(np.uint8).tobytes()),
+    )
+
+
+def find_motifs_mismatches(
+    sequence: str, motifs: Iterable[str], max_mismatches: int = 1
+) -> Dict[str, MotifHits]:
+    """Start positions of each motif with at most max_mismatches substitutions."""
+    motifs = [motif for motif in motifs if 0 < len(motif) <= len(sequence)]
+    results = {}
+    if np is not None:
+        codes = np.frombuffer(sequence.upper().encode("ascii"), dtype=np.uint8)
+        for motif in motifs:
+            results[motif] = _mismatches_numpy(codes, motif, max_mismatches)
+        return results
+    bitsets = base_bitsets(sequence)
+    for motif in motifs:
+        results[motif] = _mismatches_bitsets(
+            bitsets, len(sequence), motif, max_mismatches
+        )
+    return results
+
+
+def _edit_distance_hits(sequence: str, motif: str, max_distance: int) -> MotifHits:
+    size = len(motif)
+    mask = (1 << size) - 1
+    high = 1 << (size - 1)
+    peq: Dict[str, int] = {}
+    for j, base in enumerate(motif.upper()):
+        peq[base] = peq.get(base, 0) | 1 << j
+    pv, mv, score = mask, 0, size
+    positions, distances = array("I"), array("B")
+    for i, base in enumerate(sequence.upper()):
+        eq = peq.get(base, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        # Searching: a match may start anywhere, so no 1 is shifted in.
+        ph = (ph << 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+        if score <= max_distance:
+            positions.append(i + 1)
+            distances.append(score)
+    return MotifHits(positions, distances)
+
+
+def find_motifs_edit_distance(
+    sequence: str, motifs: Iterable[str], max_distance: int = 1
+) -> Dict[str, MotifHits]:
+    """End positions (exclusive) of each motif within max_distance edits."""
+    return {
+        motif: _edit_distance_hits(sequence, motif, max_distance)
+        for motif in motifs
+        if motif
+    }
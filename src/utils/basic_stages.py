@@ -0,0 +1,63 @@
+from typing import Dict, List
+
+from .counting import (
+    GC_ISLAND_MOTIF,
+    TATA_BOX_MOTIF,
+    count_k_mers,
+    count_nucleotides,
+    find_motif,
+)
+from .stages import AnalysisStage
+
+# The cheap stages, registered in utils/stages.py STAGE_PATHS. They import
+# utils/counting.py rather than sequence_utils, which holds the palindrome
+# code.
+
+
+class NucleotideStage(AnalysisStage, stage_name="nucleotides"):
+    def run(self, sequence: str) -> Dict[str, int]:
+        return count_nucleotides(sequence=sequence)
+
+
+class KMerStage(AnalysisStage, stage_name="k_mers"):
+    k_mer_sizes = (2, 3, 4, 5)
+    canonical = False
+
+    def run(self, sequence: str) -> Dict[str, Dict[str, int]]:
+        return {
+            f"k_mer_n{k}_count": count_k_mers(
+                sequence=sequence, number_nucleotides=k, canonical=self.canonical
+            )
+            for k in self.k_mer_sizes
+        }
+
+
+class CanonicalKMerStage(KMerStage, stage_name="canonical_k_mers"):
+    canonical = True
+
+
+class MotifStage(AnalysisStage, stage_name="motifs"):
+    def run(self, sequence: str) -> Dict[str, List[int]]:
+        return {
+            "cpg_islands": find_motif(sequence=sequence, motif=GC_ISLAND_MOTIF),
+            "tata_boxes": find_motif(sequence=sequence, motif=TATA_BOX_MOTIF),
+        }
+
+
+class CpGStage(AnalysisStage, stage_name="cpg"):
+    """CpG dinucleotide count and observed / expected ratio.
+
+    observed / expected is cpg_count * length / (c * g) (Gardiner-Garden and
+    Frommer); CpG islands have a ratio above about 0.6, bulk DNA much lower.
+    """
+
+    def run(self, sequence: str) -> Dict[str, float]:
+        sequence = sequence.upper()
+        cpg_count = sequence.count(GC_ISLAND_MOTIF)
+        expected = sequence.count("C") * sequence.count("G")
+        return {
+            "cpg_count": cpg_count,
+            "cpg_observed_expected": (
+                cpg_count * len(sequence) / expected if expected else 0.0
+            ),
+        }
@@ -0,0 +1,144 @@
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Mapping
+
+from .top_k import TOP_K, top_k_items
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the rank table is a list instead
+    np = None
+
+# Canonical (strand independent) k-mers.
+# A read can come from either strand of the DNA, so a k-mer and its
+# reverse complement (ACG and CGT) are the same sequence read from the
+# two ends. Canonical counting counts both as min(kmer, revcomp(kmer)).
+# With the 2-bit codes A=0, C=1, G=2, T=3 comparing codes is comparing the
+# strings, and both codes are rolled along the read together:
+#   forward  (forward << 2 | base) & mask
+#   reverse  reverse >> 2 | (3 - base) << 2 * (k - 1)
+# so no reverse complement string is built per position.
+# There are (4**k + 4**(k / 2)) / 2 canonical k-mers for even k (the
+# k-mers that are their own reverse complement count once) and 4**k / 2
+# for odd k, so a dense count array indexed by canonical_ranks(k) is about
+# half the size of one indexed by the forward code.
+
+BASE_CODES = {"A": 0, "C": 1, "G": 2, "T": 3}
+BASES = "ACGT"
+K_MER_MODES = ("forward", "canonical")
+_COMPLEMENT = str.maketrans("acgt", "tgca")
+_DROP_BASES = str.maketrans("", "", "acgt")
+
+
+def reverse_complement_code(code: int, k: int) -> int:
+    reverse = 0
+    for _ in range(k):
+        reverse = reverse << 2 | (3 - (code & 3))
+        code >>= 2
+    return reverse
+
+
+def canonical_code(code: int, k: int) -> int:
+    return min(code, reverse_complement_code(code, k))
+
+
+def decode_code(code: int, k: int) -> str:
+    """Lower case k-mer of a 2-bit code, as count_k_mers reports them."""
+    return "".join(BASES[(code >> (2 * (k - 1 - i))) & 3] for i in range(k)).lower()
+
+
+def canonical_k_mer(k_mer: str) -> str:
+    """The smaller of a lower case k-mer and its reverse complement."""
+    return min(k_mer, k_mer.translate(_COMPLEMENT)[::-1])
+
+
+def canonicalize_counts(counts: Mapping[str, int]) -> Dict[str, int]:
+    """Folds forward (lower case) k-mer counts into canonical counts.
+
+    Keeps the order of first occurrence, so merged window counts (see
+    utils/windows.py) tie break as count_canonical_k_mers does.
+    """
+    canonical: Dict[str, int] = {}
+    for k_mer, count in counts.items():
+        if k_mer.translate(_DROP_BASES):
+            continue
+        key = canonical_k_mer(k_mer)
+        canonical[key] = canonical.get(key, 0) + count
+    return canonical
+
+
+def iter_canonical_k_mer_codes(sequence: str, k: int) -> Iterator[int]:
+    """Yields the canonical code of every k-mer, skipping any containing non ACGT."""
+    window_mask = (1 << (2 * k)) - 1
+    shift = 2 * (k - 1)
+    forward = reverse = 0
+    valid = 0
+    for base in sequence.upper():
+        base_code = BASE_CODES.get(base)
+        if base_code is None:
+            valid = 0
+            continue
+        forward = (forward << 2 | base_code) & window_mask
+        reverse = reverse >> 2 | (3 - base_code) << shift
+        valid += 1
+        if valid >= k:
+            yield forward if forward <= reverse else reverse
+
+
+def num_canonical_k_mers(k: int) -> int:
+    return (4**k + (4 ** (k // 2) if k % 2 == 0 else 0)) // 2
+
+
+@lru_cache(maxsize=None)
+def canonical_ranks(k: int):
+    """Forward code -> index of its canonical k-mer in a dense count array.
+
+    Canonical k-mers are ranked in code order, so rank r of the array
+    belongs to the r-th smallest canonical code (see canonical_codes).
+    """
+    if np is None:
+        rank = {code: r for r, code in enumerate(canonical_codes(k))}
+        return [rank[canonical_code(code, k)] for code in range(4**k)]
+    codes = np.arange(4**k, dtype=np.int64)
+    reverse = np.zeros_like(codes)
+    for i in range(k):
+        reverse = reverse << 2 | (3 - (codes >> (2 * i) & 3))
+    smallest = np.minimum(codes, reverse)
+    return np.cumsum(codes <= reverse)[smallest] - 1
+
+
+@lru_cache(maxsize=None)
+def canonical_codes(k: int) -> List[int]:
+    """Rank -> canonical code, the inverse of canonical_ranks."""
+    return [code for code in range(4**k) if canonical_code(code, k) == code]
+
+
+def count_canonical_k_mers(
+    sequence: str, number_nucleotides: int, limit: int = TOP_K
+) -> Dict[str, int]:
+    """count_k_mers, but each k-mer counted together with its reverse complement.
+
+    Keys are the canonical k-mers; k-mers containing letters other than
+    ACGT are skipped.
+    """
+    k = number_nucleotides
+    sequence = sequence.strip()
+    if len(sequence) < k:
+        return {}
+    counts = defaultdict(int)
+    for code in iter_canonical_k_mer_codes(sequence, k):
+        counts[code] += 1
+    return {decode_code(code, k): count for code, count in top_k_items(counts, limit)}
+
+
+def dense_canonical_counts(sequences: Iterable[str], k: int):
+    """Counts of every canonical k-mer over sequences, indexed by rank."""
+    ranks = canonical_ranks(k)
+    if np is None:
+        counts = [0] * num_canonical_k_mers(k)
+    else:
+        counts = np.zeros(num_canonical_k_mers(k), dtype=np.int64)
+    for sequence in sequences:
+        for code in iter_canonical_k_mer_codes(sequence, k):
+            counts[ranks[code]] += 1
+    return counts
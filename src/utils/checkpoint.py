@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+from typing import Any, Dict, Iterable, List, Set
+
+# On-disk journal for long runs, so a killed run can resume where it
+# stopped instead of starting again.
+# The input is split into numbered chunks. When a chunk finishes, its
+# records are pickled to chunk-<id>.pkl and its totals are added to the
+# merged partial statistics. Every CHECKPOINT_INTERVAL seconds journal.json
+# is rewritten with the completed chunk ids and those totals.
+# Every file is written to a temporary name and moved into place with
+# os.replace, so a crash mid-write leaves the previous version intact;
+# a chunk only counts as done once the journal lists it.
+# The journal records a fingerprint of the input and chunk size, and
+# resuming against different input raises ValueError.
+
+JOURNAL_NAME = "journal.json"
+CHECKPOINT_INTERVAL = 30.0
+STATISTICS_KEYS = (
+    "total_adenine_count",
+    "total_thymine_count",
+    "total_guanine_count",
+    "total_cytosine_count",
+    "total_sequences_count",
+)
+
+
+def fingerprint_sequences(
+    sequences: Iterable[str], chunk_size: int, k_mer_mode: str = "forward"
+) -> str:
+    # Forward runs keep the fingerprint they had before k-mer modes existed.
+    settings = (
+        str(chunk_size) if k_mer_mode == "forward" else f"{chunk_size} {k_mer_mode}"
+    )
+    digest = hashlib.sha256(settings.encode())
+    for sequence in sequences:
+        digest.update(sequence.encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class CheckpointJournal:
+    def __init__(
+        self,
+        directory: str,
+        fingerprint: str,
+        resume: bool = False,
+        interval: float = CHECKPOINT_INTERVAL,
+    ) -> None:
+        self.directory = directory
+        self.fingerprint = fingerprint
+        self.interval = interval
+        self.completed: Set[int] = set()
+        self.statistics: Dict[str, int] = dict.fromkeys(STATISTICS_KEYS, 0)
+        self._last_flush = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        journal_path = os.path.join(directory, JOURNAL_NAME)
+        if resume and os.path.exists(journal_path):
+            with open(journal_path) as f:
+                journal = json.load(f)
+            if journal["fingerprint"] != fingerprint:
+                raise ValueError(
+                    f"Checkpoint in {directory} was written for different input"
+                )
+            self.completed = set(journal["completed"])
+            self.statistics = journal["statistics"]
+
+    def _chunk_path(self, chunk_id: int) -> str:
+        return os.path.join(self.directory, f"chunk-{chunk_id:06d}.pkl")
+
+    def record(self, chunk_id: int, records: List[Any]) -> None:
+        """Saves a finished chunk's records and adds them to the totals."""
+        if chunk_id in self.completed:
+            return
+        write_atomic(self._chunk_path(chunk_id), pickle.dumps(records))
+        self.completed.add(chunk_id)
+        for record in records:
+            self.statistics["total_adenine_count"] += record.adenine_count
+            self.statistics["total_thymine_count"] += record.thymine_count
+            self.statistics["total_guanine_count"] += record.guanine_count
+            self.statistics["total_cytosine_count"] += record.cytosine_count
+        self.statistics["total_sequences_count"] += len(records)
+        if time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        journal = {
+            "fingerprint": self.fingerprint,
+            "completed": sorted(self.completed),
+            "statistics": self.statistics,
+        }
+        write_atomic(
+            os.path.join(self.directory, JOURNAL_NAME), json.dumps(journal).encode()
+        )
+        self._last_flush = time.monotonic()
+
+    def load_chunk(self, chunk_id: int) -> List[Any]:
+        with open(self._chunk_path(chunk_id), "rb") as f:
+            return pickle.load(f)
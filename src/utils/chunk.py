@@ -1,19 +1,99 @@
-from typing import Any, Dict, Optional
+from array import array
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
 from dataclasses import dataclass, field
 
+Source = Union[str, bytes, bytearray, memoryview]
+DEFAULT_CHUNK_SIZE = 1000
 
-@dataclass
+
+# slots=True drops the per instance __dict__, and the document only keeps
+# a reference to the source plus its span, so building one copies nothing.
+@dataclass(slots=True)
 class Document:
-    id: str = field(default="")
-    content: Optional[str] = field(default=None)
+    id: int = field(default=0)
+    source: Optional[Source] = field(default=None)
+    start: int = field(default=0)
+    end: int = field(default=0)
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+    @property
+    def content(self) -> Optional[Source]:
+        """The chunk, sliced from the source only when it is read."""
+        if self.source is None:
+            return None
+        return self.source[self.start : self.end]
+
+
+def _stride(size: int, overlap: int, stride: Optional[int]) -> int:
+    stride = size - overlap if stride is None else stride
+    if size <= 0 or stride <= 0:
+        raise ValueError("size and stride must be positive (overlap < size)")
+    return stride
+
 
 class Chunker:
-    def chunk(self, text: str, metadata: Dict[str:Any] = None, overlap: int = 0):
-        for i in range(len(text) - overlap + 1):
-            doc = Document()
-            doc.id = i
-            doc.content = text[i : i + overlap]
-            doc.metadata = metadata if metadata else {}
-            yield doc
+    def chunk(
+        self,
+        text: Source,
+        metadata: Dict[str, Any] = None,
+        size: int = DEFAULT_CHUNK_SIZE,
+        overlap: int = 0,
+        stride: Optional[int] = None,
+    ) -> Iterator[Document]:
+        """Yields windows of size characters, each starting stride after the last.
+
+        stride defaults to size - overlap. bytes-like text is wrapped in a
+        memoryview so reading a document's content does not copy it either.
+        overlap used to be the window size, with a stride of 1; that is now
+        size=n, stride=1.
+        """
+        if isinstance(text, (bytes, bytearray)):
+            text = memoryview(text)
+        metadata = metadata if metadata else {}
+        for index, (start, end) in enumerate(
+            self.spans(len(text), size, overlap, stride)
+        ):
+            yield Document(index, text, start, end, metadata)
+
+    def spans(
+        self,
+        length: int,
+        size: int = DEFAULT_CHUNK_SIZE,
+        overlap: int = 0,
+        stride: Optional[int] = None,
+    ) -> Iterator[Tuple[int, int]]:
+        """Yields the (start, end) of every window over a text of length.
+
+        Each span is worked out as it is asked for, so nothing is built up
+        front; offsets() returns them all at once instead.
+        """
+        stride = _stride(size, overlap, stride)
+        for start in range(0, length, stride):
+            end = start + size
+            if end >= length:
+                yield start, length
+                return
+            yield start, end
+
+    def offsets(
+        self,
+        length: int,
+        size: int = DEFAULT_CHUNK_SIZE,
+        overlap: int = 0,
+        stride: Optional[int] = None,
+    ) -> Tuple[array, array]:
+        """Returns every window's start and end as two arrays, in one go.
+
+        Windows are [start, start + size), the last one is cut short at the
+        end of the text so that the whole text is covered.
+        """
+        stride = _stride(size, overlap, stride)
+        if length == 0:
+            return array("q"), array("q")
+        # Number of strides before a window reaches the end of the text, or
+        # the last start inside it when stride > size leaves gaps.
+        last = min(max(0, -(-(length - size) // stride)), (length - 1) // stride)
+        starts = array("q", range(0, last * stride + 1, stride))
+        ends = array("q", range(size, size + last * stride + 1, stride))
+        ends[-1] = min(ends[-1], length)
+        return starts, ends
@@ -0,0 +1,153 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
+# Transparent reading of compressed sequence files.
+# open_text() looks at the first bytes of the file (not its name) and
+# returns a text stream, decompressing on the fly, so the JSON streaming
+# parser and json.load read compressed input without a temporary copy:
+#   gzip, bz2, xz  decompressed by the standard library modules
+#   BGZF           block gzip (bgzip, samtools): a series of independent
+#                  gzip members of at most 64 KiB each, recording their
+#                  own size. Blocks are read in order and decompressed on a
+#                  thread pool (zlib releases the GIL), a bounded number
+#                  ahead of the reader.
+# A BGZF file is also a valid gzip file, so gzip.open() reads it too, just
+# on one core.
+
+GZIP_MAGIC = b"\x1f\x8b"
+BZIP2_MAGIC = b"BZh"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+COMPRESSED_SUFFIXES = (".gz", ".bgz", ".bz2", ".xz")
+# gzip header with FEXTRA set, then the BC subfield holding the block size.
+BGZF_HEADER = struct.Struct("<4sI2sH2sHH")
+BGZF_BLOCK_DATA = 65280
+BGZF_EOF = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """Returns "bgzf", "gzip", "bz2", "xz" or None for an uncompressed file."""
+    with open(path, "rb") as f:
+        start = f.read(BGZF_HEADER.size)
+    if start.startswith(GZIP_MAGIC):
+        return "bgzf" if _is_bgzf_header(start) else "gzip"
+    if start.startswith(BZIP2_MAGIC):
+        return "bz2"
+    if start.startswith(XZ_MAGIC):
+        return "xz"
+    return None
+
+
+def _is_bgzf_header(header: bytes) -> bool:
+    if len(header) < BGZF_HEADER.size:
+        return False
+    magic, _, _, extra_length, subfield, subfield_length, _ = BGZF_HEADER.unpack(header)
+    return (
+        magic[3] & 4 != 0
+        and extra_length == 6
+        and subfield == b"BC"
+        and subfield_length == 2
+    )
+
+
+def iter_bgzf_blocks(f) -> Iterator[bytes]:
+    """Yields each raw BGZF block (header included) of a binary file."""
+    while header := f.read(BGZF_HEADER.size):
+        if not _is_bgzf_header(header):
+            raise ValueError("Not a BGZF block (file corrupt or only gzip)")
+        block_size = BGZF_HEADER.unpack(header)[6] + 1
+        yield header + f.read(block_size - BGZF_HEADER.size)
+
+
+def inflate_bgzf_block(block: bytes) -> bytes:
+    data = zlib.decompress(block[BGZF_HEADER.size : -8], wbits=-15)
+    crc, size = struct.unpack("<II", block[-8:])
+    if len(data) != size or zlib.crc32(data) != crc:
+        raise ValueError("BGZF block failed its CRC check")
+    return data
+
+
+class BGZFReader(io.RawIOBase):
+    """Raw binary stream of a BGZF file, decompressing blocks in parallel."""
+
+    def __init__(self, path: str, workers: int = DEFAULT_WORKERS) -> None:
+        self._file = open(path, "rb")
+        self._blocks = iter_bgzf_blocks(self._file)
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        # Blocks submitted but not yet read, in file order.
+        self._pending = deque()
+        self._lookahead = 4 * workers
+        self._buffer = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def _fill(self) -> None:
+        while len(self._pending) < self._lookahead:
+            block = next(self._blocks, None)
+            if block is None:
+                break
+            self._pending.append(self._executor.submit(inflate_bgzf_block, block))
+
+    def readinto(self, target) -> int:
+        while not self._buffer:
+            self._fill()
+            if not self._pending:
+                return 0
+            self._buffer = memoryview(self._pending.popleft().result())
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            for future in self._pending:
+                future.cancel()
+            self._executor.shutdown()
+            self._file.close()
+        super().close()
+
+
+def open_binary(path: str, workers: int = DEFAULT_WORKERS):
+    compression = detect_compression(path)
+    if compression == "bgzf":
+        return io.BufferedReader(BGZFReader(path, workers), BGZF_BLOCK_DATA)
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "bz2":
+        return bz2.open(path, "rb")
+    if compression == "xz":
+        return lzma.open(path, "rb")
+    return open(path, "rb")
+
+
+def open_text(path: str, workers: int = DEFAULT_WORKERS):
+    """Opens a plain or compressed file for reading as text."""
+    return io.TextIOWrapper(open_binary(path, workers), encoding="utf-8")
+
+
+def write_bgzf(path: str, data: bytes, level: int = 6) -> None:
+    """Writes data as a BGZF file, e.g. for tests or to recompress input."""
+    with open(path, "wb") as f:
+        for start in range(0, len(data), BGZF_BLOCK_DATA):
+            chunk = data[start : start + BGZF_BLOCK_DATA]
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+            deflated = compressor.compress(chunk) + compressor.flush()
+            block_size = BGZF_HEADER.size + len(deflated) + 8
+            f.write(
+                BGZF_HEADER.pack(
+                    b"\x1f\x8b\x08\x04", 0, b"\x00\xff", 6, b"BC", 2, block_size - 1
+                )
+            )
+            f.write(deflated)
+            f.write(struct.pack("<II", zlib.crc32(chunk), len(chunk)))
+        f.write(BGZF_EOF)
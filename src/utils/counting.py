@@ -0,0 +1,48 @@
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+from .canonical import count_canonical_k_mers
+from .data_types import NucleotideCount
+from .memoize import memoize
+from .top_k import top_k_items
+
+# The cheap per-read counts: nucleotides, k-mers and exact motifs.
+# sequence_utils re-exports everything here; it lives apart so that the
+# stages in utils/basic_stages.py do not import the palindrome code.
+
+GC_ISLAND_MOTIF = "CG"
+TATA_BOX_MOTIF = "TATA"
+# Results cached per process by the pure per-read functions (here and in
+# sequence_utils), so a duplicated read (common in sequencing runs) is only
+# analysed once. Each call returns its own copy of the cached dict, so a
+# caller may modify it.
+MEMO_SIZE = 4096
+
+
+def find_motif(sequence: str, motif: str) -> List[str]:
+    # Exact matches only, see utils/approx_match.py for motifs with
+    # mismatches or indels.
+    return [
+        i for i in range(len(sequence) - 1) if sequence[i : i + len(motif)] == motif
+    ]
+
+
+def count_nucleotides(sequence: str) -> NucleotideCount:
+    return defaultdict(int, Counter(sequence.lower().strip()))
+
+
+@memoize(maxsize=MEMO_SIZE, copy_result=dict)
+def count_k_mers(sequence, number_nucleotides, canonical=False) -> Dict[str, int]:
+    # canonical counts a k-mer and its reverse complement together, see
+    # utils/canonical.py.
+    if canonical:
+        return count_canonical_k_mers(sequence, number_nucleotides)
+    oligo_counts = defaultdict(int)
+    sequence = sequence.lower().strip()
+    sequence_length = len(sequence)
+    if sequence_length < number_nucleotides:
+        return {}
+    for i, _ in enumerate(sequence[: -(number_nucleotides - 1)]):
+        key = sequence[i : i + number_nucleotides]
+        oligo_counts[key] += 1
+    return dict(top_k_items(oligo_counts, 5))
@@ -0,0 +1,254 @@
+import multiprocessing
+import queue
+import threading
+import time
+from collections import defaultdict
+from multiprocessing.util import Finalize
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+# An event bus built out from the EventHandler callable in call.py.
+# EventHandler runs (prints) synchronously inside the caller, so emitting
+# from a hot loop costs as much as handling. Here emit() only appends to a
+# bounded queue; a dispatcher thread delivers events to the handlers in
+# batches, calling each handler with a list of events once batch_size
+# events have built up or batch_interval seconds have passed.
+#
+# When the queue is full the policy decides what happens:
+#   DROP_NEWEST  the new event is discarded (emit never waits)
+#   DROP_OLDEST  the oldest queued event is discarded to make room
+#   BLOCK        emit waits for room (backpressure on the producer)
+#
+# Pool workers emit through one multiprocessing queue (a single pipe)
+# back to the parent bus. Each worker buffers its events and sends them a
+# batch at a time, so each pickle and pipe write covers many events. A
+# worker sends its buffer once batch_size events have built up, from a
+# flusher thread every batch_interval seconds, and when it exits. Leaving
+# a Pool's with-block terminates the workers without letting them exit,
+# so close and join the pool before the bus stops:
+#
+#     with EventBus() as bus:
+#         bus.subscribe("progress", print)
+#         with Pool(
+#             initializer=init_worker_events, initargs=(bus.process_queue,)
+#         ) as pool:
+#             ...           # in the worker: emit_event("progress", index)
+#             pool.close()
+#             pool.join()   # each worker sends what it still holds
+
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+MAX_QUEUE_SIZE = 10_000
+BATCH_SIZE = 100
+BATCH_INTERVAL = 0.05
+
+
+class Event(NamedTuple):
+    name: str
+    payload: Any
+    timestamp: float
+
+
+class EventBus:
+    def __init__(
+        self,
+        maxsize: int = MAX_QUEUE_SIZE,
+        batch_size: int = BATCH_SIZE,
+        batch_interval: float = BATCH_INTERVAL,
+        policy: str = DROP_NEWEST,
+    ) -> None:
+        if policy not in (DROP_NEWEST, DROP_OLDEST, BLOCK):
+            raise ValueError(f"Unknown queue policy {policy!r}")
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.policy = policy
+        self.dropped = 0
+        self.handler_errors = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._handlers: Dict[str, List[Callable[[List[Event]], Any]]] = defaultdict(
+            list
+        )
+        self._lock = threading.Lock()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._process_queue = None
+        self._listener: Optional[threading.Thread] = None
+
+    def subscribe(self, name: str, handler: Callable[[List[Event]], Any]) -> None:
+        """Registers a handler, called with a list of events named name."""
+        with self._lock:
+            self._handlers[name].append(handler)
+
+    def unsubscribe(self, name: str, handler: Callable[[List[Event]], Any]) -> None:
+        with self._lock:
+            self._handlers[name].remove(handler)
+
+    def emit(self, name: str, payload: Any = None) -> None:
+        self._put(Event(name, payload, time.time()))
+
+    def _put(self, event: Optional[Event]) -> None:
+        if self.policy == BLOCK or event is None:
+            self._queue.put(event)
+            return
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            if self.policy == DROP_OLDEST:
+                try:
+                    self._queue.get_nowait()
+                    self._queue.put_nowait(event)
+                except (queue.Empty, queue.Full):
+                    pass
+            self.dropped += 1
+
+    @property
+    def process_queue(self) -> multiprocessing.Queue:
+        """The queue pool workers send events through, see init_worker_events."""
+        if self._process_queue is None:
+            self._process_queue = multiprocessing.Queue()
+            self._listener = threading.Thread(
+                target=self._listen, name="event-bus-listener", daemon=True
+            )
+            self._listener.start()
+        return self._process_queue
+
+    def _listen(self) -> None:
+        # Workers send lists of events; None tells the listener to stop.
+        while (events := self._process_queue.get()) is not None:
+            for event in events:
+                self._put(event)
+
+    def start(self) -> "EventBus":
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(
+                target=self._dispatch, name="event-bus-dispatcher", daemon=True
+            )
+            self._dispatcher.start()
+        return self
+
+    def stop(self) -> None:
+        """Delivers everything already emitted, then stops the threads."""
+        if self._listener is not None:
+            self._process_queue.put(None)
+            self._listener.join()
+            self._listener = None
+        if self._dispatcher is not None:
+            self._put(None)
+            self._dispatcher.join()
+            self._dispatcher = None
+
+    def __enter__(self) -> "EventBus":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _dispatch(self) -> None:
+        pending: Dict[str, List[Event]] = defaultdict(list)
+        next_flush = time.monotonic() + self.batch_interval
+        running = True
+        while running:
+            try:
+                event = self._queue.get(timeout=max(0, next_flush - time.monotonic()))
+            except queue.Empty:
+                event = False
+            if event is None:
+                running = False
+            elif event:
+                batch = pending[event.name]
+                batch.append(event)
+                if len(batch) >= self.batch_size:
+                    self._deliver(event.name, pending.pop(event.name))
+            if not running or time.monotonic() >= next_flush:
+                for name in list(pending):
+                    self._deliver(name, pending.pop(name))
+                next_flush = time.monotonic() + self.batch_interval
+
+    def _deliver(self, name: str, events: List[Event]) -> None:
+        with self._lock:
+            handlers = list(self._handlers.get(name, ()))
+        for handler in handlers:
+            try:
+                handler(events)
+            except Exception:
+                # A failing handler must not stop delivery to the others.
+                self.handler_errors += 1
+
+
+class WorkerEmitter:
+    """Buffers events inside a pool worker and sends them to the bus in batches."""
+
+    def __init__(
+        self,
+        process_queue: multiprocessing.Queue,
+        batch_size: int = BATCH_SIZE,
+        batch_interval: float = BATCH_INTERVAL,
+    ) -> None:
+        self.process_queue = process_queue
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.buffer: List[Event] = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def emit(self, name: str, payload: Any = None) -> None:
+        with self._lock:
+            self.buffer.append(Event(name, payload, time.time()))
+            full = len(self.buffer) >= self.batch_size
+        if self._flusher is None:
+            self._start_flusher()
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            events, self.buffer = self.buffer, []
+        if events:
+            # Queue.put hands the pickling and pipe write to a feeder thread.
+            self.process_queue.put(events)
+
+    def close(self) -> None:
+        """Stops the flusher thread and sends the remaining events."""
+        self._stopped.set()
+        self.flush()
+
+    def _start_flusher(self) -> None:
+        self._flusher = threading.Thread(
+            target=self._flush_periodically, name="event-flusher", daemon=True
+        )
+        self._flusher.start()
+
+    def _flush_periodically(self) -> None:
+        # Sends events that would otherwise wait for a full batch, so an
+        # idle or slow worker still delivers within batch_interval.
+        while not self._stopped.wait(self.batch_interval):
+            self.flush()
+
+
+_worker_emitter: Optional[WorkerEmitter] = None
+
+
+def init_worker_events(
+    process_queue: multiprocessing.Queue,
+    batch_size: int = BATCH_SIZE,
+    batch_interval: float = BATCH_INTERVAL,
+) -> None:
+    """Pool initializer: connects this worker to EventBus.process_queue."""
+    global _worker_emitter
+    _worker_emitter = WorkerEmitter(process_queue, batch_size, batch_interval)
+    # Pool workers leave through os._exit, which skips atexit; multiprocessing
+    # still runs its finalizers. The priority puts this before the queue's
+    # own finalizers (10 and -5), which stop and join its feeder thread.
+    Finalize(_worker_emitter, _worker_emitter.close, exitpriority=20)
+
+
+def emit_event(name: str, payload: Any = None) -> None:
+    """Emits from a pool worker; does nothing if init_worker_events was not run."""
+    if _worker_emitter is not None:
+        _worker_emitter.emit(name, payload)
+
+
+def flush_events() -> None:
+    """Sends a worker's buffered events now, e.g. at the end of a task."""
+    if _worker_emitter is not None:
+        _worker_emitter.flush()
@@ -0,0 +1,162 @@
+import sys
+import threading
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+from typing import Callable, Iterable, Iterator, List, Optional
+
+# Pluggable executors for the analysis pipeline.
+# Every backend has the multiprocessing.Pool interface (map, imap,
+# imap_unordered, map_async, apply_async, close, join, context manager), so
+# the pipeline code is the same whichever one runs it:
+#   process  multiprocessing.Pool. Sequences and results are pickled to and
+#            from the workers and each worker is a separate interpreter, but
+#            it is the only backend that runs Python in parallel with the GIL.
+#   thread   multiprocessing.pool.ThreadPool. Workers share the caller's
+#            memory: sequences are passed by reference and nothing is
+#            pickled or spawned. On a free-threaded build (3.13t and later,
+#            sys._is_gil_enabled() is False) the threads run in parallel.
+#   inline   runs every task in the calling thread, in order. For debugging,
+#            profiling and tiny inputs where a pool costs more than it saves.
+# default_backend() picks thread on a free-threaded interpreter and process
+# otherwise.
+
+BACKENDS = ("process", "thread", "inline")
+# How often a throttled task generator checks whether its consumer is gone.
+STOP_POLL_INTERVAL = 0.1
+
+
+def gil_disabled() -> bool:
+    """True on a free-threaded build running without the GIL."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def default_backend() -> str:
+    return "thread" if gil_disabled() else "process"
+
+
+class InlineResult:
+    """AsyncResult of a task that has already run."""
+
+    def __init__(self, function: Callable, args=(), kwds=None) -> None:
+        try:
+            self._value, self._success = function(*args, **(kwds or {})), True
+        except Exception as exc:
+            self._value, self._success = exc, False
+
+    def ready(self) -> bool:
+        return True
+
+    def successful(self) -> bool:
+        return self._success
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        pass
+
+    def get(self, timeout: Optional[float] = None):
+        if not self._success:
+            raise self._value
+        return self._value
+
+
+class InlinePool:
+    """The Pool interface, running each task in the caller when submitted."""
+
+    def __init__(self, initializer: Optional[Callable] = None, initargs=()) -> None:
+        if initializer is not None:
+            initializer(*initargs)
+
+    def map(self, function: Callable, iterable: Iterable, chunksize=None) -> List:
+        return [function(item) for item in iterable]
+
+    def starmap(self, function: Callable, iterable: Iterable, chunksize=None) -> List:
+        return [function(*args) for args in iterable]
+
+    def imap(self, function: Callable, iterable: Iterable, chunksize=1) -> Iterator:
+        return map(function, iterable)
+
+    imap_unordered = imap
+
+    def map_async(self, function: Callable, iterable: Iterable, chunksize=None):
+        return InlineResult(self.map, (function, iterable))
+
+    def apply(self, function: Callable, args=(), kwds=None):
+        return function(*args, **(kwds or {}))
+
+    def apply_async(self, function: Callable, args=(), kwds=None) -> InlineResult:
+        return InlineResult(function, args, kwds)
+
+    def close(self) -> None:
+        pass
+
+    def join(self) -> None:
+        pass
+
+    def terminate(self) -> None:
+        pass
+
+    def __enter__(self) -> "InlinePool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.terminate()
+
+
+def create_pool(
+    backend: Optional[str] = None,
+    processes: Optional[int] = None,
+    initializer: Optional[Callable] = None,
+    initargs=(),
+):
+    """A Pool-like executor; backend is one of BACKENDS or None for the default."""
+    backend = backend or default_backend()
+    if backend == "process":
+        return Pool(processes, initializer, initargs)
+    if backend == "thread":
+        return ThreadPool(processes, initializer, initargs)
+    if backend == "inline":
+        return InlinePool(initializer, initargs)
+    raise ValueError(f"Unknown executor {backend!r}, expected one of {BACKENDS}")
+
+
+def imap_bounded(
+    pool, function: Callable, iterable: Iterable, max_in_flight: int, chunksize=1
+) -> Iterator:
+    """pool.imap_unordered, taking at most max_in_flight items ahead of the results.
+
+    Pool.imap_unordered hands the iterable to a task thread that pulls it as
+    fast as it can, so a generator that loads data is read to the end and
+    its items queued long before the workers reach them. Here each item
+    waits for a free slot, and each result handed back frees one.
+    """
+    if max_in_flight < chunksize:
+        # The task thread pulls a whole chunk before sending any of it.
+        raise ValueError(
+            f"max_in_flight ({max_in_flight}) must be at least chunksize ({chunksize})"
+        )
+    slots = threading.Semaphore(max_in_flight)
+    stopped = threading.Event()
+    items = iter(iterable)
+
+    def throttled() -> Iterator:
+        while True:
+            # Wait for a slot before pulling, so the next item is not even
+            # loaded until it can be sent. Give up if the consumer stopped,
+            # otherwise the pool's task thread would wait here forever.
+            while not slots.acquire(timeout=STOP_POLL_INTERVAL):
+                if stopped.is_set():
+                    return
+            if stopped.is_set():
+                return
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            yield item
+
+    try:
+        for result in pool.imap_unordered(function, throttled(), chunksize):
+            slots.release()
+            yield result
+    finally:
+        stopped.set()
@@ -0,0 +1,273 @@
+import mmap
+import struct
+from array import array
+from bisect import bisect_right
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the pure Python build is used instead
+    np = None
+
+# Suffix array + FM-index over a whole set of sequences.
+# The sequences are joined into one text with a "$" after each one:
+#   text = "ACGT$GGA$..."
+# and a suffix array (every suffix start, sorted) is built over it.
+# From the suffix array we get the Burrows-Wheeler transform (BWT) and
+# occurrence checkpoints, which let count() answer "how many times does
+# this pattern occur" in O(len(pattern)) steps, whatever the dataset size.
+# locate() then reads the matching rows of the suffix array and maps each
+# text offset back to a (sequence id, offset in sequence) pair.
+#
+# The index is saved as one flat file and load() memory-maps it, so it is
+# built once and opening it later costs next to nothing.
+
+SEPARATOR = b"$"
+# Occurrence counts are stored every OCC_STEP rows of the BWT, the rest is
+# counted on the fly (at most OCC_STEP bytes per lookup).
+OCC_STEP = 128
+MAGIC = b"FMI1"
+HEADER = struct.Struct("<4sIQQQ")
+
+
+def _suffix_array_python(text: bytes) -> array:
+    """Prefix doubling: sort suffixes by their first 1, 2, 4... characters."""
+    n = len(text)
+    # Start from ranks 0..sigma-1 rather than byte values, so every rank is
+    # below n and rank * (n + 1) + next rank cannot collide.
+    byte_rank = {byte: r for r, byte in enumerate(sorted(set(text)))}
+    rank = [byte_rank[byte] for byte in text]
+    suffix_array = list(range(n))
+    k = 1
+    while True:
+        # Rank of the next k characters, 0 if the suffix runs out first.
+        keys = [
+            rank[i] * (n + 1) + (rank[i + k] + 1 if i + k < n else 0) for i in range(n)
+        ]
+        suffix_array.sort(key=keys.__getitem__)
+        new_rank = [0] * n
+        for previous, current in zip(suffix_array, suffix_array[1:]):
+            new_rank[current] = new_rank[previous] + (keys[current] != keys[previous])
+        rank = new_rank
+        if rank[suffix_array[-1]] == n - 1:
+            return array("Q", suffix_array)
+        k *= 2
+
+
+def _suffix_array_numpy(text: bytes) -> array:
+    """Prefix doubling with each round done as one NumPy lexsort."""
+    n = len(text)
+    rank = np.frombuffer(text, dtype=np.uint8).astype(np.int64)
+    k = 1
+    while True:
+        second = np.full(n, -1, dtype=np.int64)
+        second[: n - k] = rank[k:]
+        suffix_array = np.lexsort((second, rank))
+        first_sorted, second_sorted = rank[suffix_array], second[suffix_array]
+        changed = (first_sorted[1:] != first_sorted[:-1]) | (
+            second_sorted[1:] != second_sorted[:-1]
+        )
+        rank = np.empty(n, dtype=np.int64)
+        rank[suffix_array] = np.concatenate(([0], np.cumsum(changed)))
+        if rank[suffix_array[-1]] == n - 1:
+            return array("Q", suffix_array.astype(np.uint64).tobytes())
+        k *= 2
+
+
+def build_suffix_array(text: bytes) -> array:
+    if np is not None and len(text) > 1:
+        return _suffix_array_numpy(text)
+    return _suffix_array_python(text)
+
+
+class FMIndex:
+    def __init__(
+        self,
+        text,
+        suffix_array,
+        bwt,
+        alphabet: bytes,
+        occ,
+        starts,
+        mapped: Optional[mmap.mmap] = None,
+    ) -> None:
+        self.text = text
+        self.suffix_array = suffix_array
+        self.bwt = bwt
+        self.alphabet = alphabet
+        self.occ = occ
+        self.starts = starts
+        self._mmap = mapped
+        # C[c] = number of characters in the text smaller than c.
+        # The last checkpoint row holds the totals for the whole BWT.
+        totals = occ[len(occ) - len(alphabet) :]
+        self._column = {char: column for column, char in enumerate(alphabet)}
+        self._smaller = {}
+        running = 0
+        for char, total in zip(alphabet, totals):
+            self._smaller[char] = running
+            running += total
+
+    @classmethod
+    def build(cls, sequences: Iterable[str]) -> "FMIndex":
+        """Builds the index over already validated sequences."""
+        starts = array("Q")
+        parts = []
+        offset = 0
+        for sequence in sequences:
+            starts.append(offset)
+            encoded = sequence.upper().encode("ascii")
+            parts.append(encoded)
+            offset += len(encoded) + 1
+        text = SEPARATOR.join(parts) + SEPARATOR
+
+        suffix_array = build_suffix_array(text)
+        # BWT[i] is the character before the i'th smallest suffix.
+        bwt = bytes(text[position - 1] for position in suffix_array)
+
+        alphabet = bytes(sorted(set(text)))
+        sigma = len(alphabet)
+        occ = array("Q")
+        running = [0] * sigma
+        for start in range(0, len(bwt), OCC_STEP):
+            occ.extend(running)
+            block = bwt[start : start + OCC_STEP]
+            for column, char in enumerate(alphabet):
+                running[column] += block.count(char)
+        occ.extend(running)
+        return cls(text, suffix_array, bwt, alphabet, occ, starts)
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    MAGIC,
+                    len(self.alphabet),
+                    len(self.text),
+                    len(self.occ),
+                    len(self.starts),
+                )
+            )
+            # Pad the alphabet so the integer sections stay 8 byte aligned.
+            f.write(
+                bytes(self.alphabet).ljust(8 * (len(self.alphabet) // 8 + 1), b"\0")
+            )
+            for section in (self.suffix_array, self.occ, self.starts):
+                f.write(memoryview(section).cast("B"))
+            f.write(self.text)
+            f.write(self.bwt)
+
+    @classmethod
+    def load(cls, path: str) -> "FMIndex":
+        """Memory-maps an index written by save()."""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, sigma, text_length, occ_length, num_sequences = HEADER.unpack_from(
+            mapped
+        )
+        if magic != MAGIC:
+            mapped.close()
+            raise ValueError(f"{path} is not an FM-index file")
+        view = memoryview(mapped)
+        position = HEADER.size
+        alphabet = bytes(view[position : position + sigma])
+        position += 8 * (sigma // 8 + 1)
+        sections = []
+        for count in (text_length, occ_length, num_sequences):
+            sections.append(view[position : position + count * 8].cast("Q"))
+            position += count * 8
+        suffix_array, occ, starts = sections
+        text = view[position : position + text_length]
+        bwt = view[position + text_length : position + 2 * text_length]
+        return cls(text, suffix_array, bwt, alphabet, occ, starts, mapped=mapped)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _occurrences(self, char: int, row: int) -> int:
+        """Number of times char appears in bwt[:row]."""
+        checkpoint = row // OCC_STEP
+        column = self._column[char]
+        counted = self.occ[checkpoint * len(self.alphabet) + column]
+        return counted + bytes(self.bwt[checkpoint * OCC_STEP : row]).count(char)
+
+    def _suffix_range(self, pattern: str) -> Tuple[int, int]:
+        """Backward search: the rows of the suffix array starting with pattern."""
+        low, high = 0, len(self.bwt)
+        for char in reversed(pattern.upper().encode("ascii")):
+            if char not in self._column:
+                return 0, 0
+            low = self._smaller[char] + self._occurrences(char, low)
+            high = self._smaller[char] + self._occurrences(char, high)
+            if low >= high:
+                return 0, 0
+        return low, high
+
+    def count(self, pattern: str) -> int:
+        """How many times pattern occurs across all sequences."""
+        if not pattern:
+            return 0
+        low, high = self._suffix_range(pattern)
+        return high - low
+
+    def locate(self, pattern: str) -> List[Tuple[int, int]]:
+        """Every (sequence id, offset) where pattern occurs, in sequence order."""
+        if not pattern:
+            return []
+        low, high = self._suffix_range(pattern)
+        hits = []
+        for row in range(low, high):
+            position = self.suffix_array[row]
+            sequence_id = bisect_right(self.starts, position) - 1
+            hits.append((sequence_id, position - self.starts[sequence_id]))
+        return sorted(hits)
+
+    def longest_repeat(self) -> Tuple[str, List[Tuple[int, int]]]:
+        """The longest substring occurring at least twice, and where it occurs.
+
+        Uses Kasai's algorithm to get the longest common prefix (LCP) of
+        neighbouring suffixes; the largest LCP is the longest repeat.
+        """
+        text, suffix_array = bytes(self.text), self.suffix_array
+        n = len(text)
+        rank = [0] * n
+        for row, position in enumerate(suffix_array):
+            rank[position] = row
+        best_length, best_row = 0, 0
+        common = 0
+        separator = SEPARATOR[0]
+        for position in range(n):
+            row = rank[position]
+            if row == 0:
+                common = 0
+                continue
+            other = suffix_array[row - 1]
+            while (
+                position + common < n
+                and other + common < n
+                and text[position + common] == text[other + common]
+                and text[position + common] != separator
+            ):
+                common += 1
+            if common > best_length:
+                best_length, best_row = common, row
+            if common:
+                common -= 1
+        if best_length == 0:
+            return "", []
+        start = suffix_array[best_row]
+        repeat = text[start : start + best_length].decode("ascii")
+        return repeat, self.locate(repeat)
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            for view in (self.suffix_array, self.occ, self.starts, self.text, self.bwt):
+                view.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "FMIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,305 @@
+import logging
+import os
+import re
+import time
+from multiprocessing import Pipe, Process, SimpleQueue
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Memory governed worker pool.
+# Pool(processes=n) fixes the worker count up front and never looks at
+# memory, so a few large inputs can push the node into the OOM killer.
+# GovernedPool is given a memory budget and, after every result, measures
+# the memory of the parent and each worker from /proc/<pid>/smaps_rollup.
+# Forked workers share the parent's pages copy on write, and RSS counts a
+# shared page in full in every process that maps it, so summing RSS counts
+# the parent's memory once per worker. Instead:
+#   total       the sum of every process's Pss (a page shared by n
+#               processes counts 1/n in each), i.e. the real footprint
+#   per worker  Private_Clean + Private_Dirty, the memory that would be
+#               freed by stopping that worker
+# On kernels without smaps_rollup both fall back to RSS from statm.
+# The budget is then applied to the total:
+#   above HIGH_WATER of the budget  halve the chunk size, run one worker
+#                                   fewer
+#   below LOW_WATER of the budget   double the chunk size, one worker more
+#                                   (up to max_workers)
+#   over the budget                 stop the worker with the most private
+#                                   memory and run its chunk again later
+# Idle workers above the target are shut down, so lowering the target
+# frees their memory rather than just leaving them without work.
+# A worker whose private memory exceeds its share of the budget after a
+# task exits once its result is sent and a fresh one replaces it, like
+# maxtasksperchild but only for workers that have grown. A worker killed
+# from outside (OOM) has its chunk run again too.
+# Every decision is logged on the utils.governor logger.
+
+HIGH_WATER = 0.85
+LOW_WATER = 0.6
+MIN_CHUNK_SIZE = 1
+MAX_CHUNK_SIZE = 1024
+INITIAL_CHUNK_SIZE = 16
+MAX_CHUNK_RETRIES = 3
+POLL_INTERVAL = 0.2
+# Task id of a worker that is exiting to be recycled.
+RETIRING = -1
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_count() -> int:
+    """Half the CPUs as before, but at least one (cpu_count() // 2 is 0 on 1)."""
+    return max(1, (os.cpu_count() or 1) // 2)
+
+
+def parse_size(text: str) -> int:
+    """Parses a size such as "512M", "4GiB" or "1000000" into bytes."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)I?B?\s*", text.upper())
+    if match is None:
+        raise ValueError(f"Cannot parse memory size {text!r}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+def read_rss(pid: int) -> int:
+    """Resident set size of a process in bytes, 0 if it has exited."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (FileNotFoundError, ProcessLookupError):
+        return 0
+
+
+def read_memory(pid: int) -> Tuple[int, int]:
+    """(Pss, private) bytes of a process, (0, 0) if it has exited."""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if value.endswith("kB\n"):
+                    fields[name] = int(value.split()[0]) << 10
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        rss = read_rss(pid)
+        return rss, rss
+    if "Pss" not in fields:
+        rss = read_rss(pid)
+        return rss, rss
+    return fields["Pss"], fields["Private_Clean"] + fields["Private_Dirty"]
+
+
+def read_private(pid: int) -> int:
+    return read_memory(pid)[1]
+
+
+def _worker_loop(tasks, results: SimpleQueue) -> None:
+    pid = os.getpid()
+    while True:
+        task = tasks.recv()
+        if task is None:
+            return
+        task_id, function, items, memory_limit = task
+        try:
+            outcome = ("ok", [function(item) for item in items])
+        except Exception as exc:
+            outcome = ("error", exc)
+        private = read_private(pid)
+        # Recycle: the result says so, then this process exits.
+        recycle = private > memory_limit
+        results.put((pid, task_id, outcome, private, recycle))
+        if recycle:
+            return
+
+
+class GovernedPool:
+    def __init__(
+        self,
+        memory_budget: int,
+        max_workers: Optional[int] = None,
+        chunk_size: int = INITIAL_CHUNK_SIZE,
+    ) -> None:
+        self.memory_budget = memory_budget
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.target_workers = self.max_workers
+        self.chunk_size = chunk_size
+        self.recycled = 0
+        self._task_counter = 0
+        self._retries: Dict[Tuple[int, int], int] = {}
+        self._results = SimpleQueue()
+        # pid -> [process, task pipe, id of the task it is running or None]
+        self._workers: Dict[int, list] = {}
+
+    def worker_memory_limit(self) -> int:
+        return self.memory_budget // max(self.target_workers, 1)
+
+    def _start_worker(self) -> None:
+        receiver, sender = Pipe(duplex=False)
+        process = Process(
+            target=_worker_loop, args=(receiver, self._results), daemon=True
+        )
+        process.start()
+        receiver.close()
+        self._workers[process.pid] = [process, sender, None]
+
+    def _stop_worker(self, pid: int) -> None:
+        process, sender, _ = self._workers.pop(pid)
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        sender.close()
+
+    def _retire_idle_workers(self) -> None:
+        """Shuts down idle workers until at most target_workers are left."""
+        for pid, (_, sender, task_id) in list(self._workers.items()):
+            if len(self._workers) <= self.target_workers:
+                return
+            if task_id is None:
+                sender.send(None)
+                self._stop_worker(pid)
+                logger.info("Retired idle worker %d", pid)
+
+    def total_memory(self) -> int:
+        """Pss of the parent and every worker: shared pages counted once."""
+        pids = [os.getpid(), *self._workers]
+        return sum(read_memory(pid)[0] for pid in pids)
+
+    def _adjust(self, total: int) -> None:
+        if total > HIGH_WATER * self.memory_budget:
+            chunk_size = max(MIN_CHUNK_SIZE, self.chunk_size // 2)
+            workers = max(1, self.target_workers - 1)
+            if (chunk_size, workers) != (self.chunk_size, self.target_workers):
+                logger.info(
+                    "Memory %d MiB of %d MiB budget: chunk size %d -> %d, "
+                    "workers %d -> %d",
+                    total >> 20,
+                    self.memory_budget >> 20,
+                    self.chunk_size,
+                    chunk_size,
+                    self.target_workers,
+                    workers,
+                )
+                self.chunk_size, self.target_workers = chunk_size, workers
+        elif total < LOW_WATER * self.memory_budget:
+            chunk_size = min(MAX_CHUNK_SIZE, self.chunk_size * 2)
+            workers = min(self.max_workers, self.target_workers + 1)
+            if (chunk_size, workers) != (self.chunk_size, self.target_workers):
+                logger.info(
+                    "Memory %d MiB of %d MiB budget: chunk size %d -> %d, "
+                    "workers %d -> %d",
+                    total >> 20,
+                    self.memory_budget >> 20,
+                    self.chunk_size,
+                    chunk_size,
+                    self.target_workers,
+                    workers,
+                )
+                self.chunk_size, self.target_workers = chunk_size, workers
+
+    def _reap(self, tasks: Dict[int, Tuple[int, int]], todo: List) -> None:
+        """Removes exited workers, queueing the chunk of any that died mid-task."""
+        for pid, (process, _, task_id) in list(self._workers.items()):
+            # A recycled worker puts its result before exiting, so only
+            # reap once every result sent has been read.
+            if process.is_alive() or not self._results.empty():
+                continue
+            self._stop_worker(pid)
+            if task_id is None or task_id == RETIRING:
+                continue
+            span = tasks.pop(task_id)
+            self._retries[span] = self._retries.get(span, 0) + 1
+            if self._retries[span] > MAX_CHUNK_RETRIES:
+                raise RuntimeError(
+                    f"Items {span[0]}-{span[1]} killed their worker "
+                    f"{self._retries[span]} times"
+                )
+            logger.warning(
+                "Worker %d died on items %d-%d, running them again", pid, *span
+            )
+            todo.append(span)
+
+    def map(self, function: Callable, items: Sequence) -> List:
+        """Like Pool.map (results in input order) within the memory budget."""
+        results: List = [None] * len(items)
+        # (start, end) item ranges to run again after a worker was lost.
+        todo: List[Tuple[int, int]] = []
+        tasks: Dict[int, Tuple[int, int]] = {}
+        next_start = 0
+        done = 0
+        self._retries = {}
+        while done < len(items):
+            self._reap(tasks, todo)
+            self._retire_idle_workers()
+            while len(self._workers) < self.target_workers:
+                self._start_worker()
+
+            # Hand chunks to idle workers, at most target_workers in flight.
+            for worker in self._workers.values():
+                if len(tasks) >= self.target_workers:
+                    break
+                if worker[2] is not None:
+                    continue
+                if todo:
+                    span = todo.pop()
+                elif next_start < len(items):
+                    span = (next_start, min(next_start + self.chunk_size, len(items)))
+                    next_start = span[1]
+                else:
+                    break
+                self._task_counter += 1
+                tasks[self._task_counter] = span
+                worker[2] = self._task_counter
+                worker[1].send(
+                    (
+                        self._task_counter,
+                        function,
+                        items[span[0] : span[1]],
+                        self.worker_memory_limit(),
+                    )
+                )
+
+            deadline = time.monotonic() + POLL_INTERVAL
+            while self._results.empty() and time.monotonic() < deadline:
+                time.sleep(0.005)
+            while not self._results.empty():
+                pid, task_id, (status, value), private, recycle = self._results.get()
+                if pid in self._workers:
+                    self._workers[pid][2] = RETIRING if recycle else None
+                span = tasks.pop(task_id, None)
+                if span is None:
+                    # From a worker stopped for memory, its chunk is rerun.
+                    continue
+                if status == "error":
+                    raise value
+                results[span[0] : span[1]] = value
+                done += span[1] - span[0]
+                if recycle:
+                    self.recycled += 1
+                    logger.info("Recycling worker %d at %d MiB", pid, private >> 20)
+
+            total = self.total_memory()
+            if total > self.memory_budget and len(self._workers) > 1:
+                pid = max(self._workers, key=read_private)
+                logger.warning(
+                    "Memory %d MiB over the %d MiB budget, stopping worker %d",
+                    total >> 20,
+                    self.memory_budget >> 20,
+                    pid,
+                )
+                task_id = self._workers[pid][2]
+                self._stop_worker(pid)
+                if task_id in tasks:
+                    todo.append(tasks.pop(task_id))
+            self._adjust(total)
+        return results
+
+    def close(self) -> None:
+        for pid in list(self._workers):
+            if self._workers[pid][2] is None:
+                self._workers[pid][1].send(None)
+            self._stop_worker(pid)
+
+    def __enter__(self) -> "GovernedPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,57 @@
+import glob
+import json
+import os
+from typing import List, Set, TypedDict
+
+from .compressed import COMPRESSED_SUFFIXES, open_text
+
+# Input files of the analysis: finding them and loading their sequences.
+# Kept apart from seq_analysis_multiprocess so that commands which only
+# read sequences (seq-analysis index) import neither multiprocessing nor
+# the analysis stages.
+
+NUCLEOTIDE_LIST = {"A", "T", "G", "C"}
+# Batch mode: a manifest is a text file listing one input path per line.
+MANIFEST_SUFFIX = ".txt"
+# Files picked up from an input directory, plain or compressed.
+INPUT_PATTERNS = ("*.json",) + tuple(f"*.json{s}" for s in COMPRESSED_SUFFIXES)
+
+
+class DNASequenceData(TypedDict):
+    num_sequences: int
+    sequence_length: int
+    sequences: List[str]
+
+
+def load_sequences_file(file_path: str) -> DNASequenceData:
+    # Also reads .gz, .bz2, .xz and BGZF files, see utils/compressed.py.
+    with open_text(file_path) as f:
+        data = json.load(f)
+        return data
+
+
+def resolve_input_files(source: str) -> List[str]:
+    """Expands a directory, glob pattern or manifest file into input paths."""
+    if os.path.isdir(source):
+        return sorted(
+            path
+            for pattern in INPUT_PATTERNS
+            for path in glob.glob(os.path.join(source, pattern))
+        )
+    if source.endswith(MANIFEST_SUFFIX):
+        base_dir = os.path.dirname(source)
+        with open(source) as f:
+            lines = [line.strip() for line in f]
+        return [
+            os.path.join(base_dir, line)
+            for line in lines
+            if line and not line.startswith("#")
+        ]
+    return sorted(glob.glob(source))
+
+
+def is_valid_sequence(
+    sequence: str, letter_list: Set[str] = NUCLEOTIDE_LIST, min_length: int = 2
+) -> bool:
+    """validate_sequence without importing the analysis code."""
+    return len(sequence) > min_length and set(sequence) <= letter_list
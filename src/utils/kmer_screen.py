@@ -0,0 +1,214 @@
+import math
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+from heapq import merge
+from itertools import groupby
+from typing import Iterable, Iterator, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, bisect is used instead
+    np = None
+
+# Membership screening of reads against large reference k-mer sets
+# (vectors, adapters, contaminants).
+# A Python set of k-mer strings costs ~100 bytes per entry, so hundreds of
+# millions of entries do not fit. Each k-mer is instead packed into one
+# integer, 2 bits per base (k <= 32 fits in 64 bits), and stored either:
+#   SortedKMerSet  a sorted array of the codes, 8 bytes per k-mer, exact,
+#                  queried by binary search
+#   BloomFilter    a bit array, ~1.2 bytes per k-mer at a 1% false
+#                  positive rate, never a false negative
+# Both save to a flat file that load() memory-maps, so screening workers
+# share one copy of the reference in the page cache.
+#
+# screen_sequences() reports the fraction of each read's k-mers found.
+
+BASE_CODES = {"A": 0, "C": 1, "G": 2, "T": 3}
+MAX_K = 32
+SET_MAGIC = b"KSA1"
+BLOOM_MAGIC = b"KBF1"
+HEADER = struct.Struct("<4sIQQ")
+MASK_64 = (1 << 64) - 1
+# SortedKMerSet.build sorts and deduplicates the codes this many at a time,
+# so the duplicates of a large input are never all held at once.
+BUILD_CHUNK_CODES = 1 << 22
+
+
+def iter_k_mer_codes(sequence: str, k: int) -> Iterator[int]:
+    """Yields the 2-bit code of every k-mer, skipping any containing non ACGT."""
+    if not 0 < k <= MAX_K:
+        raise ValueError(f"k must be between 1 and {MAX_K}")
+    window_mask = (1 << (2 * k)) - 1
+    code = 0
+    valid = 0
+    for base in sequence.upper():
+        base_code = BASE_CODES.get(base)
+        if base_code is None:
+            valid = 0
+            continue
+        code = ((code << 2) | base_code) & window_mask
+        valid += 1
+        if valid >= k:
+            yield code
+
+
+def _map_file(path: str, magic: bytes):
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header = HEADER.unpack_from(mapped)
+    if header[0] != magic:
+        mapped.close()
+        raise ValueError(f"{path} is not a {magic.decode()} k-mer index")
+    return mapped, header
+
+
+def _sorted_unique(codes: array):
+    if np is not None:
+        return np.unique(np.frombuffer(codes, dtype=np.uint64))
+    return array("Q", (code for code, _ in groupby(sorted(codes))))
+
+
+def _merge_unique(chunks: List) -> array:
+    """One sorted array("Q") of the distinct codes of sorted unique chunks."""
+    if np is not None:
+        unique = chunks[0] if len(chunks) == 1 else np.unique(np.concatenate(chunks))
+        codes = array("Q")
+        codes.frombytes(unique.tobytes())
+        return codes
+    if len(chunks) == 1:
+        return chunks[0]
+    return array("Q", (code for code, _ in groupby(merge(*chunks))))
+
+
+class SortedKMerSet:
+    def __init__(self, k: int, codes, mapped: Optional[mmap.mmap] = None) -> None:
+        self.k = k
+        self.codes = codes
+        self._mmap = mapped
+        self._np_codes = (
+            np.frombuffer(codes, dtype=np.uint64) if np is not None else None
+        )
+
+    @classmethod
+    def build(cls, sequences: Iterable[str], k: int) -> "SortedKMerSet":
+        # Codes are gathered in a typed array (8 bytes each) rather than a
+        # set of ints (~60 bytes each), sorted and deduplicated per chunk,
+        # then the sorted chunks are merged.
+        chunks = []
+        pending = array("Q")
+        for sequence in sequences:
+            pending.extend(iter_k_mer_codes(sequence, k))
+            if len(pending) >= BUILD_CHUNK_CODES:
+                chunks.append(_sorted_unique(pending))
+                pending = array("Q")
+        chunks.append(_sorted_unique(pending))
+        return cls(k, _merge_unique(chunks))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code: int) -> bool:
+        i = bisect_left(self.codes, code)
+        return i < len(self.codes) and self.codes[i] == code
+
+    def contains_many(self, codes: List[int]) -> List[bool]:
+        """Batch membership test for a list of k-mer codes."""
+        if self._np_codes is not None and codes:
+            queries = np.array(codes, dtype=np.uint64)
+            positions = np.searchsorted(self._np_codes, queries)
+            found = positions < len(self._np_codes)
+            found[found] = self._np_codes[positions[found]] == queries[found]
+            return found.tolist()
+        return [code in self for code in codes]
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(SET_MAGIC, self.k, len(self.codes), 0))
+            f.write(memoryview(self.codes).cast("B"))
+
+    @classmethod
+    def load(cls, path: str) -> "SortedKMerSet":
+        mapped, (_, k, count, _) = _map_file(path, SET_MAGIC)
+        codes = memoryview(mapped)[HEADER.size : HEADER.size + count * 8].cast("Q")
+        return cls(k, codes, mapped)
+
+
+def mix64(value: int) -> int:
+    """splitmix64 finaliser, spreads k-mer codes evenly over 64 bits."""
+    value = (value + 0x9E3779B97F4A7C15) & MASK_64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return value ^ (value >> 31)
+
+
+class BloomFilter:
+    def __init__(
+        self, k: int, num_bits: int, num_hashes: int, bits=None, mapped=None
+    ) -> None:
+        self.k = k
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+        self._mmap = mapped
+
+    @classmethod
+    def for_capacity(
+        cls, k: int, capacity: int, false_positive_rate: float = 0.01
+    ) -> "BloomFilter":
+        """Sizes the filter for capacity k-mers at the given false positive rate."""
+        num_bits = max(
+            8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        )
+        num_hashes = max(1, round(num_bits / max(capacity, 1) * math.log(2)))
+        return cls(k, num_bits, num_hashes)
+
+    def _positions(self, code: int) -> Iterator[int]:
+        # Double hashing: h1 + i * h2 gives num_hashes independent enough
+        # positions from two hashes.
+        first = mix64(code)
+        second = mix64(code ^ 0x5DEECE66D) | 1
+        for i in range(self.num_hashes):
+            yield (first + i * second) % self.num_bits
+
+    def add(self, code: int) -> None:
+        for position in self._positions(code):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def add_sequences(self, sequences: Iterable[str]) -> None:
+        for sequence in sequences:
+            for code in iter_k_mer_codes(sequence, self.k):
+                self.add(code)
+
+    def __contains__(self, code: int) -> bool:
+        bits = self.bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(code)
+        )
+
+    def contains_many(self, codes: List[int]) -> List[bool]:
+        return [code in self for code in codes]
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(BLOOM_MAGIC, self.k, self.num_bits, self.num_hashes))
+            f.write(self.bits)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        mapped, (_, k, num_bits, num_hashes) = _map_file(path, BLOOM_MAGIC)
+        bits = memoryview(mapped)[HEADER.size : HEADER.size + (num_bits + 7) // 8]
+        return cls(k, num_bits, num_hashes, bits, mapped)
+
+
+def screen_sequences(sequences: Iterable[str], index) -> List[float]:
+    """Fraction of each sequence's k-mers found in index (0.0 if it has none)."""
+    fractions = []
+    for sequence in sequences:
+        codes = list(iter_k_mer_codes(sequence, index.k))
+        hits = sum(index.contains_many(codes)) if codes else 0
+        fractions.append(hits / len(codes) if codes else 0.0)
+    return fractions
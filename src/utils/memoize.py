@@ -0,0 +1,241 @@
+import functools
+import hashlib
+import importlib
+import pickle
+import shelve
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+# A production version of the Memoizer callable from call.py.
+# Memoizer caches into a dict forever and keys only on *args, so it grows
+# without limit and cannot be shared between threads. LRUMemoizer adds:
+#   - maxsize: least recently used entries are evicted past this size
+#   - ttl: entries older than ttl seconds are treated as missing
+#   - keys built from args and kwargs, with lists/dicts/sets frozen
+#   - a lock around the cache plus an in-flight table, so when several
+#     threads miss on the same key only one computes it and the rest wait
+#   - hit/miss/eviction counters via cache_info()
+#   - an optional shelve file as a second tier that survives restarts,
+#     read and written outside the lock
+#   - copy_result, applied to every value handed out, so callers that
+#     modify a cached dict or list do not change it for the next caller
+#
+# Usage (utils/counting.py caches count_k_mers and utils/sequence_utils.py
+# find_longest_dna_palindrome this way, so duplicate reads are analysed once):
+#     @memoize(maxsize=4096, copy_result=dict)
+#     def count_k_mers(sequence, number_nucleotides, canonical=False): ...
+
+_MISSING = object()
+# Separates positional from keyword arguments inside a key.
+_KWARGS_MARK = ("__kwargs__",)
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+def _freeze(value: Any) -> Hashable:
+    """Turns common unhashable arguments into hashable equivalents.
+
+    Containers are tagged with their type, so f([1, 2]) and f((1, 2)) (or a
+    dict and the list of its items) are different entries.
+    """
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return type(value), tuple(
+            sorted((key, _freeze(item)) for key, item in value.items())
+        )
+    if isinstance(value, (set, frozenset)):
+        return type(value), frozenset(_freeze(item) for item in value)
+    return value
+
+
+def make_key(args: Tuple, kwargs: Dict[str, Any]) -> Hashable:
+    # Sorting the kwargs makes f(a=1, b=2) and f(b=2, a=1) the same entry.
+    key = tuple(_freeze(arg) for arg in args)
+    if kwargs:
+        key += _KWARGS_MARK + tuple(sorted((k, _freeze(v)) for k, v in kwargs.items()))
+    return key
+
+
+def _resolve(module: str, qualname: str) -> "LRUMemoizer":
+    target = importlib.import_module(module)
+    for name in qualname.split("."):
+        target = getattr(target, name)
+    return target
+
+
+class LRUMemoizer:
+    def __init__(
+        self,
+        function: Callable,
+        maxsize: Optional[int] = 1024,
+        ttl: Optional[float] = None,
+        disk_path: Optional[str] = None,
+        copy_result: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        self.function = function
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.copy_result = copy_result
+        # key -> (expires_at, value), most recently used last.
+        self.cache: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._disk_lock = threading.Lock()
+        self._disk = shelve.open(disk_path) if disk_path else None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        functools.update_wrapper(self, function)
+
+    def __call__(self, *args, **kwargs):
+        value = self._cached_call(args, kwargs)
+        # The cached value itself is never handed out when copy_result is set.
+        return value if self.copy_result is None else self.copy_result(value)
+
+    def _cached_call(self, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        key = make_key(args, kwargs)
+        with self._lock:
+            value = self._get(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self.misses += 1
+
+        if not owner:
+            # Another thread is already computing this key, wait for it.
+            return future.result()
+
+        # The disk tier is read and written outside self._lock, so a slow
+        # disk only holds up the threads waiting on this key.
+        value = self._disk_get(key)
+        if value is not _MISSING:
+            with self._lock:
+                self.hits += 1
+                self._store(key, (self._expires_at(time.monotonic()), value))
+                del self._in_flight[key]
+            future.set_result(value)
+            return value
+
+        with self._lock:
+            self.misses += 1
+        try:
+            value = self.function(*args, **kwargs)
+        except BaseException as exc:
+            # Errors are passed to the waiting threads but never cached.
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self._store(key, (self._expires_at(time.monotonic()), value))
+            del self._in_flight[key]
+        future.set_result(value)
+        self._disk_set(key, value)
+        return value
+
+    def _get(self, key: Hashable) -> Any:
+        """Looks up the memory tier, returning _MISSING if absent or expired."""
+        entry = self.cache.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.cache[key]
+            return _MISSING
+        self.cache.move_to_end(key)
+        return value
+
+    def _disk_get(self, key: Hashable) -> Any:
+        if self._disk is None:
+            return _MISSING
+        # shelve is not thread safe, so disk access has a lock of its own.
+        with self._disk_lock:
+            if self._disk is None:
+                return _MISSING
+            stored = self._disk.get(self._disk_key(key))
+        # monotonic() does not survive a restart, so disk entries use time().
+        if stored is None or (stored[0] is not None and stored[0] <= time.time()):
+            return _MISSING
+        return stored[1]
+
+    def _disk_set(self, key: Hashable, value: Any) -> None:
+        if self._disk is None:
+            return
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        with self._disk_lock:
+            if self._disk is not None:
+                self._disk[self._disk_key(key)] = (expires_at, value)
+
+    def _store(self, key: Hashable, entry: Tuple[float, Any]) -> None:
+        self.cache[key] = entry
+        self.cache.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+                self.evictions += 1
+
+    def _expires_at(self, now: float) -> Optional[float]:
+        return now + self.ttl if self.ttl is not None else None
+
+    @staticmethod
+    def _disk_key(key: Hashable) -> str:
+        # shelve needs str keys, so use a digest of the pickled key.
+        return hashlib.sha256(pickle.dumps(key)).hexdigest()
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self.hits, self.misses, self.evictions, self.maxsize, len(self.cache)
+            )
+
+    def cache_clear(self) -> None:
+        """Empties the memory tier and resets the counters (the disk tier is kept)."""
+        with self._lock:
+            self.cache.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def close(self) -> None:
+        with self._disk_lock:
+            if self._disk is not None:
+                self._disk.close()
+                self._disk = None
+
+    def __reduce__(self):
+        # Locks cannot be pickled; send the name instead so a decorated
+        # module level function can still be passed to a multiprocessing Pool.
+        return _resolve, (self.__module__, self.__qualname__)
+
+
+def memoize(
+    maxsize: Optional[int] = 1024,
+    ttl: Optional[float] = None,
+    disk_path: Optional[str] = None,
+    copy_result: Optional[Callable[[Any], Any]] = None,
+) -> Callable[[Callable], LRUMemoizer]:
+    """Decorator form of LRUMemoizer."""
+
+    def decorator(function: Callable) -> LRUMemoizer:
+        return LRUMemoizer(
+            function,
+            maxsize=maxsize,
+            ttl=ttl,
+            disk_path=disk_path,
+            copy_result=copy_result,
+        )
+
+    return decorator
@@ -0,0 +1,335 @@
+import json
+import mmap
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from functools import lru_cache
+from itertools import product
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from .top_k import top_k_items
+
+# A 2-bit packed, memory-mappable store for DNA sequences.
+# Each base takes 2 bits (A=0, C=1, G=2, T=3) so 4 bases fit in a byte,
+# which is 4x smaller than a Python str and needs no parsing on startup.
+# Any other letter (N, IUPAC codes...) is packed as A and recorded in an
+# N-mask of (start, length) runs so it can be restored on decode.
+#
+# File layout (all integers little-endian unsigned 64 bit):
+#   header        magic, version, num_sequences, num_mask_runs, data_bytes
+#   lengths       num_sequences          -> bases in each sequence
+#   byte_offsets  num_sequences + 1      -> where each sequence starts in data
+#   mask_offsets  num_sequences + 1      -> where each sequence starts in runs
+#   mask_runs     num_mask_runs * 2      -> (start, length) pairs
+#   data          data_bytes             -> packed bases, each sequence byte aligned
+#
+# Because the file is mmap'ed, pool workers that open the same store share
+# the OS page cache instead of each receiving a pickled copy of the data.
+
+MAGIC = b"SEQ2"
+VERSION = 1
+HEADER = struct.Struct("<4sIQQQ")
+BASES = "ACGT"
+MASK_LETTER = "N"
+
+_NON_ACGT = re.compile(r"[^ACGT]+")
+# Every 4 letter combination of bases -> the byte holding it.
+_PACK: Dict[str, int] = {
+    "".join(bases): index for index, bases in enumerate(product(BASES, repeat=4))
+}
+# Byte -> the 4 letters / 4 codes it holds.
+_UNPACK: List[bytes] = [
+    "".join(BASES[(byte >> shift) & 3] for shift in (6, 4, 2, 0)).encode()
+    for byte in range(256)
+]
+_UNPACK_CODES: List[bytes] = [
+    bytes((byte >> shift) & 3 for shift in (6, 4, 2, 0)) for byte in range(256)
+]
+# Byte -> how many of each base it holds, used to count without unpacking.
+_BYTE_BASE_COUNTS: List[Tuple[int, int, int, int]] = [
+    tuple(
+        sum(1 for shift in (6, 4, 2, 0) if (byte >> shift) & 3 == code)
+        for code in range(4)
+    )
+    for byte in range(256)
+]
+NO_BASE = 4
+# Code -> its complement; a masked base maps to a value no code complements
+# to, so a window holding one is never a palindrome.
+_COMPLEMENT_CODES = bytes([3, 2, 1, 0, NO_BASE + 1]) + bytes(range(5, 256))
+# Code -> its letter, for decoding a window of codes.
+_CODE_LETTERS = (BASES + MASK_LETTER).encode() + bytes(251)
+
+
+def pack_sequence(sequence: str) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """Packs a sequence into 2-bit bytes and returns it with its N-mask runs."""
+    sequence = sequence.upper()
+    mask_runs = [
+        (match.start(), match.end() - match.start())
+        for match in _NON_ACGT.finditer(sequence)
+    ]
+    if mask_runs:
+        sequence = _NON_ACGT.sub(lambda match: "A" * len(match.group()), sequence)
+    # Pad to a whole number of bytes, the padding is dropped again on decode.
+    sequence += "A" * (-len(sequence) % 4)
+    packed = bytes(_PACK[sequence[i : i + 4]] for i in range(0, len(sequence), 4))
+    return packed, mask_runs
+
+
+def write_packed_store(sequences: Iterable[str], output_path: str) -> int:
+    """Writes sequences to a packed store file and returns how many were written."""
+    lengths = array("Q")
+    byte_offsets = array("Q", [0])
+    mask_offsets = array("Q", [0])
+    mask_runs = array("Q")
+    data = bytearray()
+
+    for sequence in sequences:
+        packed, runs = pack_sequence(sequence)
+        lengths.append(len(sequence))
+        data += packed
+        byte_offsets.append(len(data))
+        for start, length in runs:
+            mask_runs.extend((start, length))
+        mask_offsets.append(len(mask_runs) // 2)
+
+    # Write to a temporary file first so readers never see a half written store.
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(
+            HEADER.pack(MAGIC, VERSION, len(lengths), len(mask_runs) // 2, len(data))
+        )
+        for index in (lengths, byte_offsets, mask_offsets, mask_runs):
+            index.tofile(f)
+        f.write(data)
+    os.replace(tmp_path, output_path)
+    return len(lengths)
+
+
+def convert_sequences_file(input_path: str, output_path: str) -> int:
+    """Converts a JSON sequences file ({"sequences": [...]}) to a packed store."""
+    with open(input_path) as f:
+        data = json.load(f)
+    return write_packed_store(data["sequences"], output_path)
+
+
+class PackedSequenceStore:
+    """Read only, memory-mapped view over a file written by write_packed_store."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, num_sequences, num_runs, data_bytes = HEADER.unpack_from(
+            self._mmap
+        )
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a packed sequence store")
+
+        # Cast slices of the map rather than copying the index into arrays.
+        position = HEADER.size
+        sections = []
+        for count in (num_sequences, num_sequences + 1, num_sequences + 1):
+            sections.append(self._view[position : position + count * 8].cast("Q"))
+            position += count * 8
+        self.lengths, self.byte_offsets, self.mask_offsets = sections
+        self.mask_runs = self._view[position : position + num_runs * 16].cast("Q")
+        position += num_runs * 16
+        self.data = self._view[position : position + data_bytes]
+
+    def __enter__(self) -> "PackedSequenceStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # Views must be released before the map can be closed.
+        for name in ("lengths", "byte_offsets", "mask_offsets", "mask_runs", "data"):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def __getitem__(self, index: int) -> str:
+        return self.sequence(index)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.sequence(index) for index in range(len(self)))
+
+    def packed(self, index: int) -> memoryview:
+        """Returns the packed bytes of a sequence without copying them."""
+        return self.data[self.byte_offsets[index] : self.byte_offsets[index + 1]]
+
+    def mask(self, index: int) -> List[Tuple[int, int]]:
+        """Returns the (start, length) runs of masked letters in a sequence."""
+        runs = self.mask_runs
+        return [
+            (runs[2 * run], runs[2 * run + 1])
+            for run in range(self.mask_offsets[index], self.mask_offsets[index + 1])
+        ]
+
+    def sequence(self, index: int) -> str:
+        """Decodes a sequence back to an upper case str."""
+        decoded = bytearray(b"".join(map(_UNPACK.__getitem__, self.packed(index))))
+        del decoded[self.lengths[index] :]
+        for start, length in self.mask(index):
+            decoded[start : start + length] = MASK_LETTER.encode() * length
+        return decoded.decode("ascii")
+
+    def codes(self, index: int) -> bytearray:
+        """Returns one code (0-3) per base, with NO_BASE at masked positions."""
+        codes = bytearray(b"".join(map(_UNPACK_CODES.__getitem__, self.packed(index))))
+        del codes[self.lengths[index] :]
+        for start, length in self.mask(index):
+            codes[start : start + length] = bytes([NO_BASE]) * length
+        return codes
+
+    def count_nucleotides(self, index: int) -> Dict[str, int]:
+        """Counts bases straight from the packed bytes, matching count_nucleotides."""
+        # Counter over bytes runs in C; there are only 256 distinct values to tally.
+        totals = [0, 0, 0, 0]
+        for byte, occurrences in Counter(self.packed(index)).items():
+            for code, count in enumerate(_BYTE_BASE_COUNTS[byte]):
+                totals[code] += count * occurrences
+        # Padding and masked letters were packed as A, so take them back off.
+        masked = sum(length for _, length in self.mask(index))
+        packed_bases = 4 * (self.byte_offsets[index + 1] - self.byte_offsets[index])
+        totals[0] -= masked + packed_bases - self.lengths[index]
+
+        counts = defaultdict(int)
+        for code, total in enumerate(totals):
+            if total:
+                counts[BASES[code].lower()] = total
+        if masked:
+            counts[MASK_LETTER.lower()] = masked
+        return counts
+
+    def count_k_mers(
+        self, index: int, number_nucleotides: int, canonical: bool = False
+    ) -> Dict[str, int]:
+        """Returns the top 5 k-mers of a sequence, matching count_k_mers.
+
+        Uses a rolling 2-bit code per position so no substring is built until
+        the top 5 are known. Windows containing a masked letter are skipped.
+        With canonical the reverse complement code is rolled alongside and
+        the smaller of the two counted (see utils/canonical.py).
+        """
+        k = number_nucleotides
+        if self.lengths[index] < k:
+            return {}
+        window_mask = (1 << (2 * k)) - 1
+        shift = 2 * (k - 1)
+        counts = defaultdict(int)
+        code = reverse = 0
+        valid = 0
+        for base in self.codes(index):
+            if base == NO_BASE:
+                valid = 0
+                continue
+            code = ((code << 2) | base) & window_mask
+            reverse = reverse >> 2 | (3 - base) << shift
+            valid += 1
+            if valid >= k:
+                counts[min(code, reverse) if canonical else code] += 1
+        top = top_k_items(counts, 5)
+        return {decode_k_mer(code, k): count for code, count in top}
+
+    def find_motif(self, index: int, motif: str) -> List[int]:
+        """Returns the start of every (overlapping) match, matching find_motif.
+
+        An A, C, G and T motif is searched for in the packed bytes, see
+        _motif_patterns, so the read is never decoded.
+        """
+        motif = motif.upper()
+        length = self.lengths[index]
+        if not motif or _NON_ACGT.search(motif):
+            # Other letters can only match masked positions, whose letters
+            # are only known after decoding.
+            sequence = self.sequence(index)
+            return [
+                i for i in range(length - 1) if sequence[i : i + len(motif)] == motif
+            ]
+
+        runs = self.mask(index)
+        run_starts = [start for start, _ in runs]
+        positions = []
+        for phase, pattern in _motif_patterns(motif):
+            for match in pattern.finditer(self.packed(index)):
+                start = 4 * match.start() + phase
+                end = start + len(motif)
+                # find_motif only checks starts before the last base, and
+                # the padding after the last base must not match.
+                if end > length or start >= length - 1:
+                    break
+                # Masked letters were packed as A.
+                run = bisect_right(run_starts, end - 1) - 1
+                if run >= 0 and runs[run][0] + runs[run][1] > start:
+                    continue
+                positions.append(start)
+        positions.sort()
+        return positions
+
+    def longest_palindrome(self, index: int, min_length: int = 20) -> Dict:
+        """Returns the longest palindrome, matching find_longest_dna_palindrome.
+
+        Windows of codes are compared with the reverse complement codes and
+        only the palindrome found is decoded. The longest length is tried
+        first, which gives the same (leftmost longest) palindrome.
+        """
+        codes = bytes(self.codes(index))
+        reverse = codes.translate(_COMPLEMENT_CODES)[::-1]
+        size = len(codes)
+        for length in range(size, max(min_length, 1) - 1, -1):
+            for i in range(size - length + 1):
+                if codes[i : i + length] == reverse[size - i - length : size - i]:
+                    palindrome = codes[i : i + length].translate(_CODE_LETTERS)
+                    return {
+                        "palindrome_seq": palindrome.decode("ascii"),
+                        "palindrome_length": length,
+                    }
+        return {"palindrome_seq": "", "palindrome_length": 0}
+
+
+@lru_cache(maxsize=None)
+def _motif_patterns(motif: str) -> List[Tuple[int, "re.Pattern[bytes]"]]:
+    """One bytes pattern per phase, the position of the motif in its first byte.
+
+    Each packed byte a match covers becomes a class of the byte values whose
+    covered bases agree with the motif; the lookahead finds overlapping
+    matches.
+    """
+    codes = [BASES.index(base) for base in motif]
+    patterns = []
+    for phase in range(4):
+        classes = []
+        for first in range(-phase, len(codes), 4):
+            expected = covered = 0
+            for slot, position in enumerate(range(first, first + 4)):
+                if 0 <= position < len(codes):
+                    expected |= codes[position] << (6 - 2 * slot)
+                    covered |= 3 << (6 - 2 * slot)
+            values = (bytes([value]) for value in range(256))
+            classes.append(
+                b"["
+                + b"".join(re.escape(v) for v in values if v[0] & covered == expected)
+                + b"]"
+            )
+        patterns.append((phase, re.compile(b"(?=" + b"".join(classes) + b")")))
+    return patterns
+
+
+def decode_k_mer(code: int, k: int) -> str:
+    """Turns a rolling 2-bit k-mer code back into its lower case string."""
+    return "".join(BASES[(code >> (2 * (k - 1 - i))) & 3] for i in range(k)).lower()
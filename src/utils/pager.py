@@ -1,30 +1,145 @@
-from typing import Iterator, Iterable, List, Tuple, Union
+import pickle
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
 from itertools import batched
 
-# Using batched to paginate
+# Paginating large result sets.
+# Sequences (list, tuple, range, array, memoryview) are paged by slicing,
+# and other sized sources indexed by position (a memory-mapped
+# PackedSequenceStore) one item at a time, so jumping to page N costs the
+# same as reading page 1. Mappings are not indexed by position and, like
+# any other iterable, go through the spill file.
+# Other iterables can only be read forwards, so pages are read with
+# batched() as far as needed and spilled to a temporary file, recording
+# the offset of each page. Going back, or jumping to a page already read,
+# is then a seek into the spill file instead of keeping every page in RAM.
+# Only the cache_size most recently used pages are held in memory, and the
+# page after the one just returned is loaded in a background thread.
+
+DEFAULT_CACHE_PAGES = 32
+
+
+def is_sliceable(pages) -> bool:
+    return isinstance(pages, (Sequence, array, memoryview))
+
+
+def is_indexable(pages) -> bool:
+    """True for sources that can be read by position, 0 to len - 1."""
+    if is_sliceable(pages):
+        return True
+    return (
+        not isinstance(pages, Mapping)
+        and hasattr(pages, "__len__")
+        and hasattr(pages, "__getitem__")
+    )
 
 
 class Pager:
-    def __init__(self, pages: Iterable, page_size: int = 10):
-        self.pages: Iterator = batched(pages, page_size)
-        # Initialise empty navigation caches.
-        self.prev_pages: List[Tuple] = []
-        self.next_pages: List[Tuple] = []
+    def __init__(
+        self,
+        pages: Iterable,
+        page_size: int = 10,
+        cache_size: int = DEFAULT_CACHE_PAGES,
+        prefetch: bool = True,
+    ):
+        self.page_size = page_size
+        self.cache_size = cache_size
+        # Index of the last page returned, -1 before the first one.
+        self.current = -1
+        self._cache: "OrderedDict[int, Tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._prefetcher = ThreadPoolExecutor(max_workers=1) if prefetch else None
+
+        if is_indexable(pages):
+            self._source = pages
+            self._fetch = self._fetch_indexed
+        else:
+            self._pages = batched(pages, page_size)
+            self._spill = tempfile.TemporaryFile()
+            self._offsets: List[int] = []
+            self._exhausted = False
+            self._fetch = self._fetch_spilled
+
+    @property
+    def page_count(self) -> Optional[int]:
+        """Number of pages, or None while an iterator has not been read to the end."""
+        if self._fetch == self._fetch_indexed:
+            return -(-len(self._source) // self.page_size)
+        return len(self._offsets) if self._exhausted else None
+
+    def page(self, number: int) -> Optional[Tuple]:
+        """Gets page number (from 0) or None if there is no such page."""
+        if number < 0:
+            return None
+        page = self._load(number)
+        if page is not None:
+            self.current = number
+            if self._prefetcher is not None:
+                self._prefetcher.submit(self._load, number + 1)
+        return page
 
     def next_page(self) -> Tuple:
         """Gets the next page of results or None."""
-        # Get the next page, possibly from the navigation cache.
-        next_page = self.next_pages.pop() if self.next_pages else next(self.pages, None)
-        if next_page is not None:
-            self.prev_pages.append(next_page)
-        return next_page
+        return self.page(self.current + 1)
 
     def prev_page(self) -> Tuple:
         """Gets the previous page of results or None."""
-        # The last page in prev_pages was the last one sent, so we need
-        # to move it to `next_pages`.
-        if len(self.prev_pages) >= 2:
-            self.next_pages.append(self.prev_pages.pop())
-            return self.prev_pages[-1]
+        if self.current < 1:
+            return None
+        return self.page(self.current - 1)
+
+    def _load(self, number: int) -> Optional[Tuple]:
+        with self._lock:
+            if number in self._cache:
+                self._cache.move_to_end(number)
+                return self._cache[number]
+            page = self._fetch(number)
+            if page is not None:
+                self._cache[number] = page
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            return page
+
+    def _fetch_indexed(self, number: int) -> Optional[Tuple]:
+        start = number * self.page_size
+        end = min(start + self.page_size, len(self._source))
+        if start >= end:
+            return None
+        if is_sliceable(self._source):
+            return tuple(self._source[start:end])
+        return tuple(self._source[i] for i in range(start, end))
+
+    def _fetch_spilled(self, number: int) -> Optional[Tuple]:
+        page = None
+        # Read forward until the page exists, spilling every page on the way.
+        while len(self._offsets) <= number and not self._exhausted:
+            page = next(self._pages, None)
+            if page is None:
+                self._exhausted = True
+                break
+            self._offsets.append(self._spill.seek(0, 2))
+            pickle.dump(page, self._spill)
+        if number >= len(self._offsets):
+            return None
+        if page is not None and number == len(self._offsets) - 1:
+            # Just read from the iterator, no need to go back to the file.
+            return page
+        self._spill.seek(self._offsets[number])
+        return pickle.load(self._spill)
+
+    def close(self) -> None:
+        if self._prefetcher is not None:
+            self._prefetcher.shutdown()
+        if self._fetch == self._fetch_spilled:
+            self._spill.close()
+
+    def __enter__(self) -> "Pager":
+        return self
 
-        return None
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,16 @@
+from typing import Dict, Union
+
+from .sequence_utils import MIN_PALINDROME_LENGTH, find_longest_dna_palindrome
+from .stages import AnalysisStage
+
+# Kept in its own module: it is by far the slowest stage, and runs that do
+# not select it never import it.
+
+
+class PalindromeStage(AnalysisStage, stage_name="palindrome"):
+    min_length = MIN_PALINDROME_LENGTH
+
+    def run(self, sequence: str) -> Dict[str, Union[str, int]]:
+        return find_longest_dna_palindrome(
+            sequence=sequence, min_length=self.min_length
+        )
@@ -0,0 +1,169 @@
+import time
+from collections import defaultdict
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# A batch-capable version of the FunctionChain callable from call.py.
+# FunctionChain calls every function once per value, so with cheap steps
+# most of the time goes on Python call overhead rather than the work.
+# Pipeline keeps that interface (pipeline(value)) and adds run_batch():
+#   - adjacent stages of the same kind are fused into one composed
+#     function, so each value makes a single pass through them
+#   - batch=True stages take and return a whole list, for steps that are
+#     cheaper done over many values at once
+#   - parallel="thread" / "process" stages fan out to a pool, in chunks,
+#     with results in input order (ordered=True) or as they finish
+#   - the time spent in each (fused) stage is added up in timings
+#
+# Usage:
+#     pipeline = Pipeline(str.strip, str.upper, stage(process_data, parallel="process"))
+#     records = pipeline.run_batch(sequences)
+
+THREAD = "thread"
+PROCESS = "process"
+CHUNKSIZE = 64
+
+
+class Stage(NamedTuple):
+    function: Callable
+    name: str
+    parallel: Optional[str] = None
+    batch: bool = False
+    ordered: bool = True
+
+
+def stage(
+    function: Callable,
+    parallel: Optional[str] = None,
+    batch: bool = False,
+    ordered: bool = True,
+    name: Optional[str] = None,
+) -> Stage:
+    if parallel not in (None, THREAD, PROCESS):
+        raise ValueError(f"parallel must be None, {THREAD!r} or {PROCESS!r}")
+    return Stage(
+        function,
+        name or getattr(function, "__name__", repr(function)),
+        parallel,
+        batch,
+        ordered,
+    )
+
+
+class Compose:
+    """Calls functions one after another; picklable when they are."""
+
+    def __init__(self, functions: Iterable[Callable]) -> None:
+        self.functions = tuple(functions)
+
+    def __call__(self, value):
+        for function in self.functions:
+            value = function(value)
+        return value
+
+
+class MapChunk:
+    """Applies a per value function to a chunk of values inside a worker."""
+
+    def __init__(self, function: Callable) -> None:
+        self.function = function
+
+    def __call__(self, values: List) -> List:
+        return list(map(self.function, values))
+
+
+def fuse_stages(stages: List[Stage]) -> List[Stage]:
+    """Merges runs of adjacent stages that execute the same way."""
+    fused: List[Stage] = []
+    for current in stages:
+        previous = fused[-1] if fused else None
+        if previous is not None and (
+            previous.parallel,
+            previous.batch,
+            previous.ordered,
+        ) == (current.parallel, current.batch, current.ordered):
+            functions = previous.function.functions + (current.function,)
+            fused[-1] = previous._replace(
+                function=Compose(functions), name=f"{previous.name}+{current.name}"
+            )
+        else:
+            fused.append(current._replace(function=Compose([current.function])))
+    return fused
+
+
+class Pipeline:
+    def __init__(
+        self, *stages, max_workers: Optional[int] = None, chunksize: int = CHUNKSIZE
+    ) -> None:
+        self.stages = [s if isinstance(s, Stage) else stage(s) for s in stages]
+        self.fused = fuse_stages(self.stages)
+        self.max_workers = max_workers
+        self.chunksize = chunksize
+        self.timings: Dict[str, float] = defaultdict(float)
+        self._executors: Dict[str, Executor] = {}
+
+    def __call__(self, value):
+        """Runs a single value through every stage, like FunctionChain."""
+        for current in self.stages:
+            if current.batch:
+                value = current.function([value])[0]
+            else:
+                value = current.function(value)
+        return value
+
+    def run_batch(self, values: Iterable) -> List:
+        """Runs a whole batch through each (fused) stage in turn."""
+        values = list(values)
+        for index, current in enumerate(self.fused):
+            start = time.perf_counter()
+            values = self._run_stage(current, values)
+            # The index keeps two fused stages with the same name apart.
+            self.timings[f"{index}:{current.name}"] += time.perf_counter() - start
+        return values
+
+    def _run_stage(self, current: Stage, values: List) -> List:
+        if current.parallel is None:
+            if current.batch:
+                return list(current.function(values))
+            return list(map(current.function, values))
+
+        # Parallel stages work in chunks so each task carries enough work to
+        # cover the cost of handing it to the pool.
+        executor = self._executor(current.parallel)
+        chunks = [
+            values[i : i + self.chunksize]
+            for i in range(0, len(values), self.chunksize)
+        ]
+        function = current.function if current.batch else MapChunk(current.function)
+        if current.ordered:
+            results = executor.map(function, chunks)
+        else:
+            futures = [executor.submit(function, chunk) for chunk in chunks]
+            results = (future.result() for future in as_completed(futures))
+        return [value for chunk in results for value in chunk]
+
+    def _executor(self, kind: str) -> Executor:
+        if kind not in self._executors:
+            pool_class = ThreadPoolExecutor if kind == THREAD else ProcessPoolExecutor
+            self._executors[kind] = pool_class(max_workers=self.max_workers)
+        return self._executors[kind]
+
+    def report(self) -> List[Tuple[str, float]]:
+        """Time spent in each stage so far, slowest first."""
+        return sorted(self.timings.items(), key=lambda item: item[1], reverse=True)
+
+    def close(self) -> None:
+        for executor in self._executors.values():
+            executor.shutdown()
+        self._executors.clear()
+
+    def __enter__(self) -> "Pipeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,332 @@
+from collections import defaultdict
+from itertools import product
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .data_types import DNASequence
+from .sequence_utils import (
+    GC_ISLAND_MOTIF,
+    MIN_PALINDROME_LENGTH,
+    TATA_BOX_MOTIF,
+    count_k_mers,
+    count_nucleotides,
+    create_dna_sequence_record,
+)
+from .canonical import (
+    canonical_codes,
+    canonical_ranks,
+    count_canonical_k_mers,
+    decode_code,
+    num_canonical_k_mers,
+)
+from .top_k import TOP_K
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, every read takes the scalar path
+    np = None
+
+# Batch engine for reads of the same length.
+# The functions in sequence_utils.py analyse one Python string at a time.
+# Here the reads of one length are stacked into an (n_reads, length) uint8
+# matrix of ASCII bytes and each statistic is a handful of whole-matrix
+# NumPy operations:
+#   nucleotide counts  (n, 4) from the 2-bit codes (A=0, C=1, G=2, T=3)
+#   GC content         from the counts
+#   k-mer codes        rolling 2-bit codes, (n, length - k + 1); counted
+#                      per read with one bincount over row * 4**k + code,
+#                      or over canonical ranks (utils/canonical.py)
+#   motif masks        (n, length - m + 1) booleans, one column compare
+#                      per motif letter
+#   reverse complement the code matrix reversed and subtracted from 3
+#   palindromes        every centre at once: the arm of each centre grows
+#                      while its next pair of bases are complements, and
+#                      the loop stops when no arm in the batch can grow
+# batch_dna_sequence_records() returns exactly what process_data /
+# create_dna_sequence_record gives for each read, top k-mer ties included.
+# Reads whose length is shared by fewer than MIN_MATRIX_READS reads, reads
+# with letters other than ACGT, and everything when NumPy is missing, take
+# the scalar path.
+
+K_MER_SIZES = (2, 3, 4, 5)
+MIN_MATRIX_READS = 8
+# Reads per matrix; the k = 5 counts take 4 KiB per read.
+MATRIX_CHUNK_READS = 4096
+BASES = "ACGT"
+_DROP_BASES = str.maketrans("", "", BASES)
+
+if np is not None:
+    # ASCII byte -> 2-bit code, 255 for anything else.
+    CODE_TABLE = np.full(256, 255, dtype=np.uint8)
+    for _code, _base in enumerate(BASES):
+        CODE_TABLE[ord(_base)] = _code
+    BASE_BYTES = np.frombuffer(BASES.encode("ascii"), dtype=np.uint8)
+
+
+def _k_mer_names(k: int, canonical: bool = False) -> List[str]:
+    """Count array index -> lower case k-mer, as count_k_mers reports them."""
+    if canonical:
+        return [decode_code(code, k) for code in canonical_codes(k)]
+    return ["".join(bases) for bases in product(BASES.lower(), repeat=k)]
+
+
+def encode_reads(sequences: Sequence[str]):
+    """Stacks same-length reads into an (n_reads, length) uint8 ASCII matrix."""
+    length = len(sequences[0]) if sequences else 0
+    if any(len(sequence) != length for sequence in sequences):
+        raise ValueError("Reads in a matrix must all have the same length")
+    data = "".join(sequences).encode("ascii")
+    return np.frombuffer(data, dtype=np.uint8).reshape(len(sequences), length)
+
+
+def base_codes(matrix):
+    """2-bit codes of an ASCII read matrix, 255 where a letter is not ACGT."""
+    return CODE_TABLE[matrix]
+
+
+def nucleotide_counts(codes):
+    """(n, 4) counts of A, C, G and T per read."""
+    counts = np.zeros((codes.shape[0], 4), dtype=np.int64)
+    for code in range(4):
+        counts[:, code] = np.count_nonzero(codes == code, axis=1)
+    return counts
+
+
+def gc_content(codes):
+    """Fraction of G and C bases of each read."""
+    counts = nucleotide_counts(codes)
+    return (counts[:, 1] + counts[:, 2]) / max(codes.shape[1], 1)
+
+
+def k_mer_codes(codes, k: int):
+    """(n, length - k + 1) rolling 2-bit codes of every k-mer."""
+    offsets = codes.shape[1] - k + 1
+    result = np.zeros((codes.shape[0], max(offsets, 0)), dtype=np.uint32)
+    for j in range(k if offsets > 0 else 0):
+        result <<= 2
+        result |= codes[:, j : j + offsets]
+    return result
+
+
+def _k_mer_indexes(codes, k: int, canonical: bool):
+    # Count array index of every k-mer, and the size of the array.
+    kmers = k_mer_codes(codes, k)
+    if canonical:
+        return canonical_ranks(k)[kmers], num_canonical_k_mers(k)
+    return kmers, 1 << (2 * k)
+
+
+def _count_indexes(kmers, size: int):
+    rows = np.arange(kmers.shape[0], dtype=np.int64)[:, None] * size
+    return np.bincount((rows + kmers).ravel(), minlength=kmers.shape[0] * size).reshape(
+        kmers.shape[0], size
+    )
+
+
+def k_mer_counts(codes, k: int, canonical: bool = False):
+    """(n, 4**k) count of each k-mer code per read, (n, ~4**k / 2) canonical."""
+    return _count_indexes(*_k_mer_indexes(codes, k, canonical))
+
+
+def top_k_mers(
+    codes, k: int, limit: int = TOP_K, canonical: bool = False
+) -> List[Dict[str, int]]:
+    """The same dicts as count_k_mers(read, k, canonical) for every row."""
+    n, length = codes.shape
+    if length < k:
+        return [{} for _ in range(n)]
+    kmers, size = _k_mer_indexes(codes, k, canonical)
+    counts = _count_indexes(kmers, size)
+    # top_k_items keeps the first seen of tied k-mers, so rank by count
+    # and then by first position. Walking the positions backwards leaves
+    # each k-mer's first one; rows are distinct within one assignment.
+    first = np.full(counts.shape, kmers.shape[1], dtype=np.int64)
+    rows = np.arange(n)
+    for position in range(kmers.shape[1] - 1, -1, -1):
+        first[rows, kmers[:, position]] = position
+    score = counts * (kmers.shape[1] + 1) - first
+    limit = min(limit, counts.shape[1])
+    chosen = np.argpartition(-score, limit - 1, axis=1)[:, :limit]
+    chosen_scores = np.take_along_axis(score, chosen, axis=1)
+    chosen = np.take_along_axis(chosen, np.argsort(-chosen_scores, axis=1), axis=1)
+    names = _k_mer_names(k, canonical)
+    return [
+        {names[code]: count for code, count in zip(row, row_counts) if count > 0}
+        for row, row_counts in zip(
+            chosen.tolist(), np.take_along_axis(counts, chosen, axis=1).tolist()
+        )
+    ]
+
+
+def motif_mask(matrix, motif: str):
+    """(n, length - len(motif) + 1) mask of the offsets where motif starts."""
+    offsets = matrix.shape[1] - len(motif) + 1
+    mask = np.ones((matrix.shape[0], max(offsets, 0)), dtype=bool)
+    for j, letter in enumerate(motif.encode("ascii")):
+        mask &= matrix[:, j : j + offsets] == letter
+    return mask
+
+
+def motif_positions(matrix, motif: str) -> List[List[int]]:
+    """find_motif(read, motif) for every row."""
+    # find_motif only tries offsets below len(read) - 1.
+    mask = motif_mask(matrix, motif)[:, : max(matrix.shape[1] - 1, 0)]
+    rows, columns = np.nonzero(mask)
+    positions: List[List[int]] = [[] for _ in range(matrix.shape[0])]
+    for row, column in zip(rows.tolist(), columns.tolist()):
+        positions[row].append(column)
+    return positions
+
+
+def reverse_complement_codes(codes):
+    """Reverse complement of a code matrix (A<->T is 0<->3, C<->G is 1<->2)."""
+    return 3 - codes[:, ::-1]
+
+
+def reverse_complements(codes) -> List[str]:
+    return [
+        row.tobytes().decode("ascii")
+        for row in BASE_BYTES[reverse_complement_codes(codes)]
+    ]
+
+
+def palindrome_arms(codes):
+    """(n, length - 1) half length of the widest palindrome at each centre.
+
+    Centre c sits between bases c and c + 1 (DNA palindromes have even
+    length); its arm grows while base c - j complements base c + 1 + j.
+    """
+    n, length = codes.shape
+    arms = np.zeros((n, max(length - 1, 0)), dtype=np.int64)
+    growing = np.ones(arms.shape, dtype=bool)
+    complement = 3 - codes
+    for j in range(length // 2):
+        # Centres with j + 1 bases either side inside the read: [j, length - j - 1).
+        end = length - j - 1
+        growing[:, :j] = False
+        growing[:, end:] = False
+        growing[:, j:end] &= codes[:, : end - j] == complement[:, 2 * j + 1 :]
+        if not growing.any():
+            break
+        arms += growing
+    return arms
+
+
+def longest_palindromes(matrix, codes, min_length: int = MIN_PALINDROME_LENGTH):
+    """find_longest_dna_palindrome(read, min_length) for every row."""
+    results = []
+    if codes.shape[1] < 2:
+        return [{"palindrome_seq": "", "palindrome_length": 0} for _ in matrix]
+    arms = palindrome_arms(codes)
+    centres = arms.argmax(axis=1)
+    widest = arms[np.arange(len(arms)), centres]
+    for row, centre, arm in zip(matrix, centres.tolist(), widest.tolist()):
+        length = 2 * arm
+        if length == 0 or length < min_length:
+            results.append({"palindrome_seq": "", "palindrome_length": 0})
+            continue
+        start = centre + 1 - arm
+        results.append(
+            {
+                "palindrome_seq": row[start : start + length].tobytes().decode("ascii"),
+                "palindrome_length": length,
+            }
+        )
+    return results
+
+
+def _matrix_records(
+    sequences: Sequence[str],
+    ids: Sequence[int],
+    min_length: int,
+    k_mer_sizes: Iterable[int],
+    canonical: bool,
+) -> List[DNASequence]:
+    matrix = encode_reads(sequences)
+    codes = base_codes(matrix)
+    counts = nucleotide_counts(codes).tolist()
+    palindromes = longest_palindromes(matrix, codes, min_length)
+    cpg_islands = motif_positions(matrix, GC_ISLAND_MOTIF)
+    tata_boxes = motif_positions(matrix, TATA_BOX_MOTIF)
+    k_mers = {k: top_k_mers(codes, k, canonical=canonical) for k in k_mer_sizes}
+    return [
+        DNASequence(
+            id=ids[i],
+            adenine_count=counts[i][0],
+            thymine_count=counts[i][3],
+            guanine_count=counts[i][2],
+            cytosine_count=counts[i][1],
+            palindrome=palindromes[i],
+            motifs={"cpg_islands": cpg_islands[i], "tata_boxes": tata_boxes[i]},
+            k_mers={f"k_mer_n{k}_count": k_mers[k][i] for k in k_mers},
+        )
+        for i in range(len(sequences))
+    ]
+
+
+def _scalar_record(
+    sequence: str,
+    id: int,
+    min_length: int,
+    k_mer_sizes: Iterable[int],
+    canonical: bool = False,
+) -> DNASequence:
+    count = count_canonical_k_mers if canonical else count_k_mers
+    return create_dna_sequence_record(
+        id=id,
+        nucleotide_counts=count_nucleotides(sequence=sequence),
+        sequence=sequence,
+        min_length=min_length,
+        k_mers={
+            f"k_mer_n{k}_count": count(sequence=sequence, number_nucleotides=k)
+            for k in k_mer_sizes
+        },
+    )
+
+
+def _is_acgt(sequence: str) -> bool:
+    return not sequence.translate(_DROP_BASES)
+
+
+def batch_dna_sequence_records(
+    sequences: Sequence[str],
+    ids: Optional[Sequence[int]] = None,
+    min_length: int = MIN_PALINDROME_LENGTH,
+    k_mer_sizes: Iterable[int] = K_MER_SIZES,
+    canonical: bool = False,
+) -> List[DNASequence]:
+    """A DNASequence per read, as create_dna_sequence_record, in input order.
+
+    With canonical the k-mers are counted strand independently, as
+    count_k_mers(..., canonical=True).
+    """
+    if ids is None:
+        ids = range(len(sequences))
+    k_mer_sizes = tuple(k_mer_sizes)
+    records: List[Optional[DNASequence]] = [None] * len(sequences)
+    by_length: Dict[int, List[int]] = defaultdict(list)
+    for i, sequence in enumerate(sequences):
+        if np is not None and _is_acgt(sequence):
+            by_length[len(sequence)].append(i)
+        else:
+            records[i] = _scalar_record(
+                sequence, ids[i], min_length, k_mer_sizes, canonical
+            )
+    for indexes in by_length.values():
+        if len(indexes) < MIN_MATRIX_READS:
+            for i in indexes:
+                records[i] = _scalar_record(
+                    sequences[i], ids[i], min_length, k_mer_sizes, canonical
+                )
+            continue
+        for start in range(0, len(indexes), MATRIX_CHUNK_READS):
+            chunk = indexes[start : start + MATRIX_CHUNK_READS]
+            chunk_records = _matrix_records(
+                [sequences[i] for i in chunk],
+                [ids[i] for i in chunk],
+                min_length,
+                k_mer_sizes,
+                canonical,
+            )
+            for i, record in zip(chunk, chunk_records):
+                records[i] = record
+    return records
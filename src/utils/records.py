@@ -0,0 +1,134 @@
+from array import array
+from typing import Dict, Iterable, Optional
+
+# Compact per-read result record.
+# DNASequence (a NamedTuple) keeps the palindrome and motifs as nested
+# dicts holding a copy of the palindrome string and lists of Python ints,
+# which costs several hundred bytes per read before any k-mers. ReadRecord
+# uses __slots__ (no per instance __dict__) and fixed width fields instead:
+#   palindrome  start and length in the read, the string is sliced on demand
+#   motifs      array("I") of positions, 4 bytes each instead of ~36
+# See records_benchmark.py for the memory and attribute access comparison.
+# The checkpointed run (seq_analysis_multiprocess.process_data_checkpointed)
+# returns and journals its records in this form.
+
+MOTIF_TYPECODE = "I"
+
+
+def _positions(values: Optional[Iterable[int]]) -> array:
+    if isinstance(values, array):
+        return values
+    return array(MOTIF_TYPECODE, values if values is not None else ())
+
+
+class ReadRecord:
+    __slots__ = (
+        "id",
+        "adenine_count",
+        "thymine_count",
+        "guanine_count",
+        "cytosine_count",
+        "palindrome_start",
+        "palindrome_length",
+        "cpg_islands",
+        "tata_boxes",
+        "k_mers",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        adenine_count: int = 0,
+        thymine_count: int = 0,
+        guanine_count: int = 0,
+        cytosine_count: int = 0,
+        palindrome_start: int = 0,
+        palindrome_length: int = 0,
+        cpg_islands: Optional[Iterable[int]] = None,
+        tata_boxes: Optional[Iterable[int]] = None,
+        k_mers: Optional[Dict[str, Dict[str, int]]] = None,
+    ) -> None:
+        self.id = id
+        self.adenine_count = adenine_count
+        self.thymine_count = thymine_count
+        self.guanine_count = guanine_count
+        self.cytosine_count = cytosine_count
+        self.palindrome_start = palindrome_start
+        self.palindrome_length = palindrome_length
+        self.cpg_islands = _positions(cpg_islands)
+        self.tata_boxes = _positions(tata_boxes)
+        self.k_mers = k_mers
+
+    def __reduce__(self):
+        # Positions are pickled as lists: pickle writes small ints in 2
+        # bytes, and an array would add its reconstructor to every record.
+        return self.__class__, (
+            self.id,
+            self.adenine_count,
+            self.thymine_count,
+            self.guanine_count,
+            self.cytosine_count,
+            self.palindrome_start,
+            self.palindrome_length,
+            self.cpg_islands.tolist(),
+            self.tata_boxes.tolist(),
+            self.k_mers,
+        )
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"ReadRecord({fields})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ReadRecord):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def palindrome_seq(self, sequence: str) -> str:
+        return sequence[
+            self.palindrome_start : self.palindrome_start + self.palindrome_length
+        ]
+
+    @classmethod
+    def from_dna_sequence(cls, record, sequence: str) -> "ReadRecord":
+        """Converts a DNASequence; sequence is the read it was computed from."""
+        palindrome = record.palindrome
+        length = palindrome.get("palindrome_length", 0)
+        # The reported palindrome is the leftmost of its length, so its first
+        # occurrence in the read is where it was found.
+        start = sequence.find(palindrome["palindrome_seq"]) if length else 0
+        return cls(
+            id=record.id,
+            adenine_count=record.adenine_count,
+            thymine_count=record.thymine_count,
+            guanine_count=record.guanine_count,
+            cytosine_count=record.cytosine_count,
+            palindrome_start=start,
+            palindrome_length=length,
+            cpg_islands=array(MOTIF_TYPECODE, record.motifs.get("cpg_islands", ())),
+            tata_boxes=array(MOTIF_TYPECODE, record.motifs.get("tata_boxes", ())),
+            k_mers=record.k_mers,
+        )
+
+    def to_dna_sequence(self, sequence: str):
+        """Rebuilds the DNASequence form, e.g. for process_sequence_statistics."""
+        from .data_types import DNASequence
+
+        return DNASequence(
+            id=self.id,
+            adenine_count=self.adenine_count,
+            thymine_count=self.thymine_count,
+            guanine_count=self.guanine_count,
+            cytosine_count=self.cytosine_count,
+            palindrome={
+                "palindrome_seq": self.palindrome_seq(sequence),
+                "palindrome_length": self.palindrome_length,
+            },
+            motifs={
+                "cpg_islands": self.cpg_islands.tolist(),
+                "tata_boxes": self.tata_boxes.tolist(),
+            },
+            k_mers=self.k_mers,
+        )
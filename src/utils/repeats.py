@@ -0,0 +1,121 @@
+from array import array
+from typing import Dict, Iterator, NamedTuple, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the shifted comparison is a zip loop
+    np = None
+
+# Short tandem repeat (STR) detection, periods 1 to 6.
+# A stretch of sequence is a tandem repeat of period p exactly when every
+# base equals the base p positions further on. So for each period the
+# sequence is compared with a copy of itself shifted by p, and each run of
+# L consecutive matches is a repeat covering L + p bases, i.e. (L + p) / p
+# copies of its unit. That is one linear pass per period, whatever the
+# unit, instead of searching for every possible unit as a motif.
+# A region repeating with period 2 also repeats with periods 4 and 6, so a
+# repeat is only reported for the smallest period (its unit is primitive).
+#
+# Results are parallel arrays (starts, ends, periods, copies) in start
+# order, 13 bytes per repeat.
+
+MAX_PERIOD = 6
+MIN_COPIES = 3
+MIN_REPEAT_LENGTH = 8
+VALID_BASES = frozenset("ACGT")
+
+
+class TandemRepeats(NamedTuple):
+    starts: array
+    ends: array
+    periods: array
+    copies: array
+
+    def intervals(self) -> Iterator[Tuple[int, int, int, float]]:
+        """Yields (start, end, period, copies) for each repeat."""
+        return zip(self.starts, self.ends, self.periods, self.copies)
+
+    def units(self, sequence: str) -> Iterator[str]:
+        for start, period in zip(self.starts, self.periods):
+            yield sequence[start : start + period].upper()
+
+
+def is_primitive(unit: str) -> bool:
+    """False if unit is itself a repeat of a shorter unit, e.g. "ACAC"."""
+    period = len(unit)
+    return not any(
+        period % d == 0 and unit == unit[:d] * (period // d) for d in range(1, period)
+    )
+
+
+def _match_runs(sequence: str, period: int) -> Iterator[Tuple[int, int]]:
+    """(start, end) of every run where sequence[i] == sequence[i + period]."""
+    if np is not None:
+        codes = np.frombuffer(sequence.encode("ascii"), dtype=np.uint8)
+        matches = np.zeros(len(codes) - period + 2, dtype=np.int8)
+        matches[1:-1] = codes[:-period] == codes[period:]
+        edges = np.diff(matches)
+        return zip(
+            np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()
+        )
+    return _match_runs_python(sequence, period)
+
+
+def _match_runs_python(sequence: str, period: int) -> Iterator[Tuple[int, int]]:
+    start = None
+    for i, (base, shifted) in enumerate(zip(sequence, sequence[period:])):
+        if base == shifted:
+            if start is None:
+                start = i
+        elif start is not None:
+            yield start, i
+            start = None
+    if start is not None:
+        yield start, len(sequence) - period
+
+
+def find_tandem_repeats(
+    sequence: str,
+    max_period: int = MAX_PERIOD,
+    min_copies: int = MIN_COPIES,
+    min_length: int = MIN_REPEAT_LENGTH,
+) -> TandemRepeats:
+    """Finds every tandem repeat with a period up to max_period.
+
+    A repeat is reported if it has at least min_copies whole copies and
+    covers at least min_length bases. Units containing anything other
+    than ACGT (e.g. runs of N) are ignored.
+    """
+    sequence = sequence.upper()
+    found = []
+    for period in range(1, min(max_period, len(sequence) - 1) + 1):
+        for run_start, run_end in _match_runs(sequence, period):
+            length = run_end - run_start + period
+            if length < min_length or length // period < min_copies:
+                continue
+            unit = sequence[run_start : run_start + period]
+            if VALID_BASES.issuperset(unit) and is_primitive(unit):
+                found.append((run_start, run_start + length, period))
+    found.sort()
+    return TandemRepeats(
+        starts=array("I", [start for start, _, _ in found]),
+        ends=array("I", [end for _, end, _ in found]),
+        periods=array("B", [period for _, _, period in found]),
+        copies=array("f", [(end - start) / period for start, end, period in found]),
+    )
+
+
+def longest_motif_run(sequence: str, motif: str) -> int:
+    """Length in bases of the longest run of back to back copies of motif."""
+    step = len(motif)
+    if not step:
+        return 0
+    # run_at[i] is the length of the run of copies ending with the one at i.
+    run_at: Dict[int, int] = {}
+    longest = 0
+    i = sequence.find(motif)
+    while i != -1:
+        run_at[i] = run_at.pop(i - step, 0) + step
+        longest = max(longest, run_at[i])
+        i = sequence.find(motif, i + 1)
+    return longest
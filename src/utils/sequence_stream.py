@@ -0,0 +1,138 @@
+import json
+import re
+from typing import Iterator, List
+
+from .compressed import open_text
+
+# Streaming reader for the sequences JSON file:
+#   {"num_sequences": 2, "sequence_length": 4, "sequences": ["ACGT", "TTGA"]}
+# json.load has to read and parse the whole document before returning
+# anything, so nothing downstream can start until the last byte arrives.
+# JSONSequenceParser is fed the file chunk by chunk and hands back each
+# sequence string as soon as it is complete.
+#
+# A string cut off at the end of a chunk is kept as a list of pieces and
+# each new chunk is only searched for the closing quote, so a long read
+# spread over many chunks is scanned once and decoded once.
+
+SEQUENCES_KEY = '"sequences"'
+CHUNK_SIZE = 1 << 20
+# Inside a JSON string only a quote (the end) or a backslash (an escape)
+# needs a look.
+STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class JSONSequenceParser:
+    """Incrementally pulls the strings out of the "sequences" array.
+
+    Call close() after the last chunk: it raises ValueError if the document
+    ended before the array did.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = ""
+        self.in_array = False
+        self.done = False
+        # Pieces of a sequence string that is not closed yet.
+        self._pending: List[str] = []
+        # The pending string ends in a backslash, escaping the next chunk's
+        # first character.
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[str]:
+        """Adds a chunk of the document and returns the sequences it completed."""
+        if self.done:
+            return []
+        if not self.in_array:
+            self.buffer += chunk
+            if not self._find_array():
+                return []
+            chunk, self.buffer = self.buffer, ""
+
+        sequences = []
+        position = 0
+        if self._pending:
+            end = self._string_end(chunk, 0)
+            if end == -1:
+                self._pending.append(chunk)
+                return sequences
+            self._pending.append(chunk[: end + 1])
+            sequences.append(json.loads("".join(self._pending)))
+            self._pending = []
+            position = end + 1
+        while True:
+            # Skip the whitespace and commas between array items.
+            while position < len(chunk) and chunk[position] in " \t\r\n,":
+                position += 1
+            if position == len(chunk):
+                break
+            if chunk[position] == "]":
+                self.done = True
+                break
+            if chunk[position] != '"':
+                raise ValueError(
+                    f"Expected a sequence string in the sequences array, "
+                    f"found {chunk[position:position + 20]!r}"
+                )
+            self._escaped = False
+            end = self._string_end(chunk, position + 1)
+            if end == -1:
+                # The string is cut off at the end of the chunk, wait for more.
+                self._pending = [chunk[position:]]
+                break
+            sequences.append(json.loads(chunk[position : end + 1]))
+            position = end + 1
+        return sequences
+
+    def close(self) -> None:
+        """Checks that the whole sequences array was fed."""
+        if self.done:
+            return
+        if not self.in_array:
+            raise ValueError(f"No {SEQUENCES_KEY} array in the document")
+        if self._pending:
+            raise ValueError("Document ends inside a sequence string")
+        raise ValueError(f"Document ends before the {SEQUENCES_KEY} array is closed")
+
+    def _string_end(self, chunk: str, position: int) -> int:
+        """Index of the closing quote of the pending string in chunk, or -1."""
+        if self._escaped:
+            if position == len(chunk):
+                return -1
+            position += 1
+            self._escaped = False
+        while match := STRING_SPECIAL.search(chunk, position):
+            index = match.start()
+            if chunk[index] == '"':
+                return index
+            if index + 1 == len(chunk):
+                self._escaped = True
+                return -1
+            position = index + 2
+        return -1
+
+    def _find_array(self) -> bool:
+        key = self.buffer.find(SEQUENCES_KEY)
+        if key == -1:
+            # Keep enough of the tail to match a key split across chunks.
+            self.buffer = self.buffer[-len(SEQUENCES_KEY) :]
+            return False
+        bracket = self.buffer.find("[", key)
+        if bracket == -1:
+            self.buffer = self.buffer[key:]
+            return False
+        self.buffer = self.buffer[bracket + 1 :]
+        self.in_array = True
+        return True
+
+
+def iter_sequences_file(file_path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yields the sequences of a JSON sequences file without loading it whole.
+
+    gzip, bz2, xz and BGZF files are decompressed on the fly.
+    """
+    parser = JSONSequenceParser()
+    with open_text(file_path) as f:
+        while chunk := f.read(chunk_size):
+            yield from parser.feed(chunk)
+    parser.close()
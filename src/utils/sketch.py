@@ -0,0 +1,202 @@
+import heapq
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .kmer_screen import MASK_64, iter_k_mer_codes, mix64
+from .sequence_stream import iter_sequences_file
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, signatures are computed per k-mer
+    np = None
+
+# Near-duplicate detection with k-mer sketches.
+# clean_sequence_data only drops exact duplicates. Two reads differing by a
+# few bases share most of their k-mers, so the Jaccard similarity of their
+# k-mer sets (shared / total distinct) stays high. Comparing every pair of
+# reads is quadratic, so each read is reduced to a small sketch instead:
+#   MinHash signature  the minimum of num_hashes different hashes over the
+#                      read's k-mers; the fraction of equal positions in
+#                      two signatures estimates their Jaccard similarity
+#   bottom-k sketch    the size smallest distinct hashes of one hash, used
+#                      for Jaccard queries between reads or whole files
+# LSH banding splits each signature into bands of rows. Reads are only
+# compared when some band matches exactly, which for similarity s happens
+# with probability 1 - (1 - s**rows)**bands: near certain above the
+# threshold and rare below it, so no all pairs comparison is needed.
+#
+# k-mers use the same rolling 2-bit codes as kmer_screen.py. The k-mer
+# sizes counted in the statistics (2 to 5) are shared by almost any two
+# reads, so sketches default to k = 16.
+
+SKETCH_K = 16
+NUM_HASHES = 64
+SKETCH_SIZE = 1024
+DEFAULT_THRESHOLD = 0.8
+SEED_STEP = 0x9E3779B97F4A7C15
+# Hash values computed at once by the NumPy minhash_signature, so a long
+# read hashes a block of seeds at a time rather than num_hashes x n_kmers.
+MINHASH_BLOCK_VALUES = 1 << 16
+
+
+def _seeds(num_hashes: int) -> List[int]:
+    return [mix64(i * SEED_STEP & MASK_64) for i in range(1, num_hashes + 1)]
+
+
+def _mix_array(values):
+    """mix64 over a NumPy uint64 array (wrapping arithmetic)."""
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def minhash_signature(
+    sequence: str, k: int = SKETCH_K, num_hashes: int = NUM_HASHES
+) -> array:
+    """MinHash signature of the sequence's k-mers, all MASK_64 if it has none."""
+    codes = set(iter_k_mer_codes(sequence, k))
+    if not codes:
+        return array("Q", [MASK_64] * num_hashes)
+    seeds = _seeds(num_hashes)
+    if np is not None:
+        values = np.fromiter(codes, dtype=np.uint64, count=len(codes))
+        seeds = np.array(seeds, dtype=np.uint64)
+        signature = np.empty(num_hashes, dtype=np.uint64)
+        # Short reads still hash every seed in one go.
+        step = max(1, MINHASH_BLOCK_VALUES // len(values))
+        for start in range(0, num_hashes, step):
+            block = seeds[start : start + step, None]
+            signature[start : start + step] = _mix_array(values ^ block).min(axis=1)
+        return array("Q", signature.tobytes())
+    return array("Q", [min(mix64(code ^ seed) for code in codes) for seed in seeds])
+
+
+def signature_similarity(first: Sequence[int], second: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    if len(first) != len(second):
+        raise ValueError("Signatures must use the same number of hashes")
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+
+def bottom_k_sketch(
+    sequences: Iterable[str], k: int = SKETCH_K, size: int = SKETCH_SIZE
+) -> array:
+    """The size smallest distinct k-mer hashes over all the sequences, sorted."""
+    sketch: set = set()
+    for sequence in sequences:
+        sketch.update(mix64(code) for code in iter_k_mer_codes(sequence, k))
+        if len(sketch) > 2 * size:
+            sketch = set(heapq.nsmallest(size, sketch))
+    return array("Q", sorted(sketch)[:size])
+
+
+def sketch_jaccard(first: Sequence[int], second: Sequence[int], size: int) -> float:
+    """Estimated Jaccard similarity of two bottom-k sketches.
+
+    Exact when both k-mer sets have fewer than size distinct k-mers.
+    """
+    union = heapq.nsmallest(size, set(first) | set(second))
+    if not union:
+        return 0.0
+    first, second = set(first), set(second)
+    return sum(1 for value in union if value in first and value in second) / len(union)
+
+
+def sequence_jaccard(
+    first: str, second: str, k: int = SKETCH_K, size: int = SKETCH_SIZE
+) -> float:
+    return sketch_jaccard(
+        bottom_k_sketch([first], k, size), bottom_k_sketch([second], k, size), size
+    )
+
+
+def file_jaccard(
+    first_path: str, second_path: str, k: int = SKETCH_K, size: int = SKETCH_SIZE
+) -> float:
+    """Jaccard similarity of the k-mer content of two sequence files."""
+    return sketch_jaccard(
+        bottom_k_sketch(iter_sequences_file(first_path), k, size),
+        bottom_k_sketch(iter_sequences_file(second_path), k, size),
+        size,
+    )
+
+
+def lsh_bands(num_hashes: int, threshold: float) -> Tuple[int, int]:
+    """(bands, rows) whose S-curve midpoint (1/bands)**(1/rows) is nearest threshold."""
+    best = None
+    for rows in range(1, num_hashes + 1):
+        bands = num_hashes // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+def _find(parents: List[int], i: int) -> int:
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+
+def find_near_duplicate_clusters(
+    sequences: Sequence[str],
+    threshold: float = DEFAULT_THRESHOLD,
+    k: int = SKETCH_K,
+    num_hashes: int = NUM_HASHES,
+) -> List[List[int]]:
+    """Groups sequence indexes whose estimated Jaccard similarity >= threshold.
+
+    Every index is in exactly one cluster; clusters and their members are in
+    input order, so cluster[0] is the first occurrence.
+    """
+    # Exact duplicates share one signature.
+    unique = {sequence: None for sequence in sequences}
+    for sequence in unique:
+        unique[sequence] = minhash_signature(sequence, k, num_hashes)
+    signatures = [unique[sequence] for sequence in sequences]
+    bands, rows = lsh_bands(num_hashes, threshold)
+    parents = list(range(len(sequences)))
+    for band in range(bands):
+        buckets: Dict[bytes, List[int]] = defaultdict(list)
+        start = band * rows
+        for i, signature in enumerate(signatures):
+            if signature[0] != MASK_64:
+                buckets[signature[start : start + rows].tobytes()].append(i)
+        for members in buckets.values():
+            # Compare each member with one member of every cluster already
+            # met in this bucket, so a bucket of exact duplicates stays linear.
+            seen: List[int] = []
+            for other in members:
+                for first in seen:
+                    root, other_root = _find(parents, first), _find(parents, other)
+                    if root == other_root:
+                        break
+                    # A shared band is only a candidate, the whole signature
+                    # decides, which keeps false positives out of the clusters.
+                    if (
+                        signature_similarity(signatures[first], signatures[other])
+                        >= threshold
+                    ):
+                        parents[max(root, other_root)] = min(root, other_root)
+                        break
+                else:
+                    seen.append(other)
+
+    clusters: Dict[int, List[int]] = defaultdict(list)
+    for i in range(len(sequences)):
+        clusters[_find(parents, i)].append(i)
+    return list(clusters.values())
+
+
+def select_representatives(
+    sequences: Sequence[str],
+    threshold: float = DEFAULT_THRESHOLD,
+    k: int = SKETCH_K,
+    num_hashes: int = NUM_HASHES,
+) -> Tuple[List[str], List[List[int]]]:
+    """One sequence per near-duplicate cluster (its first), and the clusters."""
+    clusters = find_near_duplicate_clusters(sequences, threshold, k, num_hashes)
+    return [sequences[cluster[0]] for cluster in clusters], clusters
@@ -0,0 +1,79 @@
+import importlib
+from typing import Any, Dict, Iterable, Type
+
+# Pluggable analysis stages, registered with __init_subclass__ in the same
+# way as Repository in init_subclass.py:
+#
+#     class GCContentStage(AnalysisStage, stage_name="gc_content"):
+#         def run(self, sequence):
+#             return (sequence.count("G") + sequence.count("C")) / len(sequence)
+#
+# A stage only registers itself once its module is imported, so STAGE_PATHS
+# records where each stage lives, as "module:ClassName". run_stages() (via
+# get_stage()) is the only place stage modules are imported, on first use,
+# so a run that only asks for "nucleotides" never imports the palindrome
+# code at all: utils/basic_stages.py only uses utils/counting.py.
+
+STAGE_PATHS: Dict[str, str] = {
+    "nucleotides": "utils.basic_stages:NucleotideStage",
+    "k_mers": "utils.basic_stages:KMerStage",
+    "motifs": "utils.basic_stages:MotifStage",
+    "palindrome": "utils.palindrome_stage:PalindromeStage",
+    # Instead of "k_mers" with --k-mer-mode canonical, see utils/canonical.py.
+    "canonical_k_mers": "utils.basic_stages:CanonicalKMerStage",
+    "cpg": "utils.basic_stages:CpGStage",
+}
+DEFAULT_STAGES = ("nucleotides", "k_mers", "motifs", "palindrome")
+
+
+class AnalysisStage:
+    _registry: Dict[str, Type["AnalysisStage"]] = {}
+    name: str = ""
+
+    def __init_subclass__(cls, stage_name=None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if stage_name is not None:
+            cls.name = stage_name
+            cls._registry[stage_name] = cls
+
+    def run(self, sequence: str) -> Any:
+        raise NotImplementedError
+
+
+# One instance per stage and process, created on first use.
+_instances: Dict[str, AnalysisStage] = {}
+
+
+def register_stage_path(stage_name: str, path: str) -> None:
+    """Adds a stage that lives in another module, as "module:ClassName"."""
+    STAGE_PATHS[stage_name] = path
+
+
+def load_stage_class(stage_name: str) -> Type[AnalysisStage]:
+    """Imports the class STAGE_PATHS names for stage_name."""
+    if stage_name not in STAGE_PATHS:
+        raise ValueError(f"Unknown analysis stage {stage_name!r}")
+    module, class_name = STAGE_PATHS[stage_name].split(":")
+    # Importing the module runs __init_subclass__, which registers the class.
+    stage_class = getattr(importlib.import_module(module), class_name, None)
+    if stage_class is None or stage_class.name != stage_name:
+        raise ValueError(
+            f"{STAGE_PATHS[stage_name]} does not register stage {stage_name!r}"
+        )
+    return stage_class
+
+
+def get_stage(stage_name: str) -> AnalysisStage:
+    if stage_name not in _instances:
+        stage_class = AnalysisStage._registry.get(stage_name)
+        if stage_class is None:
+            stage_class = load_stage_class(stage_name)
+        _instances[stage_name] = stage_class()
+    return _instances[stage_name]
+
+
+def run_stages(
+    sequence: str, stage_names: Iterable[str] = DEFAULT_STAGES
+) -> Dict[str, Any]:
+    """Runs the selected stages over a sequence, keyed by stage name."""
+    return {name: get_stage(name).run(sequence) for name in stage_names}
@@ -0,0 +1,92 @@
+from array import array
+from itertools import batched
+from typing import Iterable, Iterator, List
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, plain loops are used instead
+    np = None
+
+# Batch temperature conversion for sensor streams.
+# TemperatureConverter.celsius_to_fahrenheit and the Temperature property
+# handle one value at a time. Here a whole buffer (array, memoryview,
+# NumPy array or list) is validated against absolute zero in one pass and
+# converted in one pass. With NumPy, array and memoryview inputs are
+# wrapped without copying and the result can be written into a caller's
+# buffer, including the input itself (out=values).
+# iter_celsius_to_fahrenheit converts an unbounded iterable chunk by chunk.
+
+ABSOLUTE_ZERO_C = -273.15
+STREAM_CHUNK_SIZE = 65_536
+MAX_REPORTED_INDICES = 10
+
+
+class BelowAbsoluteZeroError(ValueError):
+    def __init__(self, indices: List[int]) -> None:
+        self.indices = indices
+        shown = ", ".join(map(str, indices[:MAX_REPORTED_INDICES]))
+        more = "..." if len(indices) > MAX_REPORTED_INDICES else ""
+        super().__init__(
+            f"{len(indices)} temperatures below absolute zero at indices {shown}{more}"
+        )
+
+
+def find_below_absolute_zero(celsius) -> List[int]:
+    """Indices of every value below absolute zero."""
+    if np is not None:
+        return np.flatnonzero(np.asarray(celsius) < ABSOLUTE_ZERO_C).tolist()
+    return [i for i, value in enumerate(celsius) if value < ABSOLUTE_ZERO_C]
+
+
+def celsius_to_fahrenheit_batch(celsius, out=None, validate: bool = True):
+    """Converts a buffer of Celsius values, raising if any is below absolute zero.
+
+    out must be a writable float buffer (array("d"), memoryview, NumPy
+    array) of the same length; it may be celsius itself.
+    Returns out if given, a NumPy array for NumPy input
+    and an array("d") otherwise. Nothing is written if validation fails.
+    """
+    if validate:
+        indices = find_below_absolute_zero(celsius)
+        if indices:
+            raise BelowAbsoluteZeroError(indices)
+    if out is None:
+        if np is not None and isinstance(celsius, np.ndarray):
+            out = np.empty(celsius.shape, dtype=np.float64)
+        else:
+            out = array("d", bytes(8 * len(celsius)))
+    elif len(out) != len(celsius):
+        raise ValueError(f"out has {len(out)} items, expected {len(celsius)}")
+
+    if np is not None:
+        source = np.asarray(celsius)
+        target = np.asarray(out)
+        # Same operations and order as celsius_to_fahrenheit, so results
+        # match it exactly: (celsius * 9 / 5) + 32.
+        np.multiply(source, 9, out=target, casting="unsafe")
+        np.divide(target, 5, out=target)
+        np.add(target, 32, out=target)
+    else:
+        for i, value in enumerate(celsius):
+            out[i] = (value * 9 / 5) + 32
+    return out
+
+
+def iter_celsius_to_fahrenheit(
+    readings: Iterable[float],
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    validate: bool = True,
+) -> Iterator[array]:
+    """Converts an unbounded stream of readings, yielding array("d") chunks.
+
+    Indices in BelowAbsoluteZeroError count from the start of the stream.
+    """
+    offset = 0
+    for chunk in batched(readings, chunk_size):
+        values = array("d", chunk)
+        try:
+            celsius_to_fahrenheit_batch(values, out=values, validate=validate)
+        except BelowAbsoluteZeroError as exc:
+            raise BelowAbsoluteZeroError([i + offset for i in exc.indices]) from None
+        offset += len(values)
+        yield values
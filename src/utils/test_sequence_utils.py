@@ -8,6 +8,8 @@ from .data_types import (
     SequenceStatistics,
 )
 from .markdown import MarkdownGenerator
+from .repeats import longest_motif_run
+from .top_k import top_k_items
 
 GC_ISLAND_MOTIF = "CG"
 TATA_BOX_MOTIF = "TATA"
@@ -15,7 +17,7 @@ MIN_PALINDROME_LENGTH = 20
 
 
 def find_top_values(results: K_MERS, limit: int) -> List[tuple]:
-    return sorted(results.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return top_k_items(results, limit)
 
 
 def clean_sequence_data(
@@ -38,22 +40,10 @@ def clean_sequence_data(
     return clean_list
 
 
-def find_motif(sequence: str, motif: str) -> List[str]:
-    positions = [
-        i for i in range(len(sequence) - 1) if sequence[i : i + len(motif)] == motif
-    ]
-    step = len(motif)
-    pos_len = len(positions)
-    longest = 0
-    seen = set()
-    for i in range(0, pos_len, step):
-        value = sequence[i : i + step]
-        if value == motif:
-            longest += step
-        else:
-            seen.add(longest)
-            longest = 0
-    return max(seen) if len(seen) > 0 else 0
+def find_motif(sequence: str, motif: str) -> int:
+    # Longest run of back to back copies of motif, in bases. For every
+    # short tandem repeat in a sequence see utils/repeats.py.
+    return longest_motif_run(sequence, motif)
 
 
 def reverse_complement(seq):
@@ -137,9 +127,7 @@ def count_k_mers(sequence, number_nucleotides) -> Dict[str, int]:
     for i, _ in enumerate(sequence[: -(number_nucleotides - 1)]):
         key = sequence[i : i + number_nucleotides]
         oligo_counts[key] += 1
-    return dict(
-        sorted(oligo_counts.items(), key=lambda item: item[1], reverse=True)[:5]
-    )
+    return dict(top_k_items(oligo_counts, 5))
 
 
 def update_k_mer_counts(current_counts: dict, new_counts: dict) -> Dict:
@@ -187,12 +175,16 @@ def generate_report(sequence_stats: SequenceStatistics, output_path: str):
     md.add_text(f"Guanine = {sequence_stats['total_guanine_count']}")
     md.add_text(f"Cytosine = {sequence_stats['total_cytosine_count']}")
     md.add_linebreak()
+    # Canonical k-mers stand for themselves and their reverse complement.
+    mode = ", canonical" if sequence_stats.get("k_mer_mode") == "canonical" else ""
     kmers_2_rows = create_k_mer_row(
-        header=["k_mer (k2)", "number"], kmers=sequence_stats["total_k_mer_count_2"]
+        header=[f"k_mer (k2{mode})", "number"],
+        kmers=sequence_stats["total_k_mer_count_2"],
     )
     md.add_table(kmers_2_rows)
     kmers_3_rows = create_k_mer_row(
-        header=["k_mer (k3)", "number"], kmers=sequence_stats["total_k_mer_count_3"]
+        header=[f"k_mer (k3{mode})", "number"],
+        kmers=sequence_stats["total_k_mer_count_3"],
     )
     md.add_table(kmers_3_rows)
     md.save(output_path)
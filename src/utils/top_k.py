@@ -0,0 +1,158 @@
+import heapq
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, Hashable, Iterable, List, Mapping, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, top_k_dense falls back to heapq
+    np = None
+
+# Top-k selection without sorting everything.
+# sorted(counts.items(), ...)[:limit] is O(n log n) for n distinct keys;
+# heapq.nlargest keeps a heap of limit items, O(n log limit), and returns
+# exactly what the sort would, ties included (earlier items first).
+# For dense counts indexed by k-mer code (4**k array entries)
+# numpy.argpartition selects the top entries in O(n).
+#
+# When the exact counts do not fit in memory (large k, many files),
+# SpaceSaving keeps only capacity counters. Every item occurring more
+# than total / capacity times is guaranteed to be kept, and each count
+# overestimates by at most its recorded error. Sketches built by separate
+# workers merge into one with the same guarantee.
+
+TOP_K = 5
+SPACE_SAVING_CAPACITY = 1024
+
+
+def top_k_items(counts: Mapping, limit: int = TOP_K) -> List[Tuple]:
+    """The limit (key, count) pairs with the highest counts, highest first."""
+    return heapq.nlargest(limit, counts.items(), key=itemgetter(1))
+
+
+def top_k_dense(counts, limit: int = TOP_K) -> List[Tuple[int, int]]:
+    """Top (index, count) pairs of a dense count array, ties by lower index."""
+    if np is None:
+        return heapq.nlargest(limit, enumerate(counts), key=itemgetter(1))
+    counts = np.asarray(counts)
+    if limit <= 0:
+        return []
+    if limit >= len(counts):
+        candidates = np.arange(len(counts))
+    else:
+        candidates = np.argpartition(counts, len(counts) - limit)[-limit:]
+        # Entries tied with the smallest selected count may have been left
+        # out in favour of a higher index, so take all of them back in.
+        threshold = counts[candidates].min()
+        candidates = np.union1d(
+            candidates[counts[candidates] > threshold],
+            np.flatnonzero(counts == threshold),
+        )
+    order = np.lexsort((candidates, -counts[candidates]))[:limit]
+    return [(int(i), int(counts[i])) for i in candidates[order]]
+
+
+def merge_top_k(partials: Iterable[Mapping], limit: int = TOP_K) -> List[Tuple]:
+    """Sums count dicts from several workers and returns the top limit pairs."""
+    totals = Counter()
+    for partial in partials:
+        totals.update(partial)
+    return top_k_items(totals, limit)
+
+
+class SpaceSaving:
+    """Streaming heavy hitters in fixed memory (Metwally et al.)."""
+
+    def __init__(self, capacity: int = SPACE_SAVING_CAPACITY) -> None:
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        self.total = 0
+        # Min-heap of (count, item); entries go stale as counts grow and are
+        # skipped when popped, so each update is O(log capacity).
+        self._heap: List[Tuple[int, Hashable]] = []
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def update(self, item: Hashable, count: int = 1) -> None:
+        self.total += count
+        counts = self.counts
+        if item in counts:
+            counts[item] += count
+        elif len(counts) < self.capacity:
+            counts[item] = count
+            self.errors[item] = 0
+        else:
+            # Replace the smallest counter; the newcomer inherits its count
+            # as possible overestimate.
+            smallest, evicted = self._pop_min()
+            del counts[evicted], self.errors[evicted]
+            counts[item] = smallest + count
+            self.errors[item] = smallest
+        heapq.heappush(self._heap, (counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild_heap()
+
+    def update_many(self, items: Iterable[Hashable]) -> None:
+        for item in items:
+            self.update(item)
+
+    def _pop_min(self) -> Tuple[int, Hashable]:
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return count, item
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def min_count(self) -> int:
+        """Count any item not in the sketch may have had (0 until it is full)."""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def top(self, limit: int = TOP_K) -> List[Tuple[Hashable, int]]:
+        return top_k_items(self.counts, limit)
+
+    def guaranteed_count(self, item: Hashable) -> int:
+        """Lower bound on the true count of item."""
+        return self.counts.get(item, 0) - self.errors.get(item, 0)
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Combines two sketches, e.g. one per worker, into a new one."""
+        merged = SpaceSaving(max(self.capacity, other.capacity))
+        floors = (self.min_count(), other.min_count())
+        counts: Dict[Hashable, int] = {}
+        errors: Dict[Hashable, int] = {}
+        for item in self.counts.keys() | other.counts.keys():
+            count = error = 0
+            for sketch, floor in zip((self, other), floors):
+                if item in sketch.counts:
+                    count += sketch.counts[item]
+                    error += sketch.errors[item]
+                else:
+                    # Unseen by that sketch: it may have been evicted there.
+                    count += floor
+                    error += floor
+            counts[item] = count
+            errors[item] = error
+        for item, count in top_k_items(counts, merged.capacity):
+            merged.counts[item] = count
+            merged.errors[item] = errors[item]
+        merged.total = self.total + other.total
+        merged._rebuild_heap()
+        return merged
+
+
+def k_mer_heavy_hitters(
+    sequences: Iterable[str], k: int, capacity: int = SPACE_SAVING_CAPACITY
+) -> SpaceSaving:
+    """Space-Saving sketch of the k-mers (lower case, as count_k_mers) of sequences."""
+    sketch = SpaceSaving(capacity)
+    for sequence in sequences:
+        sequence = sequence.lower().strip()
+        sketch.update_many(sequence[i : i + k] for i in range(len(sequence) - k + 1))
+    return sketch
@@ -0,0 +1,189 @@
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from .canonical import canonicalize_counts
+from .top_k import top_k_items
+
+# Splitting one long sequence into windows that can be analysed in parallel.
+# Each window "owns" a region of start positions [own_start, own_end) and
+# is given a slice of the sequence reaching far enough either side of it
+# for every match starting in that region to be seen in full:
+#   k-mers    k - 1 bases to the right
+#   motifs    len(motif) - 1 bases to the right
+#   palindromes  palindrome_span // 2 bases on both sides of each centre
+# A match is only reported by the window owning its start (or centre for
+# palindromes), so nothing is counted twice at the overlaps and the merged
+# result is identical to analysing the sequence in one pass.
+#
+# Palindromes longer than palindrome_span reach the end of the slice. The
+# window reports those centres as truncated and merge_window_results
+# re-expands them over the full sequence, so even they come out exact.
+
+COMPLEMENT = {"A": "T", "T": "A", "C": "G", "G": "C"}
+DEFAULT_WINDOW_SIZE = 1_000_000
+PALINDROME_SPAN = 10_000
+K_MER_SIZES = (2, 3, 4, 5)
+TOP_K_MERS = 5
+
+
+class WindowTask(NamedTuple):
+    text: str
+    offset: int
+    own_start: int
+    own_end: int
+    sequence_length: int
+    k_mer_sizes: Tuple[int, ...]
+    motifs: Tuple[str, ...]
+
+
+class WindowResult(NamedTuple):
+    nucleotide_counts: Counter
+    k_mer_counts: Dict[int, Dict[str, int]]
+    motif_positions: Dict[str, List[int]]
+    # (length, start) of the longest palindrome found, (0, 0) if none.
+    palindrome: Tuple[int, int]
+    truncated_centres: List[int]
+
+
+def split_windows(
+    sequence: str,
+    window_size: int = DEFAULT_WINDOW_SIZE,
+    k_mer_sizes: Tuple[int, ...] = K_MER_SIZES,
+    motifs: Tuple[str, ...] = (),
+    palindrome_span: int = PALINDROME_SPAN,
+) -> List[WindowTask]:
+    length = len(sequence)
+    left = palindrome_span // 2
+    right = max([left] + [k - 1 for k in k_mer_sizes] + [len(m) - 1 for m in motifs])
+    tasks = []
+    for own_start in range(0, length, window_size):
+        own_end = min(own_start + window_size, length)
+        offset = max(0, own_start - left)
+        tasks.append(
+            WindowTask(
+                sequence[offset : own_end + right],
+                offset,
+                own_start,
+                own_end,
+                length,
+                tuple(k_mer_sizes),
+                tuple(motifs),
+            )
+        )
+    return tasks
+
+
+def expand_palindrome(text: str, centre: int) -> Tuple[int, int]:
+    """Widest (start, end) reverse complement palindrome around an even centre.
+
+    A base is never its own complement, so DNA palindromes always have even
+    length and sit between two bases: centre is the index of the right one.
+    """
+    left, right = centre - 1, centre
+    while left >= 0 and right < len(text) and text[left] == COMPLEMENT.get(text[right]):
+        left -= 1
+        right += 1
+    return left + 1, right
+
+
+def analyse_window(task: WindowTask) -> WindowResult:
+    text, offset = task.text, task.offset
+    own_start, own_end = task.own_start - offset, task.own_end - offset
+    sequence_end = task.sequence_length - offset
+
+    nucleotide_counts = Counter(text[own_start:own_end].lower())
+
+    k_mer_counts = {}
+    lowered = text.lower()
+    for k in task.k_mer_sizes:
+        counts = defaultdict(int)
+        for i in range(own_start, min(own_end, sequence_end - k + 1)):
+            counts[lowered[i : i + k]] += 1
+        k_mer_counts[k] = dict(counts)
+
+    motif_positions = {}
+    # find_motif only checks starts before the last base of the sequence.
+    last_start = min(own_end, sequence_end - 1)
+    for motif in task.motifs:
+        positions = []
+        i = text.find(motif, own_start)
+        while -1 < i < last_start:
+            positions.append(i + offset)
+            i = text.find(motif, i + 1)
+        motif_positions[motif] = positions
+
+    best_length, best_start = 0, 0
+    truncated_centres = []
+    for centre in range(max(own_start, 1), own_end):
+        start, end = expand_palindrome(text, centre)
+        # Reaching the slice edge (but not the sequence edge) means there
+        # may be more palindrome outside this window.
+        if (start == 0 and offset > 0) or (
+            end == len(text) and offset + len(text) < task.sequence_length
+        ):
+            truncated_centres.append(centre + offset)
+        if end - start > best_length:
+            best_length, best_start = end - start, start + offset
+    return WindowResult(
+        nucleotide_counts,
+        k_mer_counts,
+        motif_positions,
+        (best_length, best_start),
+        truncated_centres,
+    )
+
+
+def merge_window_results(
+    sequence: str,
+    results: Iterable[WindowResult],
+    min_length: int,
+    canonical: bool = False,
+) -> Tuple[Counter, Dict[int, Dict[str, int]], Dict[str, List[int]], Dict]:
+    """Combines window results in sequence order into whole sequence results.
+
+    Returns nucleotide counts, the top k-mers per size (as count_k_mers,
+    with canonical as count_k_mers(..., canonical=True)), motif positions
+    (as find_motif) and the longest palindrome (as
+    find_longest_dna_palindrome).
+    """
+    nucleotide_counts = Counter()
+    k_mer_counts: Dict[int, Dict[str, int]] = defaultdict(dict)
+    motif_positions: Dict[str, List[int]] = defaultdict(list)
+    best_length, best_start = 0, 0
+    for result in results:
+        nucleotide_counts.update(result.nucleotide_counts)
+        # Merging windows in order keeps every k-mer at its first occurrence
+        # in the dict, so ties sort the same way as in count_k_mers.
+        for k, counts in result.k_mer_counts.items():
+            merged = k_mer_counts[k]
+            for key, count in counts.items():
+                merged[key] = merged.get(key, 0) + count
+        for motif, positions in result.motif_positions.items():
+            motif_positions[motif].extend(positions)
+        candidates = [result.palindrome] + [
+            (end - start, start)
+            for start, end in map(
+                lambda centre: expand_palindrome(sequence, centre),
+                result.truncated_centres,
+            )
+        ]
+        for length, start in candidates:
+            # Ties go to the leftmost palindrome, as in the single pass.
+            if length > best_length or (
+                length == best_length and length and start < best_start
+            ):
+                best_length, best_start = length, start
+
+    if canonical:
+        k_mer_counts = {k: canonicalize_counts(c) for k, c in k_mer_counts.items()}
+    top_k_mers = {
+        k: dict(top_k_items(counts, TOP_K_MERS)) for k, counts in k_mer_counts.items()
+    }
+    if best_length >= min_length and best_length > 0:
+        palindrome = {
+            "palindrome_seq": sequence[best_start : best_start + best_length],
+            "palindrome_length": best_length,
+        }
+    else:
+        palindrome = {"palindrome_seq": "", "palindrome_length": 0}
+    return nucleotide_counts, top_k_mers, dict(motif_positions), palindrome
@@ -0,0 +1,88 @@
+import random
+import unittest
+from collections import Counter
+from itertools import product
+from unittest import mock
+
+from utils import canonical
+
+COMPLEMENT = str.maketrans("acgt", "tgca")
+
+
+def brute_canonical_counts(sequence, k):
+    sequence = sequence.lower()
+    counts = Counter()
+    for i in range(len(sequence) - k + 1):
+        k_mer = sequence[i : i + k]
+        if set(k_mer) <= set("acgt"):
+            counts[min(k_mer, k_mer.translate(COMPLEMENT)[::-1])] += 1
+    return counts
+
+
+def code_of(k_mer):
+    code = 0
+    for base in k_mer.upper():
+        code = code << 2 | canonical.BASE_CODES[base]
+    return code
+
+
+class CanonicalTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(11)
+        self.reads = [
+            "".join(rng.choice("ACGTN" if i % 3 == 0 else "ACGT") for _ in range(60))
+            for i in range(20)
+        ] + ["ACGT", "AAAA", "N", ""]
+
+    def test_counts_match_brute_force(self):
+        for read in self.reads:
+            for k in range(1, 7):
+                with self.subTest(read=read, k=k):
+                    self.assertEqual(
+                        canonical.count_canonical_k_mers(read, k, limit=4**k),
+                        dict(brute_canonical_counts(read, k)),
+                    )
+
+    def test_top_k_is_the_brute_force_top_k(self):
+        for read in self.reads:
+            counts = brute_canonical_counts(read, 3)
+            top = canonical.count_canonical_k_mers(read, 3)
+            self.assertEqual(len(top), min(5, len(counts)))
+            self.assertEqual(top, {k_mer: counts[k_mer] for k_mer in top})
+            if counts:
+                self.assertEqual(max(top.values()), max(counts.values()))
+
+    def test_ranks_match_brute_force(self):
+        # canonical_ranks is cached, so clear it around each NumPy setting.
+        self.addCleanup(canonical.canonical_ranks.cache_clear)
+        for numpy in {canonical.np, None}:
+            canonical.canonical_ranks.cache_clear()
+            with mock.patch.object(canonical, "np", numpy):
+                for k in range(1, 7):
+                    ranks = canonical.canonical_ranks(k)
+                    codes = canonical.canonical_codes(k)
+                    names = set()
+                    for bases in product("acgt", repeat=k):
+                        k_mer = "".join(bases)
+                        smallest = min(k_mer, k_mer.translate(COMPLEMENT)[::-1])
+                        names.add(smallest)
+                        self.assertEqual(
+                            codes[ranks[code_of(k_mer)]], code_of(smallest)
+                        )
+                    self.assertEqual(canonical.num_canonical_k_mers(k), len(names))
+                    self.assertEqual(codes, sorted(map(code_of, names)))
+
+    def test_dense_counts_match_brute_force(self):
+        expected = Counter()
+        for read in self.reads:
+            expected.update(brute_canonical_counts(read, 4))
+        dense = canonical.dense_canonical_counts(self.reads, 4)
+        codes = canonical.canonical_codes(4)
+        self.assertEqual(
+            {
+                canonical.decode_code(codes[rank], 4): int(count)
+                for rank, count in enumerate(dense)
+                if count
+            },
+            dict(expected),
+        )
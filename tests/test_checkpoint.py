@@ -0,0 +1,29 @@
+import hashlib
+import tempfile
+import unittest
+
+from utils.checkpoint import CheckpointJournal, fingerprint_sequences
+
+
+class FingerprintTest(unittest.TestCase):
+    reads = ["ACGT", "TTGA"]
+
+    def test_k_mer_mode_is_part_of_the_fingerprint(self):
+        forward = fingerprint_sequences(self.reads, 4)
+        self.assertEqual(forward, fingerprint_sequences(self.reads, 4, "forward"))
+        self.assertNotEqual(forward, fingerprint_sequences(self.reads, 4, "canonical"))
+        # Journals written before k-mer modes existed still resume.
+        self.assertEqual(forward, hashlib.sha256(b"4ACGT\nTTGA\n").hexdigest())
+
+    def test_resuming_in_another_mode_raises(self):
+        with tempfile.TemporaryDirectory() as directory:
+            CheckpointJournal(directory, fingerprint_sequences(self.reads, 4)).flush()
+            CheckpointJournal(
+                directory, fingerprint_sequences(self.reads, 4), resume=True
+            )
+            with self.assertRaises(ValueError):
+                CheckpointJournal(
+                    directory,
+                    fingerprint_sequences(self.reads, 4, "canonical"),
+                    resume=True,
+                )
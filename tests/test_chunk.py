@@ -0,0 +1,38 @@
+import random
+import unittest
+from itertools import islice
+
+from utils.chunk import Chunker
+
+
+class ChunkerTest(unittest.TestCase):
+    def test_spans_match_offsets(self):
+        chunker = Chunker()
+        rng = random.Random(33)
+        for _ in range(500):
+            length, size = rng.randint(0, 60), rng.randint(1, 20)
+            stride = rng.randint(1, 25)
+            starts, ends = chunker.offsets(length, size, stride=stride)
+            self.assertEqual(
+                list(chunker.spans(length, size, stride=stride)),
+                list(zip(starts, ends)),
+            )
+
+    def test_spans_are_lazy(self):
+        # Building every span of a terabyte text up front would not finish.
+        spans = Chunker().spans(10**12, size=100, stride=1)
+        self.assertEqual(list(islice(spans, 2)), [(0, 100), (1, 101)])
+
+    def test_chunk_content(self):
+        text = "ACGTACGTAC"
+        documents = list(Chunker().chunk(text, size=4, overlap=1))
+        self.assertEqual([d.content for d in documents], ["ACGT", "TACG", "GTAC"])
+        self.assertEqual([d.id for d in documents], [0, 1, 2])
+
+    def test_invalid_stride(self):
+        with self.assertRaises(ValueError):
+            list(Chunker().spans(10, size=4, overlap=4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import cli
+
+try:
+    import utils.data_types  # noqa: F401
+except ImportError as exc:  # utils/data_types.py is not in every checkout
+    MISSING = str(exc)
+else:
+    MISSING = ""
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+
+
+class CliTest(unittest.TestCase):
+    def test_daemon_rejects_pool_options(self):
+        for option in (["--executor", "thread"], ["--workers", "2"]):
+            args = cli.build_parser().parse_args(
+                ["analyze", "data", "--daemon"] + option
+            )
+            with self.assertRaises(SystemExit):
+                cli.analyze(args)
+
+    def test_k_mer_mode_flag(self):
+        parser = cli.build_parser()
+        for command in (["analyze", "data"], ["report", "data", "out.md"]):
+            self.assertEqual(parser.parse_args(command).k_mer_mode, "forward")
+            args = parser.parse_args(command + ["--k-mer-mode", "canonical"])
+            self.assertEqual(args.k_mer_mode, "canonical")
+        with self.assertRaises(SystemExit):
+            parser.parse_args(["analyze", "data", "--k-mer-mode", "reverse"])
+
+        args = parser.parse_args(
+            ["analyze", "data", "--daemon", "--k-mer-mode", "canonical"]
+        )
+        with mock.patch.object(cli, "send_job") as send_job:
+            cli.analyze(args)
+        self.assertEqual(send_job.call_args.args[1]["k_mer_mode"], "canonical")
+
+    @unittest.skipIf(MISSING, MISSING)
+    def test_canonical_analysis(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "reads.json"), "w") as f:
+                json.dump({"num_sequences": 2, "sequences": ["ACGTTT", "AAACGT"]}, f)
+            args = cli.build_parser().parse_args(
+                ["analyze", directory, "--executor", "inline"]
+                + ["--k-mer-mode", "canonical"]
+            )
+            combined = cli.analyze(args)["combined"]
+        self.assertEqual(combined["k_mer_mode"], "canonical")
+        # aaa and ttt are one canonical k-mer, as are acg and cgt.
+        self.assertEqual(combined["k_mer_count_3"]["aaa"], 2)
+        self.assertEqual(combined["k_mer_count_3"]["acg"], 4)
+        self.assertNotIn("ttt", combined["k_mer_count_3"])
+
+    def test_index_imports_no_analysis_code(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "reads.json"), "w") as f:
+                json.dump({"num_sequences": 2, "sequences": ["ACGTAC", "ACGN"]}, f)
+            script = (
+                "import sys, cli; "
+                f"cli.main(['index', {directory!r}, {directory!r} + '/reads.packed', "
+                "'--format', 'packed']); "
+                "print(sorted(m for m in sys.modules "
+                "if m.startswith(('multiprocessing', 'seq_analysis', 'utils.stages'))))"
+            )
+            output = subprocess.run(
+                [sys.executable, "-c", script],
+                cwd=SRC_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.splitlines()
+        self.assertEqual(
+            output, ["Indexed 1 sequences into " + directory + "/reads.packed", "[]"]
+        )
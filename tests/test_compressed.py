@@ -0,0 +1,87 @@
+import bz2
+import gzip
+import json
+import lzma
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import unittest
+import zlib
+
+from utils.compressed import detect_compression, open_text, write_bgzf
+from utils.inputs import load_sequences_file, resolve_input_files
+from utils.sequence_stream import iter_sequences_file
+
+
+def writer(open_function):
+    def write(path, data):
+        with open_function(path, "wb") as f:
+            f.write(data)
+
+    return write
+
+
+WRITERS = {
+    None: writer(open),
+    "gzip": writer(gzip.open),
+    "bz2": writer(bz2.open),
+    "xz": writer(lzma.open),
+    "bgzf": write_bgzf,
+}
+SUFFIXES = {None: "", "gzip": ".gz", "bz2": ".bz2", "xz": ".xz", "bgzf": ".bgz"}
+
+
+class CompressedTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(9)
+        sequences = [
+            "".join(rng.choice("ACGT") for _ in range(rng.randrange(50, 500)))
+            for _ in range(600)
+        ]
+        self.document = {"num_sequences": len(sequences), "sequences": sequences}
+        # Over 64 KiB, so the BGZF file has several blocks.
+        self.data = json.dumps(self.document).encode()
+        self.assertGreater(len(self.data), 2 * 65280)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, compression):
+        path = os.path.join(self.directory, "reads.json" + SUFFIXES[compression])
+        WRITERS[compression](path, self.data)
+        return path
+
+    def test_every_format_round_trips(self):
+        for compression in WRITERS:
+            with self.subTest(compression=compression):
+                path = self.write(compression)
+                self.assertEqual(detect_compression(path), compression)
+                with open_text(path) as f:
+                    self.assertEqual(f.read(), self.data.decode())
+                self.assertEqual(load_sequences_file(path), self.document)
+                self.assertEqual(
+                    list(iter_sequences_file(path, chunk_size=1000)),
+                    self.document["sequences"],
+                )
+        self.assertEqual(len(resolve_input_files(self.directory)), len(WRITERS))
+
+    def test_bgzf_is_readable_as_gzip(self):
+        path = self.write("bgzf")
+        with gzip.open(path, "rb") as f:
+            self.assertEqual(f.read(), self.data)
+        if shutil.which("gzip") is None:
+            self.skipTest("no gzip command")
+        output = subprocess.run(
+            ["gzip", "-dc", path], capture_output=True, check=True
+        ).stdout
+        self.assertEqual(output, self.data)
+
+    def test_corrupt_bgzf_block_raises(self):
+        path = self.write("bgzf")
+        with open(path, "r+b") as f:
+            f.seek(-40, os.SEEK_END)
+            f.write(b"\0\0\0\0")
+        with self.assertRaises((ValueError, zlib.error)), open_text(path) as f:
+            f.read()
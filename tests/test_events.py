@@ -0,0 +1,39 @@
+import multiprocessing
+import time
+import unittest
+
+from utils.events import EventBus, emit_event, init_worker_events
+
+
+def emit_progress(index):
+    emit_event("progress", index)
+    return index
+
+
+class WorkerEventsTest(unittest.TestCase):
+    def test_documented_pool_usage_delivers_every_event(self):
+        received = []
+        with EventBus() as bus:
+            bus.subscribe("progress", received.extend)
+            with multiprocessing.Pool(
+                2, initializer=init_worker_events, initargs=(bus.process_queue,)
+            ) as pool:
+                pool.map(emit_progress, range(100))
+                pool.close()
+                pool.join()
+        self.assertEqual(sorted(event.payload for event in received), list(range(100)))
+
+    def test_idle_worker_flushes_within_the_interval(self):
+        received = []
+        with EventBus() as bus:
+            bus.subscribe("progress", received.extend)
+            with multiprocessing.Pool(
+                1,
+                initializer=init_worker_events,
+                initargs=(bus.process_queue, 1000, 0.05),
+            ) as pool:
+                pool.map(emit_progress, range(3))
+                deadline = time.monotonic() + 5
+                while len(received) < 3 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+        self.assertEqual(sorted(event.payload for event in received), [0, 1, 2])
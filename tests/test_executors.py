@@ -0,0 +1,36 @@
+import time
+import unittest
+
+from utils.executors import create_pool, imap_bounded
+
+
+def slow_square(x):
+    time.sleep(0.001)
+    return x * x
+
+
+class ImapBoundedTest(unittest.TestCase):
+    def test_reads_at_most_max_in_flight_ahead(self):
+        for backend in ("thread", "inline"):
+            pulled = []
+
+            def items():
+                for x in range(200):
+                    pulled.append(x)
+                    yield x
+
+            with self.subTest(backend=backend), create_pool(backend, 2) as pool:
+                results = []
+                for result in imap_bounded(pool, slow_square, items(), 8, 4):
+                    self.assertLessEqual(len(pulled) - len(results), 8)
+                    results.append(result)
+                self.assertEqual(sorted(results), [x * x for x in range(200)])
+
+    def test_stopping_early_frees_the_pool(self):
+        with create_pool("thread", 2) as pool:
+            for _ in imap_bounded(pool, slow_square, iter(range(1000)), 4):
+                break
+            # The abandoned generator must not hold up the pool's task thread.
+            self.assertEqual(pool.map(slow_square, [2, 3]), [4, 9])
+        with self.assertRaises(ValueError):
+            next(imap_bounded(pool, slow_square, [1], 2, chunksize=4))
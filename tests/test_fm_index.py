@@ -0,0 +1,48 @@
+import random
+import unittest
+from unittest import mock
+
+from utils import fm_index
+from utils.fm_index import FMIndex
+
+
+def find_all(sequences, pattern):
+    hits = []
+    for sequence_id, sequence in enumerate(sequences):
+        position = sequence.find(pattern)
+        while position != -1:
+            hits.append((sequence_id, position))
+            position = sequence.find(pattern, position + 1)
+    return hits
+
+
+class FMIndexTest(unittest.TestCase):
+    def check_against_find(self):
+        rng = random.Random(27)
+        for _ in range(300):
+            sequences = [
+                "".join(rng.choices("ACGT", k=rng.randint(1, 12)))
+                for _ in range(rng.randint(1, 4))
+            ]
+            index = FMIndex.build(sequences)
+            for _ in range(5):
+                pattern = "".join(rng.choices("ACGT", k=rng.randint(1, 4)))
+                expected = find_all(sequences, pattern)
+                self.assertEqual(index.locate(pattern), expected, (sequences, pattern))
+                self.assertEqual(index.count(pattern), len(expected))
+
+    def test_short_text(self):
+        with mock.patch.object(fm_index, "np", None):
+            self.assertEqual(FMIndex.build(["AT", "C"]).locate("A"), [(0, 0)])
+
+    def test_locate_python(self):
+        with mock.patch.object(fm_index, "np", None):
+            self.check_against_find()
+
+    @unittest.skipIf(fm_index.np is None, "NumPy not installed")
+    def test_locate_numpy(self):
+        self.check_against_find()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import unittest
+
+from utils.governor import GovernedPool, parse_size
+
+
+def square(x):
+    return x * x
+
+
+PARENT_ALLOCATION = 300 << 20
+
+
+class GovernorTest(unittest.TestCase):
+    def test_parse_size(self):
+        self.assertEqual(parse_size("8GiB"), 8 << 30)
+        self.assertEqual(parse_size("8gib"), 8 << 30)
+        self.assertEqual(parse_size("512M"), 512 << 20)
+        self.assertEqual(parse_size("1.5K"), 1536)
+        self.assertEqual(parse_size("1000000"), 1_000_000)
+        with self.assertRaises(ValueError):
+            parse_size("8 gigs")
+
+    def test_idle_workers_above_target_are_retired(self):
+        with GovernedPool(1 << 40, max_workers=3) as pool:
+            self.assertEqual(pool.map(square, range(20)), [x * x for x in range(20)])
+            self.assertEqual(len(pool._workers), 3)
+            pool.target_workers = 1
+            pool._retire_idle_workers()
+            self.assertEqual(len(pool._workers), 1)
+            self.assertEqual(pool.map(square, range(5)), [0, 1, 4, 9, 16])
+
+    @unittest.skipUnless(os.path.exists("/proc/self/smaps_rollup"), "needs Linux")
+    def test_pages_shared_with_the_parent_are_not_counted_per_worker(self):
+        # Forked workers share the parent's pages copy on write; counted
+        # once per process they would put every worker over its share.
+        allocation = b"x" * PARENT_ALLOCATION
+        with GovernedPool(512 << 20, max_workers=2) as pool:
+            # No worker is stopped for going over the budget.
+            with self.assertNoLogs("utils.governor", "WARNING"):
+                results = pool.map(square, range(200))
+            self.assertEqual(results, [x * x for x in range(200)])
+            self.assertEqual(pool.recycled, 0)
+            self.assertLess(pool.total_memory(), 512 << 20)
+        del allocation
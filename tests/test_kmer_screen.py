@@ -0,0 +1,37 @@
+import random
+import unittest
+from unittest import mock
+
+from utils import kmer_screen
+from utils.kmer_screen import SortedKMerSet, iter_k_mer_codes
+
+
+class SortedKMerSetTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(1)
+        self.reads = ["".join(rng.choices("ACGTN", k=200)) for _ in range(50)]
+        self.reads += self.reads[:10] + [""]
+
+    def check_build(self, k):
+        expected = sorted({c for read in self.reads for c in iter_k_mer_codes(read, k)})
+        # Small chunks so that the chunk merge runs too.
+        for chunk in (kmer_screen.BUILD_CHUNK_CODES, 500):
+            with mock.patch.object(kmer_screen, "BUILD_CHUNK_CODES", chunk):
+                built = SortedKMerSet.build(self.reads, k)
+            self.assertEqual(built.codes.typecode, "Q")
+            self.assertEqual(list(built.codes), expected)
+
+    def test_build_numpy(self):
+        if kmer_screen.np is None:
+            self.skipTest("NumPy is not installed")
+        for k in (3, 21, 32):
+            self.check_build(k)
+
+    def test_build_python(self):
+        with mock.patch.object(kmer_screen, "np", None):
+            for k in (3, 21, 32):
+                self.check_build(k)
+
+    def test_build_empty(self):
+        self.assertEqual(len(SortedKMerSet.build([], 5)), 0)
+        self.assertEqual(len(SortedKMerSet.build(["AC"], 5)), 0)
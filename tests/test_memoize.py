@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+from utils.memoize import make_key, memoize
+
+
+class MemoizeTest(unittest.TestCase):
+    def test_container_types_are_distinct_keys(self):
+        keys = {
+            make_key(([1, 2],), {}),
+            make_key(((1, 2),), {}),
+            make_key(({1: 2},), {}),
+            make_key((((1, 2),),), {}),
+            make_key(({1, 2},), {}),
+            make_key((frozenset({1, 2}),), {}),
+        }
+        self.assertEqual(len(keys), 6)
+        self.assertEqual(make_key(([1, [2]],), {}), make_key(([1, [2]],), {}))
+
+    def test_list_and_tuple_arguments_are_cached_apart(self):
+        @memoize()
+        def kind(value):
+            return type(value).__name__
+
+        self.assertEqual(kind([1, 2]), "list")
+        self.assertEqual(kind((1, 2)), "tuple")
+        self.assertEqual(kind([1, 2]), "list")
+        self.assertEqual(kind.cache_info()[:2], (1, 2))
+
+    def test_disk_tier_survives_a_new_memoizer(self):
+        calls = []
+
+        def square(x):
+            calls.append(x)
+            return x * x
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache")
+            first = memoize(disk_path=path)(square)
+            self.assertEqual(first(3), 9)
+            first.close()
+            second = memoize(disk_path=path)(square)
+            self.assertEqual(second(3), 9)
+            self.assertEqual(second(3), 9)
+            second.close()
+        self.assertEqual(calls, [3])
+        self.assertEqual(second.cache_info()[:2], (2, 0))
+
+    def test_copy_result_hands_out_copies(self):
+        @memoize(copy_result=list)
+        def letters(word):
+            return list(word)
+
+        first = letters("abc")
+        first.append("d")
+        self.assertEqual(letters("abc"), ["a", "b", "c"])
+        self.assertEqual(letters.cache_info()[:2], (1, 1))
+
+    def test_hot_functions_are_memoized(self):
+        try:
+            from utils.sequence_utils import count_k_mers, find_longest_dna_palindrome
+        except ImportError as exc:  # utils/data_types.py is not in every checkout
+            self.skipTest(str(exc))
+
+        read = "ACGTACGTTTACGT"
+        count_k_mers.cache_clear()
+        self.assertEqual(count_k_mers(read, 2), count_k_mers(read, 2))
+        self.assertEqual(count_k_mers.cache_info()[:2], (1, 1))
+        self.assertEqual(count_k_mers(read, 2, True), count_k_mers(read, 2, True))
+        self.assertNotEqual(count_k_mers(read, 2), count_k_mers(read, 2, True))
+        self.assertEqual(
+            find_longest_dna_palindrome(read, 4), find_longest_dna_palindrome(read, 4)
+        )
+
+    def test_modifying_a_hot_result_leaves_the_cache_alone(self):
+        try:
+            from utils.sequence_utils import count_k_mers, find_longest_dna_palindrome
+        except ImportError as exc:  # utils/data_types.py is not in every checkout
+            self.skipTest(str(exc))
+
+        read = "ACGTACGTTTACGT"
+        counts = count_k_mers(read, 2)
+        expected = dict(counts)
+        counts["ac"] += 100
+        counts["zz"] = 1
+        self.assertEqual(count_k_mers(read, 2), expected)
+        palindrome = find_longest_dna_palindrome(read, 4)
+        expected = dict(palindrome)
+        palindrome["palindrome_seq"] = ""
+        self.assertEqual(find_longest_dna_palindrome(read, 4), expected)
@@ -0,0 +1,74 @@
+import os
+import random
+import tempfile
+import unittest
+
+from utils.packed_store import PackedSequenceStore, write_packed_store
+
+try:
+    import seq_analysis_multiprocess as analysis
+    from utils.sequence_utils import find_longest_dna_palindrome
+except ImportError as exc:  # utils/data_types.py is not in every checkout
+    analysis, MISSING = None, str(exc)
+else:
+    MISSING = ""
+
+
+def find_motif(sequence, motif):
+    return [
+        i for i in range(len(sequence) - 1) if sequence[i : i + len(motif)] == motif
+    ]
+
+
+class PackedStoreTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.reads = ["", "A", "CG", "TATAT", "ACGTNNACGTRYCG", "nnTATA"] + [
+            "".join(rng.choice("ACGT") for _ in range(rng.randrange(1, 90)))
+            for _ in range(40)
+        ]
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "reads.packed")
+        write_packed_store(self.reads, self.path)
+        self.store = PackedSequenceStore(self.path)
+        self.addCleanup(self.store.close)
+
+    def test_round_trip(self):
+        expected = [
+            read.upper().replace("R", "N").replace("Y", "N") for read in self.reads
+        ]
+        self.assertEqual(list(self.store), expected)
+        self.assertEqual(self.store.mask(4), [(4, 2), (10, 2)])
+
+    def test_find_motif_matches_the_decoded_read(self):
+        motifs = ("CG", "TATA", "A", "ACGTAC", "GATTACAGT", "CGN", "")
+        for index, sequence in enumerate(self.store):
+            for motif in motifs:
+                with self.subTest(sequence=sequence, motif=motif):
+                    self.assertEqual(
+                        self.store.find_motif(index, motif),
+                        find_motif(sequence, motif),
+                    )
+
+    def test_longest_palindrome(self):
+        write_packed_store(["TTACGCGTAA" + "GAATTC", "ANNT", "ACG"], self.path)
+        with PackedSequenceStore(self.path) as store:
+            self.assertEqual(
+                store.longest_palindrome(0, 4),
+                {"palindrome_seq": "TTACGCGTAA", "palindrome_length": 10},
+            )
+            self.assertEqual(store.longest_palindrome(1, 2)["palindrome_length"], 0)
+            self.assertEqual(store.longest_palindrome(2, 2)["palindrome_seq"], "CG")
+
+    @unittest.skipIf(analysis is None, MISSING)
+    def test_packed_records_match_the_str_path(self):
+        for index, sequence in enumerate(self.reads[6:], 6):
+            self.assertEqual(
+                self.store.longest_palindrome(index, 4),
+                find_longest_dna_palindrome(sequence, 4),
+            )
+        expected = [analysis.process_data(read) for read in self.reads[6:]]
+        packed = analysis.process_packed_data_parallel(self.path, executor="inline")
+        for record, packed_record in zip(expected, packed[6:]):
+            self.assertEqual(packed_record[1:], record[1:])
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+from array import array
+
+from utils.packed_store import PackedSequenceStore, write_packed_store
+from utils.pager import Pager
+
+
+class PagerTest(unittest.TestCase):
+    def pages(self, source, page_size=4):
+        with Pager(source, page_size=page_size) as pager:
+            pages = []
+            while (page := pager.next_page()) is not None:
+                pages.append(page)
+            return pages, pager.page(1)
+
+    def test_sequences(self):
+        expected = [(0, 1, 2, 3), (4, 5, 6, 7), (8, 9)]
+        for source in (list(range(10)), range(10), array("i", range(10))):
+            self.assertEqual(self.pages(source), (expected, expected[1]))
+
+    def test_iterator_spills(self):
+        pages, second = self.pages(iter(range(10)))
+        self.assertEqual(pages, [(0, 1, 2, 3), (4, 5, 6, 7), (8, 9)])
+        self.assertEqual(second, (4, 5, 6, 7))
+
+    def test_mapping_pages_keys(self):
+        pages, _ = self.pages({"a": 1, "b": 2, "c": 3}, page_size=2)
+        self.assertEqual(pages, [("a", "b"), ("c",)])
+
+    def test_packed_store(self):
+        sequences = ["ACGT", "GGA", "TTTN", "CA", "G"]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "store.seq2")
+            write_packed_store(sequences, path)
+            with PackedSequenceStore(path) as store:
+                pages, second = self.pages(store, page_size=2)
+        self.assertEqual(pages, [("ACGT", "GGA"), ("TTTN", "CA"), ("G",)])
+        self.assertEqual(second, ("TTTN", "CA"))
+
+
+if __name__ == "__main__":
+    unittest.main()
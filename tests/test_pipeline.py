@@ -0,0 +1,85 @@
+import unittest
+
+from utils.pipeline import PROCESS, THREAD, Pipeline, stage
+
+
+def double(x):
+    return 2 * x
+
+
+def increment(x):
+    return x + 1
+
+
+def square(x):
+    return x * x
+
+
+def running_total(values):
+    total, totals = 0, []
+    for value in values:
+        total += value
+        totals.append(total)
+    return totals
+
+
+class PipelineTest(unittest.TestCase):
+    values = list(range(300))
+
+    def test_adjacent_stages_of_a_kind_are_fused(self):
+        pipeline = Pipeline(
+            double,
+            increment,
+            stage(square, parallel=THREAD),
+            stage(double, parallel=THREAD),
+            stage(running_total, batch=True),
+            increment,
+        )
+        self.assertEqual(
+            [s.name for s in pipeline.fused],
+            ["double+increment", "square+double", "running_total", "increment"],
+        )
+        with pipeline:
+            pipeline.run_batch(self.values)
+        self.assertEqual(
+            sorted(name for name, _ in pipeline.report()),
+            ["0:double+increment", "1:square+double", "2:running_total", "3:increment"],
+        )
+
+    def test_run_batch_matches_calling_each_value(self):
+        for parallel in (None, THREAD, PROCESS):
+            with (
+                self.subTest(parallel=parallel),
+                Pipeline(
+                    double,
+                    stage(square, parallel=parallel),
+                    stage(increment, parallel=parallel),
+                    max_workers=2,
+                    chunksize=16,
+                ) as pipeline,
+            ):
+                expected = [pipeline(value) for value in self.values]
+                self.assertEqual(expected, [(2 * v) ** 2 + 1 for v in self.values])
+                self.assertEqual(pipeline.run_batch(self.values), expected)
+
+    def test_batch_stages_get_whole_lists(self):
+        with Pipeline(increment, stage(running_total, batch=True)) as pipeline:
+            self.assertEqual(pipeline.run_batch([0, 1, 2]), [1, 3, 6])
+            # Called on one value, a batch stage gets a list of one.
+            self.assertEqual(pipeline(4), 5)
+        # A parallel batch stage is called once per chunk.
+        with Pipeline(
+            stage(running_total, batch=True, parallel=THREAD), chunksize=2
+        ) as pipeline:
+            self.assertEqual(pipeline.run_batch([1, 1, 1, 1, 1]), [1, 2, 1, 2, 1])
+
+    def test_unordered_stage_returns_every_result(self):
+        with Pipeline(
+            stage(square, parallel=THREAD, ordered=False), max_workers=4, chunksize=8
+        ) as pipeline:
+            results = pipeline.run_batch(self.values)
+        self.assertEqual(sorted(results), [v * v for v in self.values])
+
+    def test_unknown_parallel_kind(self):
+        with self.assertRaises(ValueError):
+            stage(square, parallel="gpu")
@@ -0,0 +1,85 @@
+import random
+import unittest
+from unittest import mock
+
+try:
+    from utils import read_matrix
+except ImportError as exc:  # utils/data_types.py is not in every checkout
+    read_matrix, MISSING = None, str(exc)
+else:
+    MISSING = ""
+
+
+def random_reads(rng, count, length):
+    return ["".join(rng.choice("ACGT") for _ in range(length)) for _ in range(count)]
+
+
+@unittest.skipIf(read_matrix is None, MISSING)
+class BatchRecordsTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        palindromes = [
+            "AAGCTTACGTAAGCTT",
+            "GAATTCGAATTC" + "ACGT" * 3,
+            "GGATCCAAGCTTACGTAAGCTTGGATCC",
+        ]
+        ties = ["ACGTACGTACGT", "AACCGGTT" * 2, "ATATATATAT", "CCCCCCCC"]
+        self.reads = (
+            random_reads(rng, 12, 40)  # one matrix
+            + random_reads(rng, 9, 23)  # another length, odd
+            + random_reads(rng, 3, 31)  # below MIN_MATRIX_READS
+            + ["A", "", "CG", "ACG"]
+            + [p + "T" * (40 - len(p)) for p in palindromes] * 4
+            + [t * (40 // len(t)) + "A" * (40 % len(t)) for t in ties] * 2
+        )
+        rng.shuffle(self.reads)
+
+    def scalar(self, reads, min_length=20, canonical=False):
+        return [
+            read_matrix._scalar_record(read, i, min_length, (2, 3, 4, 5), canonical)
+            for i, read in enumerate(reads)
+        ]
+
+    def test_batch_matches_scalar_path(self):
+        for min_length in (4, 20):
+            for canonical in (False, True):
+                with self.subTest(min_length=min_length, canonical=canonical):
+                    self.assertEqual(
+                        read_matrix.batch_dna_sequence_records(
+                            self.reads, min_length=min_length, canonical=canonical
+                        ),
+                        self.scalar(self.reads, min_length, canonical),
+                    )
+
+    @unittest.skipIf(read_matrix is None or read_matrix.np is None, "no NumPy")
+    def test_matrix_path_matches_scalar_path(self):
+        # The batch above sends short lengths to the scalar path; check the
+        # matrix code on its own for every length, odd ones included.
+        for length in (2, 5, 23, 40):
+            reads = [r for r in self.reads if len(r) == length]
+            reads = reads or random_reads(random.Random(length), 8, length)
+            for canonical in (False, True):
+                with self.subTest(length=length, canonical=canonical):
+                    self.assertEqual(
+                        read_matrix._matrix_records(
+                            reads, range(len(reads)), 4, (2, 3, 4, 5), canonical
+                        ),
+                        self.scalar(reads, 4, canonical),
+                    )
+
+    def test_top_k_ties_keep_the_first_seen(self):
+        if read_matrix.np is None:
+            self.skipTest("no NumPy")
+        reads = ["ACGTACGTACGTACGT"] * read_matrix.MIN_MATRIX_READS
+        codes = read_matrix.base_codes(read_matrix.encode_reads(reads))
+        # acg, cgt, gta and tac all occur 4 or 3 times; order as count_k_mers.
+        expected = self.scalar(reads[:1])[0].k_mers["k_mer_n3_count"]
+        self.assertEqual(read_matrix.top_k_mers(codes, 3)[0], expected)
+        self.assertEqual(list(read_matrix.top_k_mers(codes, 3)[0]), list(expected))
+
+    def test_without_numpy_every_read_takes_the_scalar_path(self):
+        with mock.patch.object(read_matrix, "np", None):
+            self.assertEqual(
+                read_matrix.batch_dna_sequence_records(self.reads, canonical=True),
+                self.scalar(self.reads, canonical=True),
+            )
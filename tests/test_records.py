@@ -0,0 +1,16 @@
+import pickle
+import unittest
+from array import array
+
+from utils.records import ReadRecord
+
+
+class ReadRecordTest(unittest.TestCase):
+    def test_pickle_round_trip(self):
+        record = ReadRecord(
+            7, 1, 2, 3, 4, 5, 20, [3, 57], array("I", [88]), {"k_mer_n2_count": {}}
+        )
+        copy = pickle.loads(pickle.dumps(record))
+        self.assertEqual(copy, record)
+        self.assertEqual(copy.cpg_islands, array("I", [3, 57]))
+        self.assertEqual(ReadRecord(1).tata_boxes, array("I"))
@@ -0,0 +1,150 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+try:
+    import seq_analysis_multiprocess as analysis
+except ImportError as exc:  # utils/data_types.py is not in every checkout
+    analysis, MISSING = None, str(exc)
+else:
+    MISSING = ""
+
+
+class DieBeforeReporting:
+    """Stands in for the started queue; the first worker to start chunk 0 dies."""
+
+    def __init__(self, queue, marker):
+        self.queue = queue
+        self.marker = marker
+
+    def put(self, item):
+        if item[0] == 0:
+            try:
+                os.close(os.open(self.marker, os.O_CREAT | os.O_EXCL))
+            except FileExistsError:
+                pass
+            else:
+                os._exit(1)
+        self.queue.put(item)
+
+
+def init_dying_worker(started_queue, marker):
+    analysis._started_queue = DieBeforeReporting(started_queue, marker)
+
+
+@unittest.skipIf(analysis is None, MISSING)
+class SequenceStatisticsTest(unittest.TestCase):
+    def test_k_mer_totals_sum_the_records(self):
+        reads = ["ACGTAC", "GGCCAA", "ACGTAC"]
+        records = [analysis.process_data(read) for read in reads]
+        statistics = analysis.process_sequence_statistics(records, 3, 0)
+        self.assertEqual(statistics["k_mer_count_2"]["ac"], 4)
+        self.assertEqual(statistics["k_mer_count_5"]["acgta"], 2)
+        combined = analysis.combine_sequence_statistics([statistics, statistics])
+        self.assertEqual(combined["k_mer_count_2"]["ac"], 8)
+
+    def test_memory_budget_windows_long_reads_and_batches(self):
+        reads = ["ACGTTGCA" * 4] * 9 + ["ACGTATAACGCG" * 30]
+        options = dict(long_sequence_length=100, window_size=64, palindrome_span=40)
+        expected = analysis.process_data_parallel(reads, executor="inline", **options)
+        for batch_size in (None, 4):
+            governed = analysis.process_data_parallel(
+                reads, memory_budget=1 << 40, batch_size=batch_size, **options
+            )
+            self.assertEqual(governed, expected)
+        with self.assertRaises(ValueError):
+            analysis.process_data_parallel(
+                reads, memory_budget=1 << 40, executor="thread"
+            )
+
+    def test_batch_size_with_long_reads(self):
+        reads = ["ACGTTGCA" * 4] * 9 + ["ACGTATAACGCG" * 30] + ["TTGCA" * 6]
+        options = dict(long_sequence_length=100, window_size=64, palindrome_span=40)
+        expected = analysis.process_data_parallel(reads, executor="inline", **options)
+        batched = analysis.process_data_parallel(
+            reads, executor="inline", batch_size=10, **options
+        )
+        self.assertEqual(batched, expected)
+
+    def test_checkpoint_journals_read_records(self):
+        reads = ["ACGTTGCAACGTTGCAACGTTGCA", "TATAACGCGT" * 3, "GGCC" * 5] * 3
+        expected = analysis.process_data_parallel(reads, executor="inline")
+        with tempfile.TemporaryDirectory() as directory:
+            first = analysis.process_data_checkpointed(reads, directory, chunk_size=4)
+            resumed = analysis.process_data_checkpointed(
+                reads, directory, resume=True, chunk_size=4
+            )
+        self.assertEqual(first, expected)
+        self.assertEqual(resumed, expected)
+
+    @unittest.skipIf(
+        multiprocessing.get_start_method() != "fork", "patches the forked workers"
+    )
+    def test_checkpoint_resubmits_a_chunk_lost_before_reporting(self):
+        reads = ["ACGTTGCAACGTTGCA", "TATAACGCGT" * 3, "GGCC" * 5] * 3
+        expected = analysis.process_data_parallel(reads, executor="inline")
+        results = []
+        with tempfile.TemporaryDirectory() as directory:
+            marker = os.path.join(directory, "died")
+            initializer = lambda queue: init_dying_worker(queue, marker)
+            with (
+                mock.patch.multiple(
+                    analysis,
+                    init_checkpoint_worker=initializer,
+                    LOST_CHUNK_TIMEOUT=0.5,
+                    CHECKPOINT_POLL_INTERVAL=0.1,
+                ),
+                self.assertLogs("seq_analysis_multiprocess", "WARNING") as logs,
+            ):
+                run = threading.Thread(
+                    target=lambda: results.append(
+                        analysis.process_data_checkpointed(
+                            reads, directory + "/journal", chunk_size=4
+                        )
+                    ),
+                    daemon=True,
+                )
+                run.start()
+                run.join(60)
+            self.assertFalse(run.is_alive(), "the lost chunk was never resubmitted")
+            self.assertTrue(os.path.exists(marker))
+        self.assertEqual(results, [expected])
+        self.assertIn("Chunk 0 was lost", logs.output[0])
+
+    def test_checkpoint_rejects_pool_options(self):
+        for option in (
+            {"executor": "thread"},
+            {"memory_budget": 1 << 30},
+            {"batch_size": 16},
+        ):
+            with self.assertRaises(ValueError):
+                analysis.process_data_parallel(["ACGT"], checkpoint_dir="x", **option)
+        for option in (["--executor", "inline"], ["--memory-budget", "1G"]):
+            with self.assertRaises(SystemExit):
+                analysis.parse_arguments(["--resume"] + option)
+
+    def test_batch_source_rejects_single_run_options(self):
+        for option in (["--checkpoint", "x"], ["--resume"], ["--memory-budget", "1G"]):
+            with self.assertRaises(SystemExit):
+                analysis.parse_arguments(["data"] + option)
+        with self.assertRaises(SystemExit):
+            analysis.parse_arguments(["data", "--batch-size"])
+        self.assertEqual(
+            analysis.parse_arguments(["--resume"]).checkpoint, "./checkpoint"
+        )
+
+    def test_k_mer_mode_flag_and_checkpoint(self):
+        self.assertEqual(analysis.parse_arguments([]).k_mer_mode, "forward")
+        arguments = analysis.parse_arguments(["data", "--k-mer-mode", "canonical"])
+        self.assertEqual(arguments.k_mer_mode, "canonical")
+        reads = ["ACGTTTACGT", "AAACGTTTGC"] * 3
+        with tempfile.TemporaryDirectory() as directory:
+            analysis.process_data_checkpointed(reads, directory, chunk_size=4)
+            # A forward journal cannot be resumed in canonical mode.
+            with self.assertRaises(ValueError):
+                analysis.process_data_checkpointed(
+                    reads, directory, resume=True, chunk_size=4, canonical=True
+                )
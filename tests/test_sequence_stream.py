@@ -0,0 +1,46 @@
+import json
+import unittest
+
+from utils.sequence_stream import JSONSequenceParser
+
+
+def parse(document, chunk_size):
+    parser = JSONSequenceParser()
+    sequences = []
+    for start in range(0, len(document), chunk_size):
+        sequences.extend(parser.feed(document[start : start + chunk_size]))
+    parser.close()
+    return sequences
+
+
+class JSONSequenceParserTest(unittest.TestCase):
+    def test_any_chunking_matches_json_load(self):
+        data = {
+            "num_sequences": 4,
+            "sequence_length": 6,
+            "sequences": ["ACGTAC", 'TT"GA\\', "", "GG\\u0041C" * 50],
+        }
+        document = json.dumps(data, indent=1)
+        for chunk_size in (1, 2, 3, 7, 64, len(document)):
+            self.assertEqual(parse(document, chunk_size), data["sequences"])
+
+    def test_long_string_is_decoded_once_it_closes(self):
+        read = "ACGT" * 10_000
+        parser = JSONSequenceParser()
+        self.assertEqual(parser.feed('{"sequences": ["' + read[:5]), [])
+        for start in range(5, len(read), 100):
+            self.assertEqual(parser.feed(read[start : start + 100]), [])
+        self.assertEqual(parser.feed('", "A"]}'), [read, "A"])
+        parser.close()
+
+    def test_truncated_or_malformed_documents_raise(self):
+        for document in (
+            '{"num_sequences": 1}',
+            '{"sequences": ["ACGT", "AC',
+            '{"sequences": ["ACGT", ',
+        ):
+            with self.subTest(document=document), self.assertRaises(ValueError):
+                parse(document, 4)
+        for document in ('{"sequences": ["ACGT", 12]}', '{"sequences": ["A\\x"]}'):
+            with self.subTest(document=document), self.assertRaises(ValueError):
+                parse(document, 4)
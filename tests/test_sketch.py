@@ -0,0 +1,24 @@
+import random
+import unittest
+from unittest import mock
+
+from utils import sketch
+
+
+class MinHashTest(unittest.TestCase):
+    def test_blocked_numpy_signature_matches_python(self):
+        if sketch.np is None:
+            self.skipTest("NumPy is not installed")
+        rng = random.Random(3)
+        reads = ["".join(rng.choices("ACGT", k=n)) for n in (10, 150, 3000)]
+        for read in reads:
+            with mock.patch.object(sketch, "np", None):
+                expected = sketch.minhash_signature(read)
+            for block in (sketch.MINHASH_BLOCK_VALUES, 1000, 1):
+                with mock.patch.object(sketch, "MINHASH_BLOCK_VALUES", block):
+                    self.assertEqual(sketch.minhash_signature(read), expected)
+
+    def test_no_k_mers(self):
+        self.assertEqual(
+            list(sketch.minhash_signature("ACGT", num_hashes=3)), [sketch.MASK_64] * 3
+        )
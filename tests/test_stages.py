@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from utils import stages
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+
+try:
+    import utils.data_types  # noqa: F401
+except ImportError as exc:  # utils/data_types.py is not in every checkout
+    MISSING = str(exc)
+else:
+    MISSING = ""
+
+
+@unittest.skipIf(MISSING, MISSING)
+class StagesTest(unittest.TestCase):
+    def test_cheap_stages_skip_the_palindrome_code(self):
+        script = (
+            "import sys; from utils.stages import run_stages; "
+            "print(run_stages('ACGT', ('nucleotides', 'k_mers', 'motifs', 'cpg'))"
+            "['cpg']); "
+            "print(sorted(m for m in sys.modules "
+            "if m in ('utils.sequence_utils', 'utils.palindrome_stage')))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=SRC_DIR,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.splitlines()
+        self.assertEqual(
+            output, ["{'cpg_count': 1, 'cpg_observed_expected': 4.0}", "[]"]
+        )
+
+    def test_cpg_stage(self):
+        cpg = stages.run_stages("AACGTTCGAA", ("cpg",))["cpg"]
+        self.assertEqual(cpg, {"cpg_count": 2, "cpg_observed_expected": 5.0})
+        self.assertEqual(stages.run_stages("AATT", ("cpg",))["cpg"]["cpg_count"], 0)
+
+    def test_stage_class_is_looked_up_by_path(self):
+        self.assertEqual(stages.load_stage_class("k_mers").__name__, "KMerStage")
+        stages.register_stage_path("wrong_class", "utils.basic_stages:KMerStage")
+        try:
+            with self.assertRaises(ValueError):
+                stages.get_stage("wrong_class")
+        finally:
+            del stages.STAGE_PATHS["wrong_class"]
+        with self.assertRaises(ValueError):
+            stages.get_stage("no_such_stage")
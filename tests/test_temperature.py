@@ -0,0 +1,91 @@
+import unittest
+from array import array
+from unittest import mock
+
+from utils import temperature
+from utils.temperature import (
+    BelowAbsoluteZeroError,
+    celsius_to_fahrenheit_batch,
+    iter_celsius_to_fahrenheit,
+)
+
+CELSIUS = [-273.15, -40.0, 0.0, 21.3, 36.6, 100.0, 1e6, 0.1]
+
+
+def scalar(celsius):
+    # TemperatureConverter.celsius_to_fahrenheit
+    return (celsius * 9 / 5) + 32
+
+
+class TemperatureTest(unittest.TestCase):
+    """Runs with NumPy if it is installed; NoNumPyTemperatureTest runs without."""
+
+    expected = [scalar(value) for value in CELSIUS]
+
+    def test_list_array_and_memoryview_input(self):
+        for values in (
+            list(CELSIUS),
+            array("d", CELSIUS),
+            memoryview(array("d", CELSIUS)),
+        ):
+            with self.subTest(type=type(values).__name__):
+                result = celsius_to_fahrenheit_batch(values)
+                self.assertIsInstance(result, array)
+                self.assertEqual(list(result), self.expected)
+        self.assertEqual(list(celsius_to_fahrenheit_batch([0, 100])), [32.0, 212.0])
+
+    def test_ndarray_input(self):
+        np = temperature.np
+        if np is None:
+            self.skipTest("NumPy not installed")
+        result = celsius_to_fahrenheit_batch(np.array(CELSIUS))
+        self.assertIsInstance(result, np.ndarray)
+        self.assertEqual(result.tolist(), self.expected)
+
+    def test_in_place(self):
+        buffers = [array("d", CELSIUS), memoryview(array("d", CELSIUS))]
+        if temperature.np is not None:
+            buffers.append(temperature.np.array(CELSIUS))
+        for values in buffers:
+            with self.subTest(type=type(values).__name__):
+                self.assertIs(celsius_to_fahrenheit_batch(values, out=values), values)
+                self.assertEqual(list(values), self.expected)
+        out = array("d", bytes(8 * len(CELSIUS)))
+        self.assertIs(celsius_to_fahrenheit_batch(CELSIUS, out=out), out)
+        self.assertEqual(list(out), self.expected)
+        with self.assertRaises(ValueError):
+            celsius_to_fahrenheit_batch(CELSIUS, out=array("d", [0.0]))
+
+    def test_below_absolute_zero_writes_nothing(self):
+        values = array("d", [0.0, -300.0, 10.0, -273.16])
+        with self.assertRaises(BelowAbsoluteZeroError) as caught:
+            celsius_to_fahrenheit_batch(values, out=values)
+        self.assertEqual(caught.exception.indices, [1, 3])
+        self.assertEqual(list(values), [0.0, -300.0, 10.0, -273.16])
+        self.assertEqual(
+            list(celsius_to_fahrenheit_batch([-300.0], validate=False)), [-508.0]
+        )
+        message = str(BelowAbsoluteZeroError(list(range(12))))
+        self.assertTrue(message.startswith("12 temperatures"))
+        self.assertTrue(message.endswith("0, 1, 2, 3, 4, 5, 6, 7, 8, 9..."))
+
+    def test_stream_chunks_and_offsets(self):
+        chunks = list(iter_celsius_to_fahrenheit(iter(CELSIUS), chunk_size=3))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 2])
+        self.assertEqual([f for chunk in chunks for f in chunk], self.expected)
+
+        readings = [0.0] * 7 + [-274.0, 5.0, -500.0]
+        stream = iter_celsius_to_fahrenheit(readings, chunk_size=3)
+        self.assertEqual(list(next(stream)), [32.0] * 3)
+        self.assertEqual(list(next(stream)), [32.0] * 3)
+        with self.assertRaises(BelowAbsoluteZeroError) as caught:
+            next(stream)
+        # Indices count from the start of the stream, not of the chunk.
+        self.assertEqual(caught.exception.indices, [7])
+
+
+class NoNumPyTemperatureTest(TemperatureTest):
+    def setUp(self):
+        patcher = mock.patch.object(temperature, "np", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
@@ -0,0 +1,105 @@
+import random
+import unittest
+from collections import Counter
+from unittest import mock
+
+from utils import top_k
+from utils.top_k import (
+    SpaceSaving,
+    k_mer_heavy_hitters,
+    merge_top_k,
+    top_k_dense,
+    top_k_items,
+)
+
+
+def sorted_top(counts, limit):
+    # What the full sorts replaced by top_k_items returned, ties in order.
+    return sorted(counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def skewed_stream(rng, length, distinct):
+    weights = [1 / (rank + 1) ** 1.2 for rank in range(distinct)]
+    return rng.choices(range(distinct), weights, k=length)
+
+
+class TopKTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(4)
+        # Few distinct counts, so most of the top is decided by ties.
+        self.counts = {f"k{i}": self.rng.randrange(6) for i in range(200)}
+
+    def test_top_k_items_matches_a_full_sort(self):
+        for limit in (0, 1, 5, 37, 500):
+            self.assertEqual(
+                top_k_items(self.counts, limit), sorted_top(self.counts, limit)
+            )
+
+    def test_top_k_dense_with_and_without_numpy(self):
+        dense = list(self.counts.values())
+        for numpy in {top_k.np, None}:
+            with mock.patch.object(top_k, "np", numpy):
+                for limit in (0, 1, 5, 37, 500):
+                    with self.subTest(numpy=numpy is not None, limit=limit):
+                        self.assertEqual(
+                            top_k_dense(dense, limit),
+                            sorted_top(dict(enumerate(dense)), limit),
+                        )
+
+    def test_merge_top_k(self):
+        parts = [{key: self.rng.randrange(10) for key in "abcdefgh"} for _ in range(4)]
+        total = Counter()
+        for part in parts:
+            total.update(part)
+        self.assertEqual(merge_top_k(parts, 3), top_k_items(total, 3))
+
+
+class SpaceSavingTest(unittest.TestCase):
+    def check_guarantees(self, sketch, true_counts):
+        total = sum(true_counts.values())
+        self.assertEqual(sketch.total, total)
+        self.assertLessEqual(len(sketch), sketch.capacity)
+        for item, count in sketch.counts.items():
+            self.assertLessEqual(sketch.guaranteed_count(item), true_counts[item])
+            self.assertGreaterEqual(count, true_counts[item])
+        for item, count in true_counts.items():
+            if count > total / sketch.capacity:
+                self.assertIn(item, sketch.counts)
+
+    def test_exact_below_capacity(self):
+        stream = skewed_stream(random.Random(1), 2000, 50)
+        sketch = SpaceSaving(capacity=64)
+        sketch.update_many(stream)
+        self.assertEqual(sketch.counts, Counter(stream))
+        self.assertEqual(sketch.min_count(), 0)
+        self.assertEqual(sketch.top(3), Counter(stream).most_common(3))
+
+    def test_heavy_hitters_are_kept(self):
+        rng = random.Random(2)
+        stream = skewed_stream(rng, 20_000, 5_000)
+        sketch = SpaceSaving(capacity=100)
+        sketch.update_many(stream)
+        self.check_guarantees(sketch, Counter(stream))
+        self.assertEqual(sketch.top(1)[0][0], 0)
+
+    def test_merged_sketches_keep_the_guarantees(self):
+        rng = random.Random(3)
+        streams = [skewed_stream(rng, 10_000, 3_000) for _ in range(2)]
+        sketches = []
+        for stream in streams:
+            sketch = SpaceSaving(capacity=100)
+            sketch.update_many(stream)
+            sketches.append(sketch)
+        merged = sketches[0].merge(sketches[1])
+        self.check_guarantees(merged, Counter(streams[0]) + Counter(streams[1]))
+
+    def test_k_mer_heavy_hitters(self):
+        reads = ["ACGTACGTAAAA", "acgtttttACG "]
+        counts = Counter(
+            read.lower().strip()[i : i + 3]
+            for read in reads
+            for i in range(len(read.strip()) - 2)
+        )
+        sketch = k_mer_heavy_hitters(reads, 3, capacity=64)
+        self.assertEqual(sketch.counts, counts)
+        self.assertEqual(sketch.top(2), top_k_items(counts, 2))
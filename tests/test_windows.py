@@ -0,0 +1,87 @@
+import random
+import unittest
+from collections import Counter
+
+from utils.top_k import top_k_items
+from utils.windows import analyse_window, merge_window_results, split_windows
+
+try:
+    import seq_analysis_multiprocess as analysis
+except ImportError as exc:  # utils/data_types.py is not in every checkout
+    analysis, MISSING = None, str(exc)
+else:
+    MISSING = ""
+
+COMPLEMENT = {"A": "T", "T": "A", "C": "G", "G": "C"}
+MOTIFS = ("CG", "TATA")
+
+
+def long_read(length, seed=3):
+    rng = random.Random(seed)
+    read = [rng.choice("ACGT") for _ in range(length)]
+    # A palindrome much longer than the windows' palindrome span, across a
+    # window boundary, and a copy of it further on.
+    arm = [rng.choice("ACGT") for _ in range(60)]
+    palindrome = arm + [COMPLEMENT[base] for base in reversed(arm)]
+    read[200:320] = palindrome
+    read[900:1020] = palindrome
+    return "".join(read)
+
+
+def single_pass(read):
+    """Every statistic computed over the whole read at once."""
+    lowered = read.lower()
+    k_mers = {}
+    for k in (2, 3, 4, 5):
+        counts = {}
+        for i in range(len(read) - k + 1):
+            counts[lowered[i : i + k]] = counts.get(lowered[i : i + k], 0) + 1
+        k_mers[k] = dict(top_k_items(counts, 5))
+    motifs = {
+        motif: [i for i in range(len(read) - 1) if read[i : i + len(motif)] == motif]
+        for motif in MOTIFS
+    }
+    best = (0, 0)
+    for centre in range(1, len(read)):
+        left, right = centre - 1, centre
+        while left >= 0 and right < len(read) and read[left] == COMPLEMENT[read[right]]:
+            left, right = left - 1, right + 1
+        if right - left - 1 > best[0]:
+            best = (right - left - 1, left + 1)
+    palindrome = {
+        "palindrome_seq": read[best[1] : best[1] + best[0]],
+        "palindrome_length": best[0],
+    }
+    return Counter(lowered), k_mers, motifs, palindrome
+
+
+class WindowsTest(unittest.TestCase):
+    def test_windows_equal_a_single_pass(self):
+        read = long_read(3000)
+        expected = single_pass(read)
+        self.assertGreaterEqual(expected[3]["palindrome_length"], 120)
+        for window_size in (97, 256, 3000):
+            with self.subTest(window_size=window_size):
+                windows = split_windows(
+                    read, window_size=window_size, motifs=MOTIFS, palindrome_span=40
+                )
+                results = [analyse_window(window) for window in windows]
+                merged = merge_window_results(read, results, min_length=20)
+                self.assertEqual(merged, expected)
+                # Ties in the top k-mers keep the first seen, as in one pass.
+                self.assertEqual(
+                    [list(top) for top in merged[1].values()],
+                    [list(top) for top in expected[1].values()],
+                )
+
+    @unittest.skipIf(analysis is None, MISSING)
+    def test_windowed_records_equal_process_data(self):
+        reads = [long_read(700, seed) for seed in range(3)]
+        windowed = analysis.process_data_parallel(
+            reads,
+            long_sequence_length=100,
+            window_size=64,
+            palindrome_span=40,
+            executor="inline",
+        )
+        self.assertEqual(windowed, [analysis.process_data(read) for read in reads])